@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 import random
 
-from app.db.database import get_db
+from app.core.cache import summary_cache
+from app.db.database import get_async_read_db
+from app.db.models.aggregates import ConflictCount
 from app.db.models.requirements import Requirement, Contradiction, Overlap
+from app.graph.conflicts import EDGE_TYPES, get_conflict_graph
+from app.api.v1.pagination import encode_cursor, decode_cursor
 
 from app.api.v1.schemas.conflicts import (
-    RequirementRef,
-    ConflictItem,
+    ConflictClusterResponse,
+    ConflictClustersResponse,
+    ConflictNeighbourhoodResponse,
     ConflictsDetailResponse,
     ConflictsSummaryResponse,
     ConflictSummaryItem
 )
+from app.api.v1.schemas.requirements import RequirementNotFound
 
 router = APIRouter(prefix="/conflicts", tags=["Conflicts"])
 
@@ -39,21 +49,16 @@ OVERLAP_SENTENCES = [
 # ------------------------------------------------------------
 # GET /conflicts/summary
 # ------------------------------------------------------------
-@router.get("/summary", response_model=ConflictsSummaryResponse)
-def conflicts_summary(
-    jurisdiction: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-
-    contradictions_query = db.query(Contradiction)
-    overlaps_query = db.query(Overlap)
+async def compute_conflicts_summary(db: AsyncSession, jurisdiction: Optional[str]) -> ConflictsSummaryResponse:
+    # Trigger-maintained conflict_counts: one row per (jurisdiction, type)
+    stmt = select(ConflictCount.conflict_type, func.sum(ConflictCount.count))
 
     if jurisdiction:
-        contradictions_query = contradictions_query.filter(Contradiction.jurisdiction == jurisdiction)
-        overlaps_query = overlaps_query.filter(Overlap.jurisdiction == jurisdiction)
+        stmt = stmt.where(ConflictCount.jurisdiction == jurisdiction)
 
-    contradictions = contradictions_query.count()
-    overlaps = overlaps_query.count()
+    counts = dict((await db.execute(stmt.group_by(ConflictCount.conflict_type))).all())
+    contradictions = counts.get("contradiction", 0)
+    overlaps = counts.get("overlap", 0)
 
     total = contradictions + overlaps
 
@@ -78,54 +83,172 @@ def conflicts_summary(
     return ConflictsSummaryResponse(total=total, items=items)
 
 
+@router.get("/summary", response_model=ConflictsSummaryResponse)
+async def conflicts_summary(
+    request: Request,
+    jurisdiction: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+
+    params = {"jurisdiction": jurisdiction}
+    cached = await summary_cache.lookup(request, db, "conflicts.summary", params)
+    if cached is not None:
+        return cached
+
+    version = summary_cache.version.value
+    result = await compute_conflicts_summary(db, jurisdiction)
+    return summary_cache.store(request, "conflicts.summary", params, result, version)
+
+
 # ------------------------------------------------------------
 # GET /conflicts/detail/{conflict_type}
 # ------------------------------------------------------------
+def _detail_statement(model, conflict_type: str, jurisdiction: Optional[str], last_id: Optional[int]):
+    description = model.description if conflict_type == "contradiction" else model.reason
+    r1 = aliased(Requirement)
+    r2 = aliased(Requirement)
+
+    # Plain columns from one SELECT with both requirements joined in:
+    # no ORM objects, and rows go straight into the JSON payload.
+    stmt = (
+        select(
+            model.id, model.jurisdiction, description.label("description"),
+            r1.id, r1.text, r1.page, r1.line, r1.jurisdiction,
+            r2.id, r2.text, r2.page, r2.line, r2.jurisdiction,
+        )
+        .join(r1, model.requirement1)
+        .join(r2, model.requirement2)
+    )
+
+    if jurisdiction:
+        stmt = stmt.where(model.jurisdiction == jurisdiction)
+
+    if last_id is not None:
+        stmt = stmt.where(model.id > last_id)
+
+    return stmt.order_by(model.id)
+
+
+def _conflict_row(row, conflict_type: str) -> dict:
+    # Same shape as ConflictItem, built straight from the SQL tuple
+    (conflict_id, jurisdiction, description,
+     r1_id, r1_text, r1_page, r1_line, r1_jurisdiction,
+     r2_id, r2_text, r2_page, r2_line, r2_jurisdiction) = row
+
+    return {
+        "id": conflict_id,
+        "type": conflict_type,
+        "jurisdiction": jurisdiction,
+        "description": description,
+        "requirement_1": {
+            "id": r1_id, "text": r1_text, "page": r1_page, "line": r1_line, "jurisdiction": r1_jurisdiction,
+        },
+        "requirement_2": {
+            "id": r2_id, "text": r2_text, "page": r2_page, "line": r2_line, "jurisdiction": r2_jurisdiction,
+        },
+    }
+
+
 @router.get("/detail/{conflict_type}", response_model=ConflictsDetailResponse)
-def conflicts_detail(
+async def conflicts_detail(
     conflict_type: str,
     jurisdiction: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
 
     if conflict_type not in ["contradiction", "overlap"]:
         raise ValueError("Invalid conflict type. Use 'contradiction' or 'overlap'.")
 
     model = Contradiction if conflict_type == "contradiction" else Overlap
+    stmt = _detail_statement(model, conflict_type, jurisdiction, decode_cursor(after))
 
-    query = db.query(model)
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    if jurisdiction:
-        query = query.filter(model.jurisdiction == jurisdiction)
-
-    results = query.all()
-
-    items = []
-    for item in results:
-        r1 = db.query(Requirement).filter(Requirement.id == item.requirement1_id).first()
-        r2 = db.query(Requirement).filter(Requirement.id == item.requirement2_id).first()
-
-        items.append(
-            ConflictItem(
-                id=item.id,
-                type=conflict_type,
-                jurisdiction=item.jurisdiction,
-                description=item.description if conflict_type == "contradiction" else item.reason,
-                requirement_1=RequirementRef(
-                    id=r1.id,
-                    text=r1.text,
-                    page=r1.page,
-                    line=r1.line,
-                    jurisdiction=r1.jurisdiction
-                ),
-                requirement_2=RequirementRef(
-                    id=r2.id,
-                    text=r2.text,
-                    page=r2.page,
-                    line=r2.line,
-                    jurisdiction=r2.jurisdiction
-                )
-            )
-        )
+    items = [_conflict_row(row, conflict_type) for row in rows]
+    next_cursor = encode_cursor(rows[-1][0]) if has_more else None
+
+    # Returned as a Response: FastAPI skips re-validating against
+    # response_model, which still documents the shape in OpenAPI.
+    return ORJSONResponse({
+        "count": len(items),
+        "type": conflict_type,
+        "items": items,
+        "next_cursor": next_cursor,
+    })
+
+
+# ------------------------------------------------------------
+# Conflict graph (in-memory, see app/graph/conflicts.py)
+# ------------------------------------------------------------
+# Loading/syncing the graph blocks (sync session + thread lock): it runs in
+# the threadpool so the event loop keeps serving other requests meanwhile.
+# GET /conflicts/graph/cluster/{requirement_id}
+@router.get("/graph/cluster/{requirement_id}", response_model=ConflictClusterResponse | RequirementNotFound)
+async def conflict_cluster(
+    requirement_id: int,
+    limit: int = Query(1000, ge=1, le=10000)
+):
+
+    graph = await run_in_threadpool(get_conflict_graph)
+    if not graph.has_node(requirement_id):
+        return RequirementNotFound(error="Requirement not found")
+
+    cluster = graph.cluster(requirement_id)
+    requirement_ids = cluster.pop("members")[:limit].tolist()
+
+    return ORJSONResponse({
+        "requirement_id": requirement_id,
+        **cluster,
+        "count": len(requirement_ids),
+        "requirement_ids": requirement_ids,
+    })
+
+
+# GET /conflicts/graph/clusters
+@router.get("/graph/clusters", response_model=ConflictClustersResponse)
+async def largest_conflict_clusters(
+    jurisdiction: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=1000)
+):
+
+    graph = await run_in_threadpool(get_conflict_graph)
+    items = graph.largest_clusters(jurisdiction, limit)
+
+    return ORJSONResponse({"jurisdiction": jurisdiction, "count": len(items), "items": items})
+
+
+# GET /conflicts/graph/neighbourhood/{requirement_id}
+@router.get(
+    "/graph/neighbourhood/{requirement_id}",
+    response_model=ConflictNeighbourhoodResponse | RequirementNotFound
+)
+async def conflict_neighbourhood(
+    requirement_id: int,
+    hops: int = Query(2, ge=1, le=5),
+    max_nodes: int = Query(500, ge=1, le=10000)
+):
 
-    return ConflictsDetailResponse(count=len(items), type=conflict_type, items=items)
+    graph = await run_in_threadpool(get_conflict_graph)
+    if not graph.has_node(requirement_id):
+        return RequirementNotFound(error="Requirement not found")
+
+    distance, edges, truncated = graph.neighbourhood(requirement_id, hops, max_nodes)
+
+    return ORJSONResponse({
+        "requirement_id": requirement_id,
+        "hops": hops,
+        "truncated": truncated,
+        "nodes": [
+            {"id": node, "distance": hop, "jurisdiction": graph.jurisdiction_of(node)}
+            for node, hop in distance.items()
+        ],
+        "edges": [
+            {"id": conflict_id, "type": EDGE_TYPES[code], "source": source, "target": target}
+            for (_, conflict_id), (source, target, code) in edges.items()
+        ],
+    })
@@ -0,0 +1,128 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Optional
+
+from app.db.database import AsyncReadSession
+from app.db.models.requirements import Requirement, Contradiction, Overlap, RiskTypeEnum
+from app.export.formats import CATEGORY, INT, TEXT, ExportFormat, encoder_for
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# Rows per server-side batch (and per CSV chunk / Arrow record batch)
+EXPORT_BATCH_SIZE = 10_000
+
+REQUIREMENT_COLUMNS = [
+    ("id", INT),
+    ("text", TEXT),
+    ("risk_type", CATEGORY),
+    ("jurisdiction", CATEGORY),
+    ("page", INT),
+    ("line", INT),
+]
+
+CONFLICT_COLUMNS = [
+    ("id", INT),
+    ("requirement1_id", INT),
+    ("requirement2_id", INT),
+    ("description", TEXT),
+    ("page_1", INT),
+    ("line_1", INT),
+    ("page_2", INT),
+    ("line_2", INT),
+    ("jurisdiction", CATEGORY),
+]
+
+
+async def _stream_export(stmt, encoder):
+    # Own session for the whole response (see requirements._stream_requirements)
+    async with AsyncReadSession() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        yield encoder.begin()
+        async for batch in result.partitions():
+            yield encoder.batch(batch)
+        yield encoder.end()
+
+
+def _export_response(name: str, stmt, columns, export_format: ExportFormat) -> StreamingResponse:
+    try:
+        encoder = encoder_for(export_format, columns)
+    except LookupError as error:
+        raise HTTPException(status_code=406, detail=str(error))
+
+    return StreamingResponse(
+        _stream_export(stmt, encoder),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{encoder.extension}"'}
+    )
+
+
+# ------------------------------------------------------------
+# GET /export/requirements
+# ------------------------------------------------------------
+@router.get("/requirements")
+async def export_requirements(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    jurisdiction: Optional[str] = Query(None),
+    risk_type: Optional[RiskTypeEnum] = Query(None)
+):
+
+    stmt = select(
+        Requirement.id,
+        Requirement.text,
+        Requirement.risk_type,
+        Requirement.jurisdiction,
+        Requirement.page,
+        Requirement.line,
+    )
+
+    if jurisdiction:
+        stmt = stmt.where(Requirement.jurisdiction == jurisdiction)
+
+    if risk_type:
+        stmt = stmt.where(Requirement.risk_type == risk_type)
+
+    return _export_response("requirements", stmt.order_by(Requirement.id), REQUIREMENT_COLUMNS, format)
+
+
+# ------------------------------------------------------------
+# GET /export/contradictions, /export/overlaps
+# ------------------------------------------------------------
+def _conflict_statement(model, description, jurisdiction: Optional[str]):
+    stmt = select(
+        model.id,
+        model.requirement1_id,
+        model.requirement2_id,
+        description,
+        model.page_1,
+        model.line_1,
+        model.page_2,
+        model.line_2,
+        model.jurisdiction,
+    )
+
+    if jurisdiction:
+        stmt = stmt.where(model.jurisdiction == jurisdiction)
+
+    return stmt.order_by(model.id)
+
+
+@router.get("/contradictions")
+async def export_contradictions(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    jurisdiction: Optional[str] = Query(None)
+):
+
+    stmt = _conflict_statement(Contradiction, Contradiction.description, jurisdiction)
+    return _export_response("contradictions", stmt, CONFLICT_COLUMNS, format)
+
+
+@router.get("/overlaps")
+async def export_overlaps(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    jurisdiction: Optional[str] = Query(None)
+):
+
+    # Overlaps keep their explanation in `reason`; exported as `description`
+    stmt = _conflict_statement(Overlap, Overlap.reason, jurisdiction)
+    return _export_response("overlaps", stmt, CONFLICT_COLUMNS, format)
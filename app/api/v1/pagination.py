@@ -0,0 +1,52 @@
+import base64
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+
+# ------------------------------------------------------------
+# Opaque keyset cursors over integer primary keys
+# ------------------------------------------------------------
+
+def encode_cursor(last_id: Optional[int]) -> Optional[str]:
+    if last_id is None:
+        return None
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, value = base64.urlsafe_b64decode(padded.encode()).decode().split(":", 1)
+        if prefix != "id":
+            raise ValueError(prefix)
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+
+# ------------------------------------------------------------
+# Ranked cursors: (score, id) of the last row of a page
+# ------------------------------------------------------------
+
+def encode_rank_cursor(score: Optional[float], last_id: Optional[int]) -> Optional[str]:
+    if last_id is None:
+        return None
+    # repr() round-trips the float exactly, so ties compare equal on the next page
+    payload = f"rank:{score!r}:{last_id}"
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, score, value = base64.urlsafe_b64decode(padded.encode()).decode().split(":", 2)
+        if prefix != "rank":
+            raise ValueError(prefix)
+        return float(score), int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
@@ -1,18 +1,36 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import BigInteger, and_, cast, column, func, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
+import html
+import math
+import orjson
 import random
+import re
 
-from app.db.database import get_db
-from app.db.models.requirements import Requirement
+from app.db.database import get_async_read_db, AsyncReadSession
+from app.db.models.requirements import Contradiction, Overlap, Requirement, RequirementEmbedding, RiskTypeEnum
+from app.db.models.search import FTS_TABLE, TEXT_SEARCH_CONFIG
+from app.api.v1.pagination import encode_cursor, decode_cursor, encode_rank_cursor, decode_rank_cursor
+from app.similarity.ann import get_ann_index
+from app.similarity.codec import decode_embedding
+from app.similarity.index import get_embedding_index
 
 from app.api.v1.schemas.requirements import (
-    RequirementItem,
     RequirementsListResponse,
     SuggestedRequirement,
     SuggestedRequirementsResponse,
     RequirementDetailResponse,
     RequirementNotFound,
+    RequirementsBatchRequest,
+    RequirementsBatchResponse,
+    SearchRequirementItem,
+    RequirementsSearchResponse,
+    SimilarRequirementItem,
+    SimilarRequirementsResponse,
 )
 
 router = APIRouter(prefix="/requirements", tags=["Requirements"])
@@ -29,68 +47,184 @@ SUGGESTED_SENTENCES = [
 
 
 # ------------------------------------------------------------
-# GET /requirements/list  → JSON validated
+# GET /requirements/list  → JSON validated or NDJSON stream
 # ------------------------------------------------------------
-@router.get("/list", response_model=RequirementsListResponse)
-def list_requirements(
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 1000
+
+
+def _list_statement(jurisdiction: Optional[str], last_id: Optional[int]):
+    # Plain column tuples: no ORM identity map to grow while streaming
+    stmt = select(
+        Requirement.id,
+        Requirement.text,
+        Requirement.risk_type,
+        Requirement.jurisdiction,
+        Requirement.page,
+        Requirement.line,
+    )
+
+    if jurisdiction:
+        stmt = stmt.where(Requirement.jurisdiction == jurisdiction)
+
+    if last_id is not None:
+        stmt = stmt.where(Requirement.id > last_id)
+
+    return stmt.order_by(Requirement.id)
+
+
+def _requirement_row(row) -> dict:
+    # Same shape as RequirementItem, built straight from the SQL tuple
+    # (positional unpacking: much cheaper than Row attribute access)
+    requirement_id, text, risk_type, jurisdiction, page, line = row
+    return {
+        "id": requirement_id,
+        "text": text,
+        "risk_type": risk_type.value if risk_type else None,
+        "jurisdiction": jurisdiction,
+        "page": page,
+        "line": line,
+        "short_description": random.choice(SUGGESTED_SENTENCES),
+    }
+
+
+async def _stream_requirements(stmt):
+    # The request-scoped session is closed before the body is sent,
+    # so the stream owns its own session for its whole lifetime.
+    async with AsyncReadSession() as db:
+        result = await db.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for batch in result.partitions():
+            yield b"".join(orjson.dumps(_requirement_row(row)) + b"\n" for row in batch)
+
+
+@router.get(
+    "/list",
+    response_model=RequirementsListResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+)
+async def list_requirements(
     jurisdiction: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    after: Optional[str] = Query(None),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
 
-    query = db.query(Requirement)
+    stmt = _list_statement(jurisdiction, decode_cursor(after))
 
-    if jurisdiction:
-        query = query.filter(Requirement.jurisdiction == jurisdiction)
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return StreamingResponse(_stream_requirements(stmt), media_type=NDJSON_MEDIA_TYPE)
 
-    requirements = query.all()
+    if limit is None:
+        rows = (await db.execute(stmt)).all()
+        next_cursor = None
+    else:
+        # Fetch one extra row to know whether another page exists
+        rows = (await db.execute(stmt.limit(limit + 1))).all()
+        next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+        rows = rows[:limit]
 
-    items = [
-        RequirementItem(
-            id=req.id,
-            text=req.text,
-            risk_type=req.risk_type.value if req.risk_type else None,
-            jurisdiction=req.jurisdiction,
-            page=req.page,
-            line=req.line,
-            short_description=random.choice(SUGGESTED_SENTENCES)
-        )
-        for req in requirements
-    ]
+    # Returned as a Response: FastAPI skips re-validating against
+    # response_model, which still documents the shape in OpenAPI.
+    items = [_requirement_row(row) for row in rows]
 
-    return RequirementsListResponse(count=len(items), items=items)
+    return ORJSONResponse({"count": len(items), "items": items, "next_cursor": next_cursor})
 
 
 # ------------------------------------------------------------
 # GET /requirements/suggested  → JSON validated
 # ------------------------------------------------------------
+# Below this id span the table is small enough for ORDER BY random()
+SAMPLE_RANGE_MIN_SPAN = 10_000
+# Random ids probed per requested row; covers gaps and filtered-out rows
+SAMPLE_OVERSAMPLING = 8
+# Top-up rounds before falling back, and the most ids probed in one round
+SAMPLE_MAX_ROUNDS = 3
+SAMPLE_MAX_PROBES = 5000
+# Seeded permutation: (id * multiplier + offset) mod the largest prime below
+# 2**32; multipliers stay below 2**31 so the product fits in a BIGINT
+SAMPLE_PERMUTATION_MODULUS = 4294967291
+SAMPLE_PERMUTATION_MAX_MULTIPLIER = 2 ** 31
+
+
+async def _sample_by_id_range(db: AsyncSession, stmt, limit: int, rng: random.Random):
+    # Pick random ids between min(id) and max(id) (both answered by the
+    # primary key index) and keep the ones that exist and match the filters.
+    lo, hi = (await db.execute(select(func.min(Requirement.id), func.max(Requirement.id)))).one()
+
+    if lo is None or hi - lo + 1 < SAMPLE_RANGE_MIN_SPAN:
+        return None
+
+    sample, probed = [], set()
+    probes = limit * SAMPLE_OVERSAMPLING
+
+    for _ in range(SAMPLE_MAX_ROUNDS):
+        candidates = [i for i in rng.sample(range(lo, hi + 1), probes) if i not in probed]
+        probed.update(candidates)
+        found = {req.id: req for req in await db.scalars(stmt.where(Requirement.id.in_(candidates)))}
+        sample.extend(found[i] for i in candidates if i in found)
+
+        if len(sample) >= limit:
+            return sample[:limit]
+
+        # Keep what was found and top it up: size the next round by the hit
+        # rate seen so far (selective filters need many more probes per row)
+        hit_rate = max(len(sample), 1) / len(probed)
+        probes = min(math.ceil((limit - len(sample)) / hit_rate * 2), SAMPLE_MAX_PROBES, hi - lo + 1)
+
+    # Too sparse (small filtered set or large id gaps): let the caller fall back
+    return None
+
+
+async def _sample_by_random_order(db: AsyncSession, stmt, limit: int, seed: Optional[int]):
+    if seed is None:
+        order = func.random()
+    else:
+        # Deterministic pseudo-random permutation of ids for a given seed.
+        # Multiplier and offset both come from the seed: adding the seed
+        # alone barely moves the order, so adjacent seeds gave one sample.
+        seeded = random.Random(seed)
+        multiplier = seeded.randrange(1, SAMPLE_PERMUTATION_MAX_MULTIPLIER)
+        offset = seeded.randrange(SAMPLE_PERMUTATION_MODULUS)
+        order = (cast(Requirement.id, BigInteger) * multiplier + offset) % SAMPLE_PERMUTATION_MODULUS
+
+    return (await db.scalars(stmt.order_by(order, Requirement.id).limit(limit))).all()
+
+
 @router.get("/suggested", response_model=SuggestedRequirementsResponse)
-def suggested_requirements(
-    limit: int = 5,
+async def suggested_requirements(
+    limit: int = Query(5, ge=1, le=100),
     jurisdiction: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    seed: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
 
-    query = db.query(Requirement)
+    rng = random.Random(seed)
+
+    stmt = select(Requirement)
 
     if jurisdiction:
-        query = query.filter(Requirement.jurisdiction == jurisdiction)
+        stmt = stmt.where(Requirement.jurisdiction == jurisdiction)
 
-    all_requirements = query.all()
+    sample = await _sample_by_id_range(db, stmt, limit, rng)
 
-    if not all_requirements:
-        return SuggestedRequirementsResponse(count=0, items=[])
+    if sample is None:
+        sample = await _sample_by_random_order(db, stmt, limit, seed)
 
-    sample = random.sample(all_requirements, min(limit, len(all_requirements)))
+    if not sample:
+        return SuggestedRequirementsResponse(count=0, items=[])
 
     items = [
-        SuggestedRequirementItem(
+        SuggestedRequirement(
             id=req.id,
             text=req.text,
-            risk_type=req.risk_type.value,
+            risk_type=req.risk_type.value if req.risk_type else None,
             jurisdiction=req.jurisdiction,
             page=req.page,
             line=req.line,
-            short_description=random.choice(SUGGESTED_SENTENCES)
+            short_description=rng.choice(SUGGESTED_SENTENCES)
         )
         for req in sample
     ]
@@ -98,23 +232,333 @@ def suggested_requirements(
     return SuggestedRequirementsResponse(count=len(items), items=items)
 
 
+# ------------------------------------------------------------
+# GET /requirements/search  → JSON validated
+# ------------------------------------------------------------
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# The database marks matches with control characters that XML 1.0 text
+# cannot contain; the text is HTML-escaped before they become <mark> tags
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+SEARCH_TERM = re.compile(r"\w+")
+
+
+def _search_terms(dialect: str, q: str):
+    """(match condition, score) for the backend's full-text index.
+
+    Scores are "higher is better" on both backends so one keyset order works.
+    """
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, q)
+        vector = literal_column("requirements.search_vector")
+        return vector.op("@@")(query), func.ts_rank_cd(vector, query)
+
+    # SQLite FTS5: quote every term so user input never reaches the MATCH
+    # grammar; adjacent quoted terms are AND-ed.
+    fts = literal_column(FTS_TABLE)
+    match = fts.op("MATCH")(" ".join(f'"{term}"' for term in SEARCH_TERM.findall(q)))
+    return match, -func.bm25(fts)
+
+
+def _search_highlight(dialect: str, q: str, match, page_id):
+    if dialect == "postgresql":
+        return func.ts_headline(
+            TEXT_SEARCH_CONFIG, Requirement.text, func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, q),
+            f"StartSel={MATCH_START}, StopSel={MATCH_END}, HighlightAll=true"
+        )
+
+    fts = table(FTS_TABLE, column("rowid"))
+    return (
+        select(func.highlight(literal_column(FTS_TABLE), 0, MATCH_START, MATCH_END))
+        .select_from(fts)
+        .where(match, fts.c.rowid == page_id)
+        .scalar_subquery()
+    )
+
+
+def _render_highlight(marked: str) -> str:
+    """Safe HTML: the requirement text escaped, only the matches in <mark>."""
+    return html.escape(marked).replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_END, HIGHLIGHT_END)
+
+
+def _search_statement(dialect: str, q: str, jurisdiction, risk_type, after, limit: int):
+    match, score = _search_terms(dialect, q)
+
+    # 1) Rank the matches and keep one page of (id, score)
+    page_id = Requirement.id
+
+    if dialect != "postgresql":
+        fts = table(FTS_TABLE, column("rowid"))
+        if jurisdiction or risk_type:
+            source = fts.join(Requirement, Requirement.id == fts.c.rowid)
+        else:
+            # Nothing to filter on: rank inside the FTS index alone
+            source, page_id = fts, fts.c.rowid
+
+    page = select(page_id.label("id"), score.label("score"))
+
+    if dialect != "postgresql":
+        page = page.select_from(source)
+
+    page = page.where(match)
+
+    if jurisdiction:
+        page = page.where(Requirement.jurisdiction == jurisdiction)
+
+    if risk_type:
+        page = page.where(Requirement.risk_type == risk_type)
+
+    if after is not None:
+        last_score, last_id = after
+        page = page.where(or_(
+            score < last_score,
+            and_(score == last_score, page_id > last_id)
+        ))
+
+    page = page.order_by(score.desc(), page_id).limit(limit).cte("page")
+
+    # 2) Load and highlight only that page: highlighting is the expensive part
+    return (
+        select(
+            Requirement.id,
+            Requirement.text,
+            Requirement.risk_type,
+            Requirement.jurisdiction,
+            Requirement.page,
+            Requirement.line,
+            page.c.score,
+            _search_highlight(dialect, q, match, page.c.id).label("highlight"),
+        )
+        .join(page, Requirement.id == page.c.id)
+        .order_by(page.c.score.desc(), page.c.id)
+    )
+
+
+@router.get("/search", response_model=RequirementsSearchResponse)
+async def search_requirements(
+    q: str = Query(..., min_length=1, max_length=500),
+    jurisdiction: Optional[str] = Query(None),
+    risk_type: Optional[RiskTypeEnum] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+
+    if not SEARCH_TERM.search(q):
+        raise HTTPException(status_code=400, detail="Search query has no searchable terms.")
+
+    dialect = db.get_bind().dialect.name
+    # Fetch one extra row to know whether another page exists
+    stmt = _search_statement(dialect, q, jurisdiction, risk_type, decode_rank_cursor(after), limit + 1)
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_rank_cursor(last.score, last.id)
+        rows = rows[:limit]
+
+    items = [
+        SearchRequirementItem(
+            id=row.id,
+            text=row.text,
+            risk_type=row.risk_type.value if row.risk_type else None,
+            jurisdiction=row.jurisdiction,
+            page=row.page,
+            line=row.line,
+            score=row.score,
+            highlight=_render_highlight(row.highlight)
+        )
+        for row in rows
+    ]
+
+    return RequirementsSearchResponse(query=q, count=len(items), items=items, next_cursor=next_cursor)
+
+
+# ------------------------------------------------------------
+# GET /requirements/{id}/similar  → JSON validated
+# ------------------------------------------------------------
+async def _approximate_similar(db: AsyncSession, ann_index, requirement_id: int, k: int):
+    row = (await db.execute(
+        select(RequirementEmbedding.vector, RequirementEmbedding.dimension).where(
+            RequirementEmbedding.requirement_id == requirement_id,
+            RequirementEmbedding.vector.isnot(None)
+        )
+    )).first()
+
+    if row is None:
+        return None
+
+    hits = await run_in_threadpool(ann_index.search, decode_embedding(row.vector, row.dimension), k + 1)
+    return [(rid, score) for rid, score in hits if rid != requirement_id][:k]
+
+
+@router.get(
+    "/{requirement_id}/similar",
+    response_model=SimilarRequirementsResponse | RequirementNotFound
+)
+async def similar_requirements(
+    requirement_id: int,
+    k: int = Query(10, ge=1, le=100),
+    approximate: bool = Query(False),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+
+    ann_index = get_ann_index() if approximate else None
+
+    if ann_index is not None:
+        hits = await _approximate_similar(db, ann_index, requirement_id, k)
+    else:
+        # Loading the matrix (blocking) and the matrix product (CPU-bound)
+        # both run in the threadpool, off the event loop
+        index = await run_in_threadpool(get_embedding_index)
+        hits = await run_in_threadpool(index.similar_to, requirement_id, k)
+
+    if hits is None:
+        return RequirementNotFound(error="Requirement has no embedding")
+
+    found = {
+        req.id: req
+        for req in await db.scalars(select(Requirement).where(Requirement.id.in_([rid for rid, _ in hits])))
+    }
+
+    items = [
+        SimilarRequirementItem(
+            id=found[rid].id,
+            text=found[rid].text,
+            risk_type=found[rid].risk_type.value if found[rid].risk_type else None,
+            jurisdiction=found[rid].jurisdiction,
+            page=found[rid].page,
+            line=found[rid].line,
+            score=round(score, 6)
+        )
+        for rid, score in hits
+        if rid in found
+    ]
+
+    return SimilarRequirementsResponse(requirement_id=requirement_id, count=len(items), items=items)
+
+
+# ------------------------------------------------------------
+# include= expansions: one selectin query per relationship
+# ------------------------------------------------------------
+# Each collection is loaded with one IN query over all the requested
+# requirements, with the other requirement of the pair joined into that
+# same query: the statement count depends on include=, never on the ids.
+INCLUDE_OPTIONS = {
+    "contradictions": [
+        selectinload(Requirement.contradictions_as_first).joinedload(Contradiction.requirement2, innerjoin=True),
+        selectinload(Requirement.contradictions_as_second).joinedload(Contradiction.requirement1, innerjoin=True),
+    ],
+    "overlaps": [
+        selectinload(Requirement.overlaps_as_first).joinedload(Overlap.requirement2, innerjoin=True),
+        selectinload(Requirement.overlaps_as_second).joinedload(Overlap.requirement1, innerjoin=True),
+    ],
+    "document": [selectinload(Requirement.document)],
+}
+
+
+def _parse_include(include: Optional[str]) -> list:
+    names = [name.strip() for name in (include or "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in INCLUDE_OPTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(unknown)}. Use {', '.join(INCLUDE_OPTIONS)}."
+        )
+    return list(dict.fromkeys(names))
+
+
+async def _load_requirements(db: AsyncSession, ids: list, include: list) -> dict:
+    stmt = select(Requirement).where(Requirement.id.in_(ids))
+    for name in include:
+        stmt = stmt.options(*INCLUDE_OPTIONS[name])
+    return {req.id: req for req in await db.scalars(stmt)}
+
+
+def _requirement_ref(req: Requirement) -> dict:
+    return {"id": req.id, "text": req.text, "page": req.page, "line": req.line, "jurisdiction": req.jurisdiction}
+
+
+def _conflicts(as_first, as_second, description: str) -> list:
+    pairs = [(c, c.requirement2) for c in as_first] + [(c, c.requirement1) for c in as_second]
+    return [
+        {
+            "id": conflict.id,
+            "jurisdiction": conflict.jurisdiction,
+            "description": getattr(conflict, description),
+            "requirement": _requirement_ref(other),
+        }
+        for conflict, other in sorted(pairs, key=lambda pair: pair[0].id)
+    ]
+
+
+def _expanded_requirement(req: Requirement, include: list) -> dict:
+    item = {
+        "id": req.id,
+        "text": req.text,
+        "risk_type": req.risk_type.value if req.risk_type else None,
+        "jurisdiction": req.jurisdiction,
+        "page": req.page,
+        "line": req.line,
+    }
+
+    # Only relationships loaded by INCLUDE_OPTIONS are touched: anything
+    # else would lazy-load, which an async session refuses
+    if "contradictions" in include:
+        item["contradictions"] = _conflicts(req.contradictions_as_first, req.contradictions_as_second, "description")
+    if "overlaps" in include:
+        item["overlaps"] = _conflicts(req.overlaps_as_first, req.overlaps_as_second, "reason")
+    if "document" in include:
+        document = req.document
+        item["document"] = None if document is None else {
+            "id": str(document.id),
+            "title": document.title,
+            "jurisdiction": document.jurisdiction,
+            "category_level": document.category_level.value,
+            "doc_type": document.doc_type.value,
+        }
+    return item
+
+
+# ------------------------------------------------------------
+# POST /requirements/batch  → up to BATCH_MAX_IDS requirements
+# ------------------------------------------------------------
+@router.post("/batch", response_model=RequirementsBatchResponse)
+async def batch_requirements(
+    request: RequirementsBatchRequest = Body(...),
+    include: Optional[str] = Query(None, description="Comma-separated: contradictions, overlaps, document"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+
+    names = _parse_include(include)
+    ids = list(dict.fromkeys(request.ids))
+    found = await _load_requirements(db, ids, names)
+
+    # Same order as requested; unknown ids are reported, not an error
+    items = [_expanded_requirement(found[rid], names) for rid in ids if rid in found]
+    missing = [rid for rid in ids if rid not in found]
+
+    return ORJSONResponse({"count": len(items), "items": items, "missing": missing})
+
+
 # ------------------------------------------------------------
 # GET /requirements/{id}  → JSON validated
 # ------------------------------------------------------------
 @router.get("/{requirement_id}", response_model=RequirementDetailResponse | RequirementNotFound)
-def get_requirement(requirement_id: int, db: Session = Depends(get_db)):
+async def get_requirement(
+    requirement_id: int,
+    include: Optional[str] = Query(None, description="Comma-separated: contradictions, overlaps, document"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
 
-    req = db.query(Requirement).filter(Requirement.id == requirement_id).first()
+    names = _parse_include(include)
+    req = (await _load_requirements(db, [requirement_id], names)).get(requirement_id)
 
     if not req:
         return RequirementNotFound(error="Requirement not found")
 
-    return RequirementDetailResponse(
-        id=req.id,
-        text=req.text,
-        risk_type=req.risk_type.value if req.risk_type else None,
-        jurisdiction=req.jurisdiction,
-        page=req.page,
-        line=req.line,
-        description=random.choice(SUGGESTED_SENTENCES)
-    )
+    return ORJSONResponse({
+        **_expanded_requirement(req, names),
+        "description": random.choice(SUGGESTED_SENTENCES),
+    })
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict
 
-from app.db.database import get_db
+from app.core.cache import summary_cache
+from app.db.database import get_async_read_db
+from app.db.models.aggregates import RiskCount
 from app.db.models.requirements import Requirement, RiskTypeEnum
 
 from app.api.v1.schemas.risks import (
@@ -33,28 +36,24 @@ RISK_DESCRIPTIONS = {
 # ------------------------------------------------------------
 # GET /risks/summary  → JSON validated
 # ------------------------------------------------------------
-@router.get("/summary", response_model=RiskSummaryResponse)
-def risk_summary(
-    jurisdiction: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-
-    query = db.query(Requirement)
+async def compute_risk_summary(db: AsyncSession, jurisdiction: Optional[str]) -> RiskSummaryResponse:
+    # Trigger-maintained risk_counts: one row per (jurisdiction, risk_type)
+    stmt = select(RiskCount.risk_type, func.sum(RiskCount.count))
 
     if jurisdiction:
-        query = query.filter(Requirement.jurisdiction == jurisdiction)
+        stmt = stmt.where(RiskCount.jurisdiction == jurisdiction)
 
-    requirements = query.all()
+    rows = (await db.execute(stmt.group_by(RiskCount.risk_type))).all()
 
-    if not requirements:
-        return RiskSummaryResponse(total=0, risks=[])
+    counts: Dict[str, int] = {r.value: 0 for r in RiskTypeEnum}
 
-    total = len(requirements)
+    for risk_type, count in rows:
+        counts[risk_type] += count
 
-    counts: Dict[str, int] = {r.value: 0 for r in RiskTypeEnum}
+    total = sum(counts.values())
 
-    for req in requirements:
-        counts[req.risk_type.value] += 1
+    if total == 0:
+        return RiskSummaryResponse(total=0, risks=[])
 
     risks = [
         RiskItem(
@@ -70,22 +69,39 @@ def risk_summary(
     return RiskSummaryResponse(total=total, risks=risks)
 
 
+@router.get("/summary", response_model=RiskSummaryResponse)
+async def risk_summary(
+    request: Request,
+    jurisdiction: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+
+    params = {"jurisdiction": jurisdiction}
+    cached = await summary_cache.lookup(request, db, "risks.summary", params)
+    if cached is not None:
+        return cached
+
+    version = summary_cache.version.value
+    result = await compute_risk_summary(db, jurisdiction)
+    return summary_cache.store(request, "risks.summary", params, result, version)
+
+
 # ------------------------------------------------------------
 # GET /risks/detail/{risk_type}  → JSON validated
 # ------------------------------------------------------------
 @router.get("/detail/{risk_type}", response_model=RiskDetailResponse)
-def risk_detail(
+async def risk_detail(
     risk_type: RiskTypeEnum,
     jurisdiction: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
 
-    query = db.query(Requirement).filter(Requirement.risk_type == risk_type)
+    stmt = select(Requirement).where(Requirement.risk_type == risk_type)
 
     if jurisdiction:
-        query = query.filter(Requirement.jurisdiction == jurisdiction)
+        stmt = stmt.where(Requirement.jurisdiction == jurisdiction)
 
-    requirements = query.all()
+    requirements = (await db.scalars(stmt)).all()
 
     items = [
         RequirementItem(
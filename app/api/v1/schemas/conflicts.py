@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class RequirementRef(BaseModel):
@@ -35,3 +35,50 @@ class ConflictsDetailResponse(BaseModel):
     count: int
     type: str
     items: List[ConflictItem]
+    next_cursor: Optional[str] = None
+
+
+class ConflictClusterResponse(BaseModel):
+    requirement_id: int
+    cluster_id: int
+    size: int
+    contradictions: int
+    overlaps: int
+    jurisdictions: Dict[str, int]
+    count: int
+    requirement_ids: List[int]
+
+
+class ConflictClusterSummary(BaseModel):
+    cluster_id: int
+    size: int
+    in_jurisdiction: int
+    contradictions: int
+    overlaps: int
+
+
+class ConflictClustersResponse(BaseModel):
+    jurisdiction: Optional[str]
+    count: int
+    items: List[ConflictClusterSummary]
+
+
+class GraphNode(BaseModel):
+    id: int
+    distance: int
+    jurisdiction: Optional[str]
+
+
+class GraphEdge(BaseModel):
+    id: int
+    type: str
+    source: int
+    target: int
+
+
+class ConflictNeighbourhoodResponse(BaseModel):
+    requirement_id: int
+    hops: int
+    truncated: bool
+    nodes: List[GraphNode]
+    edges: List[GraphEdge]
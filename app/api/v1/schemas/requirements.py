@@ -1,6 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
+from app.api.v1.schemas.conflicts import RequirementRef
+
+# Largest POST /requirements/batch request (one selectin IN list)
+BATCH_MAX_IDS = 500
+
 
 # ---------------------------------------
 # Shared structure: Requirement reference
@@ -21,6 +26,7 @@ class RequirementItem(BaseModel):
 class RequirementsListResponse(BaseModel):
     count: int
     items: List[RequirementItem]
+    next_cursor: Optional[str] = None
 
 
 # ---------------------------------------
@@ -41,6 +47,24 @@ class SuggestedRequirementsResponse(BaseModel):
     items: List[SuggestedRequirement]
 
 
+# ---------------------------------------
+# include= expansions (/requirements/{id} and /requirements/batch)
+# ---------------------------------------
+class RequirementConflict(BaseModel):
+    id: int
+    jurisdiction: Optional[str]
+    description: Optional[str]
+    requirement: RequirementRef     # the other requirement of the pair
+
+
+class DocumentRef(BaseModel):
+    id: str
+    title: Optional[str]
+    jurisdiction: Optional[str]
+    category_level: str
+    doc_type: str
+
+
 # ---------------------------------------
 # /requirements/{id} response
 # ---------------------------------------
@@ -52,7 +76,76 @@ class RequirementDetailResponse(BaseModel):
     page: Optional[int]
     line: Optional[int]
     description: str
+    # Only present when requested with include=
+    contradictions: Optional[List[RequirementConflict]] = None
+    overlaps: Optional[List[RequirementConflict]] = None
+    document: Optional[DocumentRef] = None
 
 
 class RequirementNotFound(BaseModel):
     error: str
+
+
+# ---------------------------------------
+# POST /requirements/batch
+# ---------------------------------------
+class RequirementsBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+
+
+class BatchRequirementItem(BaseModel):
+    id: int
+    text: str
+    risk_type: Optional[str]
+    jurisdiction: str
+    page: Optional[int]
+    line: Optional[int]
+    contradictions: Optional[List[RequirementConflict]] = None
+    overlaps: Optional[List[RequirementConflict]] = None
+    document: Optional[DocumentRef] = None
+
+
+class RequirementsBatchResponse(BaseModel):
+    count: int
+    items: List[BatchRequirementItem]
+    missing: List[int]
+
+
+# ---------------------------------------
+# /requirements/{id}/similar response
+# ---------------------------------------
+class SimilarRequirementItem(BaseModel):
+    id: int
+    text: str
+    risk_type: Optional[str]
+    jurisdiction: str
+    page: Optional[int]
+    line: Optional[int]
+    score: float
+
+
+class SimilarRequirementsResponse(BaseModel):
+    requirement_id: int
+    count: int
+    items: List[SimilarRequirementItem]
+
+
+# ---------------------------------------
+# /requirements/search response
+# ---------------------------------------
+class SearchRequirementItem(BaseModel):
+    id: int
+    text: str
+    risk_type: Optional[str]
+    jurisdiction: str
+    page: Optional[int]
+    line: Optional[int]
+    score: float
+    highlight: str
+
+
+class RequirementsSearchResponse(BaseModel):
+    query: str
+    count: int
+    items: List[SearchRequirementItem]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,185 @@
+# Versioned response cache for the summary endpoints.
+#
+# Entries are keyed on (endpoint, query params) and tagged with the data
+# version they were computed at. The version is a signature of the
+# trigger-maintained risk_counts / conflict_counts tables the summaries are
+# computed from, read from the database at most every
+# CACHE_VERSION_CHECK_SECONDS. A write from any process (seeding, ingestion,
+# overlap or MinHash runs) changes it, which makes every older entry stale
+# at once.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.aggregates import ConflictCount, RiskCount
+
+
+# ------------------------------------------------------------
+# Data version
+# ------------------------------------------------------------
+def _signature_statement(model):
+    # Row count and max id change with every delta row the Postgres triggers
+    # append; the id-weighted sum with every in-place SQLite update, even
+    # one that only moves a count from one key to another
+    return select(
+        func.count(),
+        func.max(model.id),
+        func.sum(model.count),
+        func.sum(cast(model.count, BigInteger) * model.id),
+    )
+
+
+class DataVersion:
+
+    def __init__(self, check_seconds: float):
+        self.check_seconds = check_seconds
+        self._value = ""
+        self._checked_at: Optional[float] = None
+
+    @property
+    def value(self) -> str:
+        return self._value
+
+    async def refresh(self, db: AsyncSession) -> str:
+        """Re-read the signature if the last check is older than check_seconds."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return self._value
+
+        # Claimed before awaiting: concurrent requests keep the current value
+        self._checked_at = now
+        rows = [
+            tuple((await db.execute(_signature_statement(model))).one())
+            for model in (RiskCount, ConflictCount)
+        ]
+        self._value = hashlib.sha256(repr(rows).encode()).hexdigest()[:16]
+        return self._value
+
+    def reset(self):
+        self._checked_at = None
+
+
+data_version = DataVersion(settings.CACHE_VERSION_CHECK_SECONDS)
+
+
+# ------------------------------------------------------------
+# LRU + TTL response cache
+# ------------------------------------------------------------
+class _Entry:
+    __slots__ = ("version", "etag", "body", "created")
+
+    def __init__(self, version: str, etag: str, body: bytes):
+        self.version = version
+        self.etag = etag
+        self.body = body
+        self.created = time.monotonic()
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries: int, ttl_seconds: float, version: DataVersion = data_version):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint: str, params: Dict) -> Tuple:
+        return (endpoint, tuple(sorted(params.items())))
+
+    def _get(self, key: Tuple) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expired = time.monotonic() - entry.created > self.ttl_seconds
+            if expired or entry.version != self.version.value:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    async def lookup(self, request: Request, db: AsyncSession, endpoint: str, params: Dict) -> Optional[Response]:
+        """Cached response (200, or 304 if the client's ETag matches), or None.
+
+        Refreshes the data version through `db` first, so `version.value`
+        afterwards is the version to store a freshly computed response under.
+        """
+        await self.version.refresh(db)
+        entry = self._get(self.key(endpoint, params))
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if entry.etag in _if_none_match(request):
+            self.not_modified += 1
+            return Response(status_code=304, headers=_headers(entry.etag))
+        return _json_response(entry.body, entry.etag)
+
+    def put(self, endpoint: str, params: Dict, model: BaseModel, version: Optional[str] = None) -> _Entry:
+        """Cache `model` under the data version read *before* computing it."""
+        body = model.model_dump_json().encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        entry = _Entry(self.version.value if version is None else version, etag, body)
+
+        with self._lock:
+            self._entries[self.key(endpoint, params)] = entry
+            self._entries.move_to_end(self.key(endpoint, params))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def store(self, request: Request, endpoint: str, params: Dict, model: BaseModel,
+              version: Optional[str] = None) -> Response:
+        """put() and answer the request (304 if it already holds this ETag)."""
+        entry = self.put(endpoint, params, model, version)
+
+        if entry.etag in _if_none_match(request):
+            return Response(status_code=304, headers=_headers(entry.etag))
+        return _json_response(entry.body, entry.etag)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "data_version": self.version.value,
+        }
+
+
+def _if_none_match(request: Request):
+    header = request.headers.get("if-none-match", "")
+    return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+
+def _headers(etag: str) -> Dict[str, str]:
+    # no-cache: clients may keep the body but must revalidate every time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _json_response(body: bytes, etag: str) -> Response:
+    return Response(content=body, media_type="application/json", headers=_headers(etag))
+
+
+summary_cache = ResponseCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
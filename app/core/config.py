@@ -1,8 +1,61 @@
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
 
+    # Async driver URL for the API; derived from DATABASE_URL if unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Read replicas for GET endpoints: one URL or several, comma-separated
+    READ_DATABASE_URL: Optional[str] = None
+
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Per-statement timeout (Postgres only); None disables it
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+
+    # Summary response cache (app/core/cache.py)
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_TTL_SECONDS: float = 60.0
+    # How often the data version is re-read from the summary tables
+    CACHE_VERSION_CHECK_SECONDS: float = 1.0
+
+    # Exact embedding index (app/similarity/index.py): reloaded on the first
+    # /similar request after this many seconds if the stored vectors changed
+    EMBEDDING_INDEX_SYNC_SECONDS: float = 30.0
+
+    # Directory of the persisted ANN index (app/similarity/ann.py)
+    ANN_INDEX_DIR: Optional[str] = None
+
+    # In-memory conflict graph (app/graph/conflicts.py): new conflicts are
+    # merged in on the first graph request after this many seconds
+    CONFLICT_GRAPH_SYNC_SECONDS: float = 30.0
+
+    # Pre-load the embedding matrix and summary caches before serving
+    STARTUP_WARMUP: bool = False
+
+    # Opt-in request profiling (app/core/profiling.py); nothing is installed
+    # unless enabled. PROFILING_TOKEN authorizes on-demand profiles and the
+    # /profiles endpoints; PROFILING_SAMPLE_EVERY=N profiles 1 in N per route.
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_DIR: Optional[str] = None
+    PROFILING_MAX_PROFILES: int = 50
+    PROFILING_SAMPLE_EVERY: int = 0
+
+    @property
+    def read_database_urls(self) -> List[str]:
+        if not self.READ_DATABASE_URL:
+            return []
+        return [url.strip() for url in self.READ_DATABASE_URL.split(",") if url.strip()]
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,269 @@
+# Per-request performance instrumentation, exposed in Prometheus text format.
+#
+# MetricsMiddleware opens a RequestStats for every HTTP request in a
+# context variable. Engine-level SQLAlchemy events (all engines of the
+# process, sync and async) add each statement's count, DB time and rows
+# fetched to it, and the timed pool classes record how long a checkout
+# waited for a connection. When the request finishes, the totals go into
+# per-route histograms served by GET /metrics.
+#
+# Rows fetched are counted for buffered results: the DBAPI rowcount of a
+# SELECT where the driver reports it (psycopg2, asyncpg), otherwise the
+# rows the async adapter already buffered (aiosqlite). Server-side cursors
+# (stream / yield_per) are not counted.
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter as StatementCounter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger("regis.metrics")
+
+# One statement text repeated this many times in a request: an N+1 pattern
+N_PLUS_ONE_THRESHOLD = 10
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10_000, 100_000, 1_000_000)
+WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+# ------------------------------------------------------------
+# Minimal Prometheus metric types
+# ------------------------------------------------------------
+def _labels(names: Sequence[str], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Histogram:
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple, List] = {}   # labels → [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            names = self.labelnames + ("le",)
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (repr(float(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {values[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {values[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {values[-1]}")
+        return lines
+
+
+class Counter:
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "regis_http_request_duration_seconds", "HTTP request latency, including a streamed body.",
+    LATENCY_BUCKETS, ("method", "route")
+)
+REQUESTS = Counter("regis_http_requests_total", "HTTP requests by response status.", ("method", "route", "status"))
+STATEMENTS = Histogram(
+    "regis_db_statements_per_request", "SQL statements executed per request.", COUNT_BUCKETS, ("route",)
+)
+DB_TIME = Histogram(
+    "regis_db_time_per_request_seconds", "Time spent executing SQL per request.", LATENCY_BUCKETS, ("route",)
+)
+ROWS = Histogram("regis_db_rows_fetched_per_request", "Rows fetched per request.", ROW_BUCKETS, ("route",))
+POOL_WAIT = Histogram(
+    "regis_db_pool_checkout_wait_seconds", "Time waiting for a pooled connection.", WAIT_BUCKETS, ("pool",)
+)
+N_PLUS_ONE = Counter(
+    "regis_db_n_plus_one_total", "Requests that repeated one statement per row (N+1).", ("route",)
+)
+
+METRICS = [REQUEST_LATENCY, REQUESTS, STATEMENTS, DB_TIME, ROWS, POOL_WAIT, N_PLUS_ONE]
+
+# Pools to report as gauges: label → pool
+_pools: Dict[str, object] = {}
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+
+    for name, help, read in [
+        ("regis_db_pool_checked_out", "Connections currently checked out.", lambda p: p.checkedout()),
+        ("regis_db_pool_idle", "Idle connections in the pool.", lambda p: p.checkedin()),
+        ("regis_db_pool_overflow", "Connections opened beyond pool_size.", lambda p: max(p.overflow(), 0)),
+    ]:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+        lines += [f"{name}{_labels(('pool',), (label,))} {read(pool)}" for label, pool in sorted(_pools.items())]
+
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------------
+# Per-request totals
+# ------------------------------------------------------------
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "rows", "by_statement")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.by_statement = StatementCounter()
+
+
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "regis_request_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if current_request.get() is not None:
+        conn.info.setdefault("regis_statement_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    if stats is None:
+        return
+
+    starts = conn.info.get("regis_statement_start")
+    if starts:
+        stats.db_seconds += time.perf_counter() - starts.pop()
+    stats.statements += 1
+    stats.by_statement[statement] += 1
+
+    if cursor.description is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            stats.rows += cursor.rowcount
+        else:
+            stats.rows += len(getattr(cursor, "_rows", None) or ())
+
+
+# ------------------------------------------------------------
+# Pools that time their checkouts
+# ------------------------------------------------------------
+class _TimedCheckout:
+    label = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start, self.label)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def register_pool(pool, label: str):
+    """Name a pool for the checkout-wait histogram and the pool gauges."""
+    if isinstance(pool, _TimedCheckout):
+        pool.label = label
+    if isinstance(pool, QueuePool):
+        _pools[label] = pool
+
+
+# ------------------------------------------------------------
+# ASGI middleware
+# ------------------------------------------------------------
+class MetricsMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            elapsed = time.perf_counter() - start
+            # Route template (FastAPI stores the matched route in the scope)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+
+            REQUEST_LATENCY.observe(elapsed, method, route)
+            REQUESTS.inc(method, route, status)
+            STATEMENTS.observe(stats.statements, route)
+            DB_TIME.observe(stats.db_seconds, route)
+            ROWS.observe(stats.rows, route)
+
+            if stats.by_statement:
+                statement, repeats = stats.by_statement.most_common(1)[0]
+                if repeats >= N_PLUS_ONE_THRESHOLD:
+                    N_PLUS_ONE.inc(route)
+                    logger.warning(
+                        "N+1 query pattern on %s %s: %d statements, one repeated %d times: %s",
+                        method, route, stats.statements, repeats, " ".join(statement.split())[:200]
+                    )
@@ -0,0 +1,234 @@
+# Opt-in per-request profiling.
+#
+# Only installed when PROFILING_ENABLED is set (see app/main.py), so a
+# disabled deployment runs no profiling code at all. Once installed:
+#
+#   * a request carrying the admin token (X-Profile-Token header or
+#     ?profile_token= query flag) runs under cProfile; the profile is saved
+#     to a bounded on-disk ring and its URL returned in X-Profile-URL;
+#   * with PROFILING_SAMPLE_EVERY=N, every Nth request of each route is
+#     profiled too and merged into that route's aggregate profile.
+#
+# cProfile is deterministic and per-thread: it records the event-loop
+# thread, so work handed to the threadpool shows up as time spent waiting.
+# Other requests served by the loop meanwhile are recorded as well, so only
+# one request is profiled at a time: a token-carrying request that arrives
+# meanwhile is served unprofiled with X-Profile-Skipped: busy. Profiles are
+# written to disk from the threadpool, never on the event loop.
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import secrets
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "regis-profiles")
+PROFILE_ID_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+AGGREGATE_PREFIX = "aggregate-"
+
+
+def _slug(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+# ------------------------------------------------------------
+# Bounded on-disk ring of profiles
+# ------------------------------------------------------------
+class ProfileStore:
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._aggregates: Dict[str, pstats.Stats] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def new_id(self, route: str) -> str:
+        return f"{int(time.time() * 1000)}-{_slug(route)}-{secrets.token_hex(3)}"
+
+    def path(self, profile_id: str) -> Optional[str]:
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        path = os.path.join(self.directory, profile_id + ".prof")
+        return path if os.path.exists(path) else None
+
+    def save(self, profile_id: str, profiler: cProfile.Profile):
+        profiler.dump_stats(os.path.join(self.directory, profile_id + ".prof"))
+        self._prune()
+
+    def add_to_aggregate(self, route: str, profiler: cProfile.Profile):
+        profile_id = AGGREGATE_PREFIX + _slug(route)
+        with self._lock:
+            stats = self._aggregates.get(profile_id)
+            if stats is None:
+                stats = self._aggregates[profile_id] = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+            stats.dump_stats(os.path.join(self.directory, profile_id + ".prof"))
+
+    def _profiles(self) -> List[os.DirEntry]:
+        return sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".prof")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+
+    def _prune(self):
+        with self._lock:
+            singles = [e for e in self._profiles() if not e.name.startswith(AGGREGATE_PREFIX)]
+            for entry in singles[:max(len(singles) - self.max_profiles, 0)]:
+                os.remove(entry.path)
+
+    def list(self) -> List[Dict]:
+        return [
+            {
+                "id": entry.name[:-len(".prof")],
+                "aggregate": entry.name.startswith(AGGREGATE_PREFIX),
+                "bytes": entry.stat().st_size,
+                "modified": entry.stat().st_mtime,
+            }
+            for entry in reversed(self._profiles())
+        ]
+
+    def summary(self, profile_id: str, limit: int = 40) -> Optional[str]:
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+def token_matches(token: Optional[str], candidate: Optional[str]) -> bool:
+    return bool(token) and bool(candidate) and hmac.compare_digest(token, candidate)
+
+
+# ------------------------------------------------------------
+# ASGI middleware
+# ------------------------------------------------------------
+def _with_headers(send, headers):
+    async def send_wrapper(message):
+        if message["type"] == "http.response.start":
+            message["headers"] = list(message.get("headers", [])) + headers
+        await send(message)
+    return send_wrapper
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, app, router, store: ProfileStore, token: Optional[str], sample_every: int,
+                 url_prefix: str = "/profiles"):
+        self.app = app
+        self.router = router
+        self.store = store
+        self.token = token
+        self.sample_every = sample_every
+        self.url_prefix = url_prefix
+        self._seen: Dict[str, int] = defaultdict(int)
+        self._busy = False
+
+    def _requested(self, scope) -> bool:
+        if not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == b"x-profile-token":
+                return token_matches(self.token, value.decode("latin-1"))
+        query = scope.get("query_string", b"")
+        if b"profile_token=" in query:
+            return token_matches(self.token, parse_qs(query.decode("latin-1")).get("profile_token", [None])[0])
+        return False
+
+    def _route(self, scope) -> str:
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+
+    def _sampled(self, route: str) -> bool:
+        self._seen[route] += 1
+        return self._seen[route] % self.sample_every == 0
+
+    async def __call__(self, scope, receive, send):
+        # Never the /profiles endpoints themselves
+        if scope["type"] != "http" or scope["path"].startswith(self.url_prefix):
+            return await self.app(scope, receive, send)
+
+        requested = self._requested(scope)
+
+        # One profile at a time: tell an operator asking for one to retry
+        if self._busy:
+            if requested:
+                send = _with_headers(send, [(b"x-profile-skipped", b"busy")])
+            return await self.app(scope, receive, send)
+
+        route = None
+        if not requested:
+            if not self.sample_every:
+                return await self.app(scope, receive, send)
+            route = self._route(scope)
+            if not self._sampled(route):
+                return await self.app(scope, receive, send)
+
+        route = route or self._route(scope)
+        profile_id = self.store.new_id(route) if requested else None
+        if profile_id:
+            send = _with_headers(send, [
+                (b"x-profile-id", profile_id.encode()),
+                (b"x-profile-url", f"{self.url_prefix}/{profile_id}".encode()),
+            ])
+
+        self._busy = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._busy = False
+            # dump_stats and the ring prune are disk I/O: keep them off the loop
+            if profile_id:
+                await run_in_threadpool(self.store.save, profile_id, profiler)
+            else:
+                await run_in_threadpool(self.store.add_to_aggregate, route, profiler)
+
+
+# ------------------------------------------------------------
+# /profiles: list, download (.prof for pstats/snakeviz) or text summary
+# ------------------------------------------------------------
+def profiles_router(store: ProfileStore, token: Optional[str]) -> APIRouter:
+    router = APIRouter(prefix="/profiles", tags=["Profiling"])
+
+    def authorize(
+        x_profile_token: Optional[str] = Header(None),
+        profile_token: Optional[str] = Query(None)
+    ):
+        if not token_matches(token, x_profile_token or profile_token):
+            raise HTTPException(status_code=403, detail="Profiling token required.")
+
+    @router.get("", dependencies=[Depends(authorize)])
+    def list_profiles():
+        return store.list()
+
+    @router.get("/{profile_id}", dependencies=[Depends(authorize)])
+    def get_profile(profile_id: str, format: str = Query("prof", pattern="^(prof|text)$")):
+        path = store.path(profile_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found.")
+        if format == "text":
+            return PlainTextResponse(store.summary(profile_id))
+        return FileResponse(path, media_type="application/octet-stream", filename=profile_id + ".prof")
+
+    return router
@@ -0,0 +1,102 @@
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select, text
+from starlette.concurrency import run_in_threadpool
+
+from app.api.v1.conflicts import compute_conflicts_summary
+from app.api.v1.risks import compute_risk_summary
+from app.core.cache import summary_cache
+from app.db.database import AsyncReadSession
+from app.db.models.aggregates import NO_JURISDICTION, ConflictCount, RiskCount
+from app.graph.conflicts import get_conflict_graph
+from app.similarity.ann import load_ann_index
+from app.similarity.index import get_embedding_index
+
+
+# ------------------------------------------------------------
+# Startup state, reported by GET /ready
+# ------------------------------------------------------------
+class StartupState:
+
+    def __init__(self):
+        self.started = False
+        self.warmup: Dict[str, Optional[float]] = {}
+        self.errors: Dict[str, str] = {}
+
+    def timed(self, name: str, seconds: float):
+        self.warmup[name] = round(seconds * 1000, 2)
+
+    def failed(self, name: str, error: Exception):
+        self.warmup[name] = None
+        self.errors[name] = f"{type(error).__name__}: {error}"
+
+
+startup_state = StartupState()
+
+
+# ------------------------------------------------------------
+# Warmup steps
+# ------------------------------------------------------------
+async def warm_summaries():
+    """Fill the summary cache for every jurisdiction (plus the unfiltered view)."""
+    async with AsyncReadSession() as db:
+        await summary_cache.version.refresh(db)
+        risk_jurisdictions = (await db.scalars(select(RiskCount.jurisdiction).distinct())).all()
+        conflict_jurisdictions = (await db.scalars(
+            select(ConflictCount.jurisdiction).where(ConflictCount.jurisdiction != NO_JURISDICTION).distinct()
+        )).all()
+
+        for jurisdiction in [None, *risk_jurisdictions]:
+            version = summary_cache.version.value
+            result = await compute_risk_summary(db, jurisdiction)
+            summary_cache.put("risks.summary", {"jurisdiction": jurisdiction}, result, version)
+
+        for jurisdiction in [None, *conflict_jurisdictions]:
+            version = summary_cache.version.value
+            result = await compute_conflicts_summary(db, jurisdiction)
+            summary_cache.put("conflicts.summary", {"jurisdiction": jurisdiction}, result, version)
+
+
+async def warm_embeddings():
+    await run_in_threadpool(get_embedding_index)
+
+
+async def warm_conflict_graph():
+    await run_in_threadpool(get_conflict_graph)
+
+
+async def _step(name: str, coro_fn):
+    start = time.perf_counter()
+    try:
+        await coro_fn()
+    except Exception as error:  # a dead database must not stop the worker
+        startup_state.failed(name, error)
+        print(f" Warmup '{name}' failed: {error}")
+    else:
+        startup_state.timed(name, time.perf_counter() - start)
+
+
+async def startup(warmup: bool):
+    # Memory-map the persisted ANN index (no DB access, no rebuild)
+    start = time.perf_counter()
+    load_ann_index()
+    startup_state.timed("ann_index", time.perf_counter() - start)
+
+    # Everything else touches the database: the pool opens on first use
+    if warmup:
+        await _step("embeddings", warm_embeddings)
+        await _step("summaries", warm_summaries)
+        await _step("conflict_graph", warm_conflict_graph)
+
+    startup_state.started = True
+
+
+async def database_ready() -> Optional[str]:
+    """None if a read connection answers, otherwise the error."""
+    try:
+        async with AsyncReadSession() as db:
+            await db.execute(text("SELECT 1"))
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
@@ -0,0 +1,171 @@
+# backend/app/db/aggregates.py
+#
+# Maintenance of the risk_counts / conflict_counts summary tables.
+#
+#   python -m app.db.aggregates check     # compare against live counts
+#   python -m app.db.aggregates compact   # fold delta rows, one row per key
+#   python -m app.db.aggregates rebuild   # recreate tables and triggers, recount
+#
+# Bulk loaders run without the count triggers (triggers_suspended) and
+# recount once when they are done.
+
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal, engine
+from app.db.models.aggregates import (
+    CONFLICT_SOURCES,
+    NO_JURISDICTION,
+    ConflictCount,
+    RiskCount,
+    drop_triggers,
+    install_triggers,
+)
+from app.db.models.requirements import Contradiction, Overlap, Requirement
+
+CONFLICT_MODELS = {"contradiction": Contradiction, "overlap": Overlap}
+
+
+def live_risk_counts(db: Session) -> Dict[Tuple[str, str], int]:
+    rows = db.execute(
+        select(Requirement.jurisdiction, Requirement.risk_type, func.count())
+        .group_by(Requirement.jurisdiction, Requirement.risk_type)
+    )
+    return {(jurisdiction, risk.value): count for jurisdiction, risk, count in rows}
+
+
+def live_conflict_counts(db: Session) -> Dict[Tuple[str, str], int]:
+    counts = {}
+    for _, conflict_type in CONFLICT_SOURCES:
+        model = CONFLICT_MODELS[conflict_type]
+        jurisdiction = func.coalesce(model.jurisdiction, NO_JURISDICTION)
+        for value, count in db.execute(select(jurisdiction, func.count()).group_by(jurisdiction)):
+            counts[(value, conflict_type)] = count
+    return counts
+
+
+def stored_counts(db: Session, model, type_column) -> Dict[Tuple[str, str], int]:
+    total = func.sum(model.count)
+    rows = db.execute(
+        select(model.jurisdiction, type_column, total).group_by(model.jurisdiction, type_column).having(total != 0)
+    )
+    return {(jurisdiction, kind): count for jurisdiction, kind, count in rows}
+
+
+def _fold(model, type_column, source):
+    keys = [source.c.jurisdiction, source.c[type_column.key]]
+    total = func.sum(source.c.count)
+    return insert(model).from_select(
+        ["jurisdiction", type_column.key, "count"],
+        select(*keys, total).group_by(*keys).having(total != 0)
+    )
+
+
+def compact(db: Session):
+    """Fold the delta rows of both tables into one row per key."""
+    postgresql = db.get_bind().dialect.name == "postgresql"
+
+    for model, type_column in ((RiskCount, RiskCount.risk_type), (ConflictCount, ConflictCount.conflict_type)):
+        if postgresql:
+            # One statement: exactly the rows it deletes come back summed, and
+            # deltas the triggers append meanwhile are left alone
+            moved = delete(model).returning(model.jurisdiction, type_column, model.count).cte("moved")
+            db.execute(_fold(model, type_column, moved))
+            continue
+
+        # SQLite: one writer at a time, so rows past `last` are newer deltas
+        last = db.scalar(select(func.max(model.id)))
+        if last is not None:
+            db.execute(_fold(model, type_column, select(model).where(model.id <= last).subquery()))
+            db.execute(delete(model).where(model.id <= last))
+    db.commit()
+
+
+def recount(connection):
+    """Recreate both tables and their triggers, and recount from scratch,
+    inside the caller's transaction.
+
+    Dropping the tables also migrates them from the one-row-per-key layout
+    of earlier versions.
+    """
+    for model in (RiskCount, ConflictCount):
+        model.__table__.drop(connection, checkfirst=True)
+        model.__table__.create(connection)
+    install_triggers(connection)
+
+    risk_rows = [
+        {"jurisdiction": j, "risk_type": r, "count": c}
+        for (j, r), c in live_risk_counts(connection).items()
+    ]
+    conflict_rows = [
+        {"jurisdiction": j, "conflict_type": t, "count": c}
+        for (j, t), c in live_conflict_counts(connection).items()
+    ]
+    if risk_rows:
+        connection.execute(insert(RiskCount), risk_rows)
+    if conflict_rows:
+        connection.execute(insert(ConflictCount), conflict_rows)
+
+
+def rebuild(db: Session):
+    recount(db.connection())
+    db.commit()
+
+
+@contextmanager
+def triggers_suspended():
+    """Run a bulk load, possibly from several worker processes, without the
+    count triggers.
+
+    They are dropped and committed on entry, so every worker connection
+    loads without them, and rebuilt with one recount on exit, also when the
+    load fails. A process killed inside leaves them dropped until the next
+    rebuild: `check` reports the drift.
+    """
+    with SessionLocal() as db:
+        drop_triggers(db.connection())
+        db.commit()
+    try:
+        yield
+    finally:
+        with SessionLocal() as db:
+            rebuild(db)
+
+
+def check(db: Session) -> List[str]:
+    """Differences between the summary tables and live counts (empty if consistent)."""
+    problems = []
+    for name, live, stored in [
+        ("risk_counts", live_risk_counts(db), stored_counts(db, RiskCount, RiskCount.risk_type)),
+        ("conflict_counts", live_conflict_counts(db), stored_counts(db, ConflictCount, ConflictCount.conflict_type)),
+    ]:
+        for key in sorted(set(live) | set(stored)):
+            if live.get(key, 0) != stored.get(key, 0):
+                problems.append(f"{name} {key}: stored {stored.get(key, 0)}, live {live.get(key, 0)}")
+    return problems
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            print(f" Rebuilding summary tables ({engine.dialect.name})...")
+            rebuild(db)
+            print(" Summary tables ready!")
+        elif command == "compact":
+            compact(db)
+            print(" Summary tables compacted.")
+        else:
+            problems = check(db)
+            for problem in problems:
+                print(f"   ✗ {problem}")
+            print(" Summary tables consistent." if not problems else f" {len(problems)} inconsistencies.")
+            sys.exit(1 if problems else 0)
+    finally:
+        db.close()
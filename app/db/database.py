@@ -1,8 +1,80 @@
-from sqlalchemy import create_engine
+import itertools
+from typing import List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, register_pool
+
+# ---------------------------------------------------------
+# Engine options (pooling, statement timeout) from Settings
+# ---------------------------------------------------------
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    """Same database as `url`, through the async driver of its dialect."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.get_driver_name() == driver:
+        return url
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    parsed = make_url(url)
+
+    # In-memory SQLite lives in a single connection: nothing to pool
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+
+    options = dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    # Explicit pool classes: SQLAlchemy would pick NullPool for aiosqlite
+    # files, and these subclasses time checkout waits (app/core/metrics.py)
+    options["poolclass"] = TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool
+    return options
+
+
+def _apply_statement_timeout(sync_engine):
+    if not settings.DB_STATEMENT_TIMEOUT_MS or sync_engine.dialect.name != "postgresql":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+        cursor.close()
+
+
+def make_engine(url: str, pool_label: str = "sync"):
+    new_engine = create_engine(url, **engine_options(url))
+    _apply_statement_timeout(new_engine)
+    register_pool(new_engine.pool, pool_label)
+    return new_engine
 
-engine = create_engine(settings.DATABASE_URL)
+
+def make_async_engine(url: str, pool_label: str = "primary"):
+    async_url = async_database_url(url)
+    new_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    _apply_statement_timeout(new_engine.sync_engine)
+    register_pool(new_engine.sync_engine.pool, pool_label)
+    return new_engine
+
+
+# ---------------------------------------------------------
+# Sync engine: scripts (init_db, seed_data, ingestion, ...)
+# ---------------------------------------------------------
+engine = make_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -12,3 +84,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---------------------------------------------------------
+# Async engines: API routers
+# ---------------------------------------------------------
+# Primary: every write goes here
+async_engine = make_async_engine(settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read replicas: GET endpoints, round-robin; the primary if none configured
+read_async_engines: List = [
+    make_async_engine(url, pool_label=f"replica-{i}") for i, url in enumerate(settings.read_database_urls)
+]
+AsyncReadSessionLocals = [
+    async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+    for read_engine in read_async_engines
+] or [AsyncSessionLocal]
+_read_sessions = itertools.cycle(AsyncReadSessionLocals)
+
+def AsyncReadSession() -> AsyncSession:
+    return next(_read_sessions)()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSession() as db:
+        yield db
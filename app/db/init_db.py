@@ -7,10 +7,14 @@ from app.db.models.requirements import (
     Requirement,
     Contradiction,
     Overlap,
-    RequirementEmbedding
+    RequirementEmbedding,
+    RequirementMinHash,
+    RequirementLSHBucket,
 )
 
-from app.db.models.document import Document
+from app.db.models.document import Document, DocumentStage
+from app.db.models.aggregates import RiskCount, ConflictCount
+from app.db.models import search  # full-text index DDL
 
 def init_db():
     print(" Creating database tables...")
@@ -0,0 +1,83 @@
+# backend/app/db/migrate_embeddings.py
+#
+# Converts RequirementEmbedding rows stored as JSON text into the binary
+# float32 format (vector, dimension, norm). Safe to re-run: only rows
+# without a vector are touched.
+
+from sqlalchemy import inspect, select, text, update
+
+from app.db.database import SessionLocal, engine
+from app.db.models.requirements import RequirementEmbedding
+from app.similarity.codec import decode_json_embedding, encode_embedding
+
+BATCH_SIZE = 1000
+
+NEW_COLUMNS = {
+    "vector": "BYTEA",
+    "dimension": "INTEGER",
+    "norm": "DOUBLE PRECISION",
+}
+
+
+def add_missing_columns():
+    existing = {c["name"] for c in inspect(engine).get_columns("requirement_embeddings")}
+
+    with engine.begin() as conn:
+        for name, pg_type in NEW_COLUMNS.items():
+            if name in existing:
+                continue
+            col_type = "BLOB" if engine.dialect.name == "sqlite" and name == "vector" else pg_type
+            conn.execute(text(f"ALTER TABLE requirement_embeddings ADD COLUMN {name} {col_type}"))
+
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE requirement_embeddings ALTER COLUMN embedding DROP NOT NULL"))
+
+
+def migrate(drop_json: bool = False):
+    print(" Migrating JSON embeddings to float32 binary...")
+    add_missing_columns()
+
+    db = SessionLocal()
+    migrated = 0
+    last_id = 0
+
+    try:
+        while True:
+            rows = db.execute(
+                select(RequirementEmbedding.id, RequirementEmbedding.embedding)
+                .where(RequirementEmbedding.vector.is_(None))
+                .where(RequirementEmbedding.embedding.isnot(None))
+                .where(RequirementEmbedding.id > last_id)
+                .order_by(RequirementEmbedding.id)
+                .limit(BATCH_SIZE)
+            ).all()
+
+            if not rows:
+                break
+
+            params = []
+            for row_id, raw in rows:
+                blob, dimension, norm = encode_embedding(decode_json_embedding(raw))
+                params.append({
+                    "id": row_id,
+                    "vector": blob,
+                    "dimension": dimension,
+                    "norm": norm,
+                    "embedding": None if drop_json else raw,
+                })
+
+            db.execute(update(RequirementEmbedding), params)
+            db.commit()
+
+            migrated += len(rows)
+            last_id = rows[-1][0]
+            print(f"   Migrated {migrated} embeddings...")
+    finally:
+        db.close()
+
+    print(f" Done! {migrated} embeddings converted.")
+
+
+if __name__ == "__main__":
+    import sys
+    migrate(drop_json="--drop-json" in sys.argv)
@@ -1,5 +1,14 @@
 # backend/app/db/models/__init__.py
 
 from .enums import RiskTypeEnum, JurisdictionEnum
-from .requirements import Requirement, Contradiction, Overlap, RequirementEmbedding
-from .document import Document
+from .requirements import (
+    Requirement,
+    Contradiction,
+    Overlap,
+    RequirementEmbedding,
+    RequirementMinHash,
+    RequirementLSHBucket,
+)
+from .document import Document, DocumentStage
+from .aggregates import RiskCount, ConflictCount
+from . import search
@@ -0,0 +1,242 @@
+from sqlalchemy import Column, Integer, String, DDL, Index, event
+
+from app.db.database import Base
+
+
+# =====================================================
+# CONTADORES AGREGADOS (mantenidos por triggers)
+# =====================================================
+#
+# Los triggers de abajo los actualizan en cada INSERT, UPDATE o DELETE sobre
+# las tablas origen, incluidos los INSERT masivos de Core que no pasan por
+# el ORM. Reparación: python -m app.db.aggregates rebuild
+#
+# Cada clave (jurisdicción, tipo) puede tener varias filas: el total es
+# SUM(count). En PostgreSQL los triggers son por sentencia y solo AÑADEN
+# una fila delta por clave (tablas de transición), así que los workers de
+# ingesta en paralelo no se bloquean en una fila contador caliente ni se
+# interbloquean. python -m app.db.aggregates compact junta los deltas en
+# una fila por clave.
+#
+# Las cargas masivas (seed_data, ingesta de corpus, pipeline) quitan los
+# triggers mientras cargan y recuentan una sola vez al final
+# (app.db.aggregates.rebuild): en SQLite el trigger por fila multiplica el
+# coste de cada INSERT.
+
+# Las jurisdicciones NULL de contradictions/overlaps se guardan como ''
+NO_JURISDICTION = ""
+
+
+class RiskCount(Base):
+    __tablename__ = "risk_counts"
+
+    id = Column(Integer, primary_key=True)
+    jurisdiction = Column(String, nullable=False)
+    risk_type = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_risk_counts_jurisdiction_risk_type", "jurisdiction", "risk_type"),
+    )
+
+
+class ConflictCount(Base):
+    __tablename__ = "conflict_counts"
+
+    id = Column(Integer, primary_key=True)
+    jurisdiction = Column(String, nullable=False)
+    conflict_type = Column(String, nullable=False)   # "contradiction" | "overlap"
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_conflict_counts_jurisdiction_conflict_type", "jurisdiction", "conflict_type"),
+    )
+
+
+# (tabla origen, tipo de conflicto)
+CONFLICT_SOURCES = [
+    ("contradictions", "contradiction"),
+    ("requirement_overlaps", "overlap"),
+]
+
+
+# -----------------------------------------------------
+# SQLite (un solo escritor a la vez: basta una fila por clave)
+# -----------------------------------------------------
+def _sqlite_upsert(table, key_columns, key_values, delta):
+    columns = ", ".join(key_columns)
+    where = " AND ".join(f"{c} = {v}" for c, v in zip(key_columns, key_values))
+    return (
+        f"INSERT INTO {table} ({columns}, count) SELECT {', '.join(key_values)}, 0 "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE {where}); "
+        f"UPDATE {table} SET count = count {delta} "
+        f"WHERE id = (SELECT MIN(id) FROM {table} WHERE {where});"
+    )
+
+
+def sqlite_triggers():
+    risk = lambda row, delta: _sqlite_upsert(  # noqa: E731
+        "risk_counts", ["jurisdiction", "risk_type"], [f"{row}.jurisdiction", f"{row}.risk_type"], delta
+    )
+    statements = [
+        f"CREATE TRIGGER IF NOT EXISTS trg_risk_counts_insert AFTER INSERT ON requirements "
+        f"BEGIN {risk('NEW', '+ 1')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_risk_counts_delete AFTER DELETE ON requirements "
+        f"BEGIN {risk('OLD', '- 1')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_risk_counts_update AFTER UPDATE OF jurisdiction, risk_type "
+        f"ON requirements BEGIN {risk('OLD', '- 1')} {risk('NEW', '+ 1')} END",
+    ]
+
+    for table, conflict_type in CONFLICT_SOURCES:
+        conflict = lambda row, delta: _sqlite_upsert(  # noqa: E731
+            "conflict_counts", ["jurisdiction", "conflict_type"],
+            [f"COALESCE({row}.jurisdiction, '')", f"'{conflict_type}'"], delta
+        )
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_counts_insert AFTER INSERT ON {table} "
+            f"BEGIN {conflict('NEW', '+ 1')} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_counts_delete AFTER DELETE ON {table} "
+            f"BEGIN {conflict('OLD', '- 1')} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_counts_update AFTER UPDATE OF jurisdiction ON {table} "
+            f"BEGIN {conflict('OLD', '- 1')} {conflict('NEW', '+ 1')} END",
+        ]
+    return statements
+
+
+# -----------------------------------------------------
+# PostgreSQL
+# -----------------------------------------------------
+# Triggers por sentencia con tablas de transición (old_rows / new_rows):
+# un INSERT masivo de 1000 filas añade una fila delta por clave, sin
+# ON CONFLICT ni bloqueos sobre filas existentes. Las tablas de transición
+# no admiten lista de columnas en UPDATE: el delta neto descarta las claves
+# que no cambian.
+_PG_DELTAS = {
+    "INSERT": "SELECT {key}, 1 AS delta FROM new_rows",
+    "DELETE": "SELECT {key}, -1 AS delta FROM old_rows",
+    "UPDATE": "SELECT {key}, 1 AS delta FROM new_rows UNION ALL SELECT {key}, -1 FROM old_rows",
+}
+_PG_REFERENCING = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+}
+
+
+def _pg_count_function(name, table, type_column, key):
+    branches = "".join(
+        f"""
+            {'IF' if i == 0 else 'ELSIF'} TG_OP = '{op}' THEN
+                INSERT INTO {table} (jurisdiction, {type_column}, count)
+                SELECT jurisdiction, kind, SUM(delta) FROM ({query.format(key=key)}) AS changes
+                GROUP BY jurisdiction, kind HAVING SUM(delta) <> 0;"""
+        for i, (op, query) in enumerate(_PG_DELTAS.items())
+    )
+    return f"""
+        CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+        BEGIN{branches}
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql
+        """
+
+
+def _pg_count_triggers(table, function, row_trigger):
+    # El trigger por fila de versiones anteriores se sustituye
+    statements = [f"DROP TRIGGER IF EXISTS {row_trigger} ON {table}"]
+    for op, referencing in _PG_REFERENCING.items():
+        name = f"trg_{table}_counts_{op.lower()}"
+        statements += [
+            f"DROP TRIGGER IF EXISTS {name} ON {table}",
+            f"CREATE TRIGGER {name} AFTER {op} ON {table} {referencing} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+        ]
+    return statements
+
+
+def postgresql_triggers():
+    statements = [
+        _pg_count_function(
+            "regis_risk_counts", "risk_counts", "risk_type", "jurisdiction, risk_type::text AS kind"
+        ),
+    ]
+    statements += [
+        _pg_count_function(
+            f"regis_{conflict_type}_counts", "conflict_counts", "conflict_type",
+            f"COALESCE(jurisdiction, '') AS jurisdiction, '{conflict_type}'::text AS kind"
+        )
+        for _, conflict_type in CONFLICT_SOURCES
+    ]
+    statements += [
+        # TRUNCATE skips row triggers: reset the matching counters instead
+        """
+        CREATE OR REPLACE FUNCTION regis_reset_counts() RETURNS trigger AS $$
+        BEGIN
+            IF TG_ARGV[0] = 'risk' THEN
+                DELETE FROM risk_counts;
+            ELSE
+                DELETE FROM conflict_counts WHERE conflict_type = TG_ARGV[0];
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql
+        """,
+    ]
+    statements += _pg_count_triggers("requirements", "regis_risk_counts", "trg_risk_counts")
+    statements += [
+        "DROP TRIGGER IF EXISTS trg_risk_counts_truncate ON requirements",
+        "CREATE TRIGGER trg_risk_counts_truncate AFTER TRUNCATE ON requirements "
+        "FOR EACH STATEMENT EXECUTE FUNCTION regis_reset_counts('risk')",
+    ]
+
+    for table, conflict_type in CONFLICT_SOURCES:
+        statements += _pg_count_triggers(table, f"regis_{conflict_type}_counts", f"trg_{table}_counts")
+        statements += [
+            f"DROP TRIGGER IF EXISTS trg_{table}_counts_truncate ON {table}",
+            f"CREATE TRIGGER trg_{table}_counts_truncate AFTER TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION regis_reset_counts('{conflict_type}')",
+        ]
+    # Función por fila de versiones anteriores (sus triggers ya no existen)
+    statements.append("DROP FUNCTION IF EXISTS regis_conflict_counts()")
+    return statements
+
+
+def trigger_names(dialect):
+    """(tabla, trigger) de todos los triggers de contadores del dialecto."""
+    tables = ["requirements"] + [table for table, _ in CONFLICT_SOURCES]
+    # Prefijo por tabla: en SQLite y en TRUNCATE los de requirements son trg_risk_counts_*
+    prefixes = dict(zip(tables, ["trg_risk_counts"] + [f"trg_{table}_counts" for table in tables[1:]]))
+    operations = ("insert", "delete", "update")
+
+    if dialect == "sqlite":
+        return [(table, f"{prefixes[table]}_{op}") for table in tables for op in operations]
+    if dialect == "postgresql":
+        return (
+            [(table, f"trg_{table}_counts_{op}") for table in tables for op in operations]
+            + [(table, f"{prefixes[table]}_truncate") for table in tables]
+        )
+    return []
+
+
+TRIGGERS = {
+    "sqlite": sqlite_triggers,
+    "postgresql": postgresql_triggers,
+}
+
+
+def install_triggers(connection):
+    for statement in TRIGGERS.get(connection.dialect.name, list)():
+        connection.execute(DDL(statement))
+
+
+def drop_triggers(connection):
+    """Quita los triggers de contadores (en la transacción de `connection`)."""
+    dialect = connection.dialect.name
+    for table, name in trigger_names(dialect):
+        on_table = f" ON {table}" if dialect == "postgresql" else ""
+        connection.execute(DDL(f"DROP TRIGGER IF EXISTS {name}{on_table}"))
+
+
+# Después de crear todas las tablas (las origen tienen que existir)
+@event.listens_for(Base.metadata, "after_create")
+def _create_triggers(target, connection, **kw):
+    install_triggers(connection)
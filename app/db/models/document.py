@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Enum, DateTime
+from sqlalchemy import Column, String, Enum, DateTime, Float, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -15,7 +15,7 @@ import enum
 class CategoryLevel(str, enum.Enum):
     gold = "gold"
     silver = "silver"
-    bronze = "bronze"   # Not used now, but kept for future flexibility
+    bronze = "bronze"   # Registered raw XML, not parsed yet (app/ingestion/pipeline.py)
 
 
 class DocumentType(str, enum.Enum):
@@ -45,6 +45,9 @@ class Document(Base):
     category_level = Column(Enum(CategoryLevel), nullable=False)
     doc_type = Column(Enum(DocumentType), nullable=False)
 
+    # Checkpoint de ingesta: sha256 del XML, solo tras ingerirlo por completo
+    content_hash = Column(String(64), nullable=True, index=True)
+
     # Timestamp
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -53,3 +56,28 @@ class Document(Base):
     back_populates="document",
     cascade="all, delete-orphan"
 )
+
+
+# ----------------------
+#  MEDALLION STAGE STATE
+# ----------------------
+
+class DocumentStage(Base):
+    """Last successful run of one medallion stage for one document.
+
+    `content_hash` is the sha256 of the XML the stage processed: a stage is
+    pending when the previous stage holds a different hash.
+    """
+    __tablename__ = "document_stages"
+
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    stage = Column(Enum(CategoryLevel), primary_key=True)
+
+    content_hash = Column(String(64), nullable=False)
+
+    # Bronze only: "<size>:<mtime_ns>" of the file, to skip re-hashing it
+    fingerprint = Column(String, nullable=True)
+
+    # Stage watermark: when the stage last completed for this document
+    watermark = Column(DateTime, nullable=False, default=datetime.utcnow)
+    seconds = Column(Float, nullable=True)
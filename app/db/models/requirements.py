@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, Enum, ForeignKey, Index, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -14,6 +14,11 @@ from .document import Document
 class Requirement(Base):
     __tablename__ = "requirements"
 
+    # Cubre el GROUP BY de /risks/summary filtrado por jurisdicción
+    __table_args__ = (
+        Index("ix_requirements_jurisdiction_risk_type", "jurisdiction", "risk_type"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
     # Texto del requerimiento
@@ -156,7 +161,41 @@ class RequirementEmbedding(Base):
         nullable=False
     )
 
-    # Embedding como JSON string
-    embedding = Column(Text, nullable=False)
+    # Legacy: embedding como JSON string (ver app/db/migrate_embeddings.py)
+    embedding = Column(Text, nullable=True)
+
+    # Embedding en float32 little-endian (ver app/similarity/codec.py)
+    vector = Column(LargeBinary, nullable=True)
+    dimension = Column(Integer, nullable=True)
+    norm = Column(Float, nullable=True)
 
     requirement = relationship("Requirement")
+
+
+# =====================================================
+# MINHASH SIGNATURES (near-duplicate detection)
+# =====================================================
+
+class RequirementMinHash(Base):
+    __tablename__ = "requirement_minhashes"
+
+    requirement_id = Column(Integer, ForeignKey("requirements.id"), primary_key=True)
+
+    # Firma MinHash: NUM_PERM uint32 little-endian (ver app/similarity/minhash.py)
+    signature = Column(LargeBinary, nullable=False)
+
+
+class RequirementLSHBucket(Base):
+    __tablename__ = "requirement_lsh_buckets"
+
+    id = Column(Integer, primary_key=True)
+
+    requirement_id = Column(Integer, ForeignKey("requirements.id"), nullable=False, index=True)
+
+    # Banda LSH y hash de sus filas de la firma
+    band = Column(Integer, nullable=False)
+    bucket = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index("ix_requirement_lsh_buckets_band_bucket", "band", "bucket"),
+    )
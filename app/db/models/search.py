@@ -0,0 +1,61 @@
+from sqlalchemy import DDL, event
+
+from app.db.database import Base
+
+
+# =====================================================
+# ÍNDICE DE TEXTO COMPLETO SOBRE requirements.text
+# =====================================================
+#
+# PostgreSQL: columna tsvector generada + índice GIN.
+# SQLite: tabla FTS5 de contenido externo sincronizada por triggers.
+# Instalación / reconstrucción en BDs existentes: python -m app.db.search rebuild
+
+TEXT_SEARCH_CONFIG = "english"
+FTS_TABLE = "requirements_fts"
+
+
+def postgresql_ddl():
+    return [
+        "ALTER TABLE requirements ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(text, ''))) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_requirements_search_vector "
+        "ON requirements USING GIN (search_vector)",
+    ]
+
+
+def sqlite_ddl():
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"text, content='requirements', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{FTS_TABLE}_insert AFTER INSERT ON requirements "
+        f"BEGIN INSERT INTO {FTS_TABLE} (rowid, text) VALUES (NEW.id, NEW.text); END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{FTS_TABLE}_delete AFTER DELETE ON requirements "
+        f"BEGIN INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) VALUES ('delete', OLD.id, OLD.text); END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{FTS_TABLE}_update AFTER UPDATE OF text ON requirements "
+        f"BEGIN INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) VALUES ('delete', OLD.id, OLD.text); "
+        f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (NEW.id, NEW.text); END",
+    ]
+
+
+SEARCH_DDL = {
+    "postgresql": postgresql_ddl,
+    "sqlite": sqlite_ddl,
+}
+
+
+def install_search_index(connection):
+    for statement in SEARCH_DDL.get(connection.dialect.name, list)():
+        connection.execute(DDL(statement))
+
+
+def drop_search_triggers(connection):
+    """SQLite: quita los triggers de sincronización (la tabla FTS se queda)."""
+    if connection.dialect.name == "sqlite":
+        for operation in ("insert", "delete", "update"):
+            connection.execute(DDL(f"DROP TRIGGER IF EXISTS trg_{FTS_TABLE}_{operation}"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    install_search_index(connection)
@@ -0,0 +1,43 @@
+# backend/app/db/search.py
+#
+# Maintenance of the full-text index over requirements.text.
+#
+#   python -m app.db.search rebuild   # install the index and (re)index all rows
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal, engine
+from app.db.models.search import FTS_TABLE, install_search_index
+
+
+def reindex(connection):
+    """Install the index and (re)index every row, inside the caller's transaction."""
+    install_search_index(connection)
+
+    # The Postgres column is generated, so adding it already indexes every row
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"))
+        connection.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"))
+
+
+def rebuild(db: Session):
+    """Install the index on an existing database and bring it up to date."""
+    reindex(db.connection())
+    db.commit()
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    if command != "rebuild":
+        sys.exit(f"Unknown command: {command}")
+
+    db = SessionLocal()
+    try:
+        print(f" Rebuilding full-text index ({engine.dialect.name})...")
+        rebuild(db)
+        print(" Full-text index ready!")
+    finally:
+        db.close()
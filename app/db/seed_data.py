@@ -1,23 +1,28 @@
-import random
-import uuid
-from sqlalchemy.orm import Session
+import argparse
+import csv
+import io
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
 from sqlalchemy import text
 
-from app.db.database import SessionLocal
-from app.db.models.requirements import (
-    Requirement,
-    Contradiction,
-    Overlap,
-)
+from app.db.aggregates import recount
+from app.db.database import engine
+from app.db.models.aggregates import drop_triggers
+from app.db.models.search import drop_search_triggers
+from app.db.search import reindex
 from app.db.models.enums import RiskTypeEnum, JurisdictionEnum
 
 # ------------------------------------------
-# CONFIGURACIÓN
+# CONFIGURACIÓN (valores por defecto)
 # ------------------------------------------
 
-NUM_REQUIREMENTS = 300   
+NUM_REQUIREMENTS = 300
 NUM_CONTRADICTIONS = 40
 NUM_OVERLAPS = 60
+DEFAULT_SEED = 42
+BATCH_SIZE = 50_000
 
 # Frases base por categoría
 RISK_SENTENCES = {
@@ -75,108 +80,237 @@ JURISDICTIONS = [
 ]
 
 
+ADDONS = [
+    "in accordance with supervisory expectations.",
+    "following best international practices.",
+    "ensuring proportionality to the institution's size.",
+    "subject to periodic review.",
+    "with proper documentation retained.",
+    "while maintaining adequate governance."
+]
+
+CONTRADICTION_DESCRIPTION = "These requirements conflict based on incompatible obligations."
+OVERLAP_REASON = "These requirements overlap due to similar regulatory intent."
+
+# Tablas que referencian requirements: se vacían antes que ella
+DEPENDENT_TABLES = [
+    "contradictions",
+    "requirement_overlaps",
+    "requirement_embeddings",
+    "requirement_lsh_buckets",
+    "requirement_minhashes",
+]
+
+REQUIREMENT_COLUMNS = ["id", "text", "page", "line", "risk_type", "jurisdiction"]
+CONFLICT_COLUMNS = ["requirement1_id", "requirement2_id", "{reason}", "page_1", "line_1", "page_2", "line_2", "jurisdiction"]
+
+
+# ------------------------------------------
+# GENERADOR VECTORIZADO
+# ------------------------------------------
+
+def parse_weights(spec: Optional[str], choices: List[str]) -> np.ndarray:
+    """'EBA=3,ESMA=1' → probabilidades alineadas con `choices` (uniforme si None)."""
+    if not spec:
+        return np.full(len(choices), 1 / len(choices))
+
+    weights = dict.fromkeys(choices, 0.0)
+    for part in spec.split(","):
+        name, value = part.split("=")
+        if name not in weights:
+            raise ValueError(f"Unknown value '{name}'. Choose from: {', '.join(choices)}")
+        weights[name] = float(value)
+
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Weights must add up to a positive number.")
+    return np.array([weights[c] / total for c in choices])
+
+
+def generate_requirements(rng: np.random.Generator, start_id: int, count: int,
+                          risk_p: np.ndarray, jurisdiction_p: np.ndarray) -> Dict[str, np.ndarray]:
+    """Genera un lote de requisitos como columnas NumPy."""
+    risks = list(RiskTypeEnum)
+
+    # Tabla de todos los textos posibles: (riesgo, frase base, addon)
+    texts = np.array([
+        [[base + " " + addon for addon in ADDONS] for base in RISK_SENTENCES[risk]]
+        for risk in risks
+    ], dtype=object)
+
+    risk_idx = rng.choice(len(risks), count, p=risk_p)
+    base_idx = rng.integers(0, texts.shape[1], count)
+    addon_idx = rng.integers(0, texts.shape[2], count)
+
+    return {
+        "id": np.arange(start_id, start_id + count),
+        "text": texts[risk_idx, base_idx, addon_idx],
+        "page": rng.integers(1, 51, count),
+        "line": rng.integers(1, 501, count),
+        "risk_type": np.array([r.name for r in risks], dtype=object)[risk_idx],
+        "jurisdiction": np.array([j.value for j in JURISDICTIONS], dtype=object)[
+            rng.choice(len(JURISDICTIONS), count, p=jurisdiction_p)
+        ],
+    }
+
+
+def generate_pairs(rng: np.random.Generator, count: int, num_requirements: int):
+    """Pares (r1, r2) de índices 0-based distintos."""
+    r1 = rng.integers(0, num_requirements, count)
+    # Desplazamiento en [1, n-1]: nunca empareja un requisito consigo mismo
+    r2 = (r1 + rng.integers(1, num_requirements, count)) % num_requirements
+    return r1, r2
+
+
 # ------------------------------------------
-# GENERADOR DE REQUISITOS
+# ESCRITURA MASIVA
 # ------------------------------------------
 
-def generate_requirement_text(risk: RiskTypeEnum) -> str:
-    """Genera texto realista combinando frases base + elementos aleatorios."""
-    base = random.choice(RISK_SENTENCES[risk])
-    addons = [
-        "in accordance with supervisory expectations.",
-        "following best international practices.",
-        "ensuring proportionality to the institution's size.",
-        "subject to periodic review.",
-        "with proper documentation retained.",
-        "while maintaining adequate governance."
-    ]
-    return base + " " + random.choice(addons)
+def _copy_rows(conn, table: str, columns: List[str], rows):
+    """Postgres: COPY ... FROM STDIN con CSV en memoria."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _executemany_rows(conn, table: str, columns: List[str], rows):
+    placeholder = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})"
+    conn.exec_driver_sql(sql, list(rows))
+
+
+def write_rows(conn, table: str, columns: List[str], rows):
+    if engine.dialect.name == "postgresql":
+        _copy_rows(conn, table, columns, rows)
+    else:
+        _executemany_rows(conn, table, columns, rows)
+
+
+def clear_tables(conn):
+    if engine.dialect.name == "postgresql":
+        conn.execute(text(f"TRUNCATE {', '.join(DEPENDENT_TABLES)}, requirements RESTART IDENTITY"))
+    else:
+        for table in DEPENDENT_TABLES + ["requirements"]:
+            conn.execute(text(f"DELETE FROM {table}"))
+
+
+def reset_sequences(conn):
+    # Los ids se generan aquí: el siguiente INSERT normal debe continuar detrás
+    if engine.dialect.name == "postgresql":
+        for table in ["requirements", "contradictions", "requirement_overlaps"]:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            ))
 
 
 # ------------------------------------------
 # FUNCIÓN PRINCIPAL
 # ------------------------------------------
 
-def seed():
-    db: Session = SessionLocal()
-
-    print("🌱 Seeding database with EXTENDED dataset...")
-
-    # Limpieza opcional de tablas
-    db.execute(text("DELETE FROM contradictions"))
-    db.execute(text("DELETE FROM requirement_overlaps"))
-    db.execute(text("DELETE FROM requirements"))
-    db.commit()
-
-    all_requirements = []
-
-    # ------------------------------------------
-    # 1) Insertar REQUIREMENTS masivos
-    # ------------------------------------------
-    for i in range(NUM_REQUIREMENTS):
-        risk = random.choice(list(RiskTypeEnum))
-        req = Requirement(
-            text=generate_requirement_text(risk),
-            page=random.randint(1, 50),
-            line=random.randint(1, 500),
-            document_id=None,     # Por ahora None
-            risk_type=risk,
-            jurisdiction=random.choice(JURISDICTIONS).value
-        )
-        db.add(req)
-        all_requirements.append(req)
-
-        if i > 0 and i % 50 == 0:
-            print(f"   Inserted {i} requirements...")
-
-    db.commit()
-    db.refresh(all_requirements[0])  # Ensure IDs available
-
-    # ------------------------------------------
-    # 2) CONTRADICTIONS
-    # ------------------------------------------
-    print(f"⚡ Creating {NUM_CONTRADICTIONS} contradictions...")
-    for _ in range(NUM_CONTRADICTIONS):
-        r1, r2 = random.sample(all_requirements, 2)
-
-        c = Contradiction(
-            requirement1_id=r1.id,
-            requirement2_id=r2.id,
-            description="These requirements conflict based on incompatible obligations.",
-            page_1=r1.page,
-            line_1=r1.line,
-            page_2=r2.page,
-            line_2=r2.line,
-            jurisdiction=r1.jurisdiction
-        )
-        db.add(c)
-
-    # ------------------------------------------
-    # 3) OVERLAPS
-    # ------------------------------------------
-    print(f"🌀 Creating {NUM_OVERLAPS} overlaps...")
-    for _ in range(NUM_OVERLAPS):
-        r1, r2 = random.sample(all_requirements, 2)
-
-        o = Overlap(
-            requirement1_id=r1.id,
-            requirement2_id=r2.id,
-            reason="These requirements overlap due to similar regulatory intent.",
-            page_1=r1.page,
-            line_1=r1.line,
-            page_2=r2.page,
-            line_2=r2.line,
-            jurisdiction=r1.jurisdiction
-        )
-        db.add(o)
-
-    db.commit()
-
-    print("🎉 DONE! Database now has:")
-    print(f"   → {NUM_REQUIREMENTS} requirements")
-    print(f"   → {NUM_CONTRADICTIONS} contradictions")
-    print(f"   → {NUM_OVERLAPS} overlaps")
+def seed(
+    num_requirements: int = NUM_REQUIREMENTS,
+    num_contradictions: int = NUM_CONTRADICTIONS,
+    num_overlaps: int = NUM_OVERLAPS,
+    random_seed: int = DEFAULT_SEED,
+    risk_weights: Optional[str] = None,
+    jurisdiction_weights: Optional[str] = None,
+    batch_size: int = BATCH_SIZE,
+):
+    """Genera un dataset determinista: misma semilla (y batch_size) → mismos datos."""
+    if num_requirements < 2 and (num_contradictions or num_overlaps):
+        raise ValueError("At least two requirements are needed to create conflicts.")
+
+    rng = np.random.default_rng(random_seed)
+    risk_p = parse_weights(risk_weights, [r.value for r in RiskTypeEnum])
+    jurisdiction_p = parse_weights(jurisdiction_weights, [j.value for j in JURISDICTIONS])
+
+    print("🌱 Seeding database with bulk dataset...")
+    start = time.perf_counter()
+
+    with engine.begin() as conn:
+        # Sin triggers de contadores ni de texto completo durante la carga:
+        # se recuenta y se reindexa una vez al final
+        drop_triggers(conn)
+        drop_search_triggers(conn)
+        clear_tables(conn)
+
+        # ------------------------------------------
+        # 1) REQUIREMENTS por lotes
+        # ------------------------------------------
+        # page/line/jurisdiction de cada requisito, para rellenar los conflictos
+        pages = np.empty(num_requirements, dtype=np.int64)
+        lines = np.empty(num_requirements, dtype=np.int64)
+        jurisdictions = np.empty(num_requirements, dtype=object)
+
+        for offset in range(0, num_requirements, batch_size):
+            count = min(batch_size, num_requirements - offset)
+            cols = generate_requirements(rng, offset + 1, count, risk_p, jurisdiction_p)
+
+            pages[offset:offset + count] = cols["page"]
+            lines[offset:offset + count] = cols["line"]
+            jurisdictions[offset:offset + count] = cols["jurisdiction"]
+
+            rows = zip(*(cols[c].tolist() for c in REQUIREMENT_COLUMNS))
+            write_rows(conn, "requirements", REQUIREMENT_COLUMNS, rows)
+            print(f"   Inserted {offset + count} requirements...")
+
+        # ------------------------------------------
+        # 2) CONTRADICTIONS y 3) OVERLAPS
+        # ------------------------------------------
+        for table, reason_column, reason, count in [
+            ("contradictions", "description", CONTRADICTION_DESCRIPTION, num_contradictions),
+            ("requirement_overlaps", "reason", OVERLAP_REASON, num_overlaps),
+        ]:
+            print(f"⚡ Creating {count} rows in {table}...")
+            columns = [c.format(reason=reason_column) for c in CONFLICT_COLUMNS]
+
+            for offset in range(0, count, batch_size):
+                r1, r2 = generate_pairs(rng, min(batch_size, count - offset), num_requirements)
+                rows = zip(
+                    (r1 + 1).tolist(),
+                    (r2 + 1).tolist(),
+                    [reason] * len(r1),
+                    pages[r1].tolist(),
+                    lines[r1].tolist(),
+                    pages[r2].tolist(),
+                    lines[r2].tolist(),
+                    jurisdictions[r1].tolist(),
+                )
+                write_rows(conn, table, columns, rows)
+
+        reset_sequences(conn)
+        recount(conn)
+        reindex(conn)
+
+    elapsed = time.perf_counter() - start
+    print(f"🎉 DONE in {elapsed:.1f} s! Database now has:")
+    print(f"   → {num_requirements} requirements")
+    print(f"   → {num_contradictions} contradictions")
+    print(f"   → {num_overlaps} overlaps")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the database with a synthetic, reproducible dataset.")
+    parser.add_argument("--requirements", type=int, default=NUM_REQUIREMENTS)
+    parser.add_argument("--contradictions", type=int, default=NUM_CONTRADICTIONS)
+    parser.add_argument("--overlaps", type=int, default=NUM_OVERLAPS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--risk-weights", default=None, help="e.g. AML=3,FRAUD=1 (others 0)")
+    parser.add_argument("--jurisdiction-weights", default=None, help="e.g. EBA=2,ESMA=1 (others 0)")
+    args = parser.parse_args(argv)
+
+    seed(
+        num_requirements=args.requirements,
+        num_contradictions=args.contradictions,
+        num_overlaps=args.overlaps,
+        random_seed=args.seed,
+        risk_weights=args.risk_weights,
+        jurisdiction_weights=args.jurisdiction_weights,
+    )
 
 
 if __name__ == "__main__":
-    seed()
+    main()
@@ -0,0 +1,254 @@
+import csv
+import enum
+import io
+import json
+import struct
+from typing import BinaryIO, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+try:  # optional: Arrow IPC output
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+# ------------------------------------------------------------
+# Column kinds
+# ------------------------------------------------------------
+INT = "int"            # nullable integer
+TEXT = "text"          # free text
+CATEGORY = "category"  # low-cardinality string, dictionary-encoded
+
+# (name, kind) in SELECT order
+Columns = Sequence[Tuple[str, str]]
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    ARROW = "arrow"          # Arrow IPC stream (needs pyarrow)
+    ARRAYS = "arrays"        # compact array frames, always available
+    COLUMNAR = "columnar"    # arrow if pyarrow is installed, else arrays
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def _enum_value(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+class Dictionary:
+    """Value → code mapping that only grows, shared by every batch of a stream."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, values) -> Tuple[np.ndarray, List[str]]:
+        """(int32 codes with -1 for NULL, values first seen in this batch)."""
+        start = len(self.values)
+        codes = np.empty(len(values), dtype="<i4")
+        for i, value in enumerate(values):
+            if value is None:
+                codes[i] = -1
+                continue
+            value = _enum_value(value)
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+            codes[i] = code
+        return codes, self.values[start:]
+
+
+# ------------------------------------------------------------
+# Encoders: begin() / batch(rows) / end() → bytes
+# ------------------------------------------------------------
+class CSVEncoder:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, columns: Columns):
+        self.columns = columns
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def begin(self) -> bytes:
+        return self._write([[name for name, _ in self.columns]])
+
+    def batch(self, rows) -> bytes:
+        return self._write(
+            [_enum_value(value) if value is not None else "" for value in row] for row in rows
+        )
+
+    def end(self) -> bytes:
+        return b""
+
+
+class ArrowEncoder:
+    """Arrow IPC stream; categories as dictionary arrays sent as deltas."""
+
+    media_type = "application/vnd.apache.arrow.stream"
+    extension = "arrows"
+
+    def __init__(self, columns: Columns):
+        self.columns = columns
+        self.dictionaries = {name: Dictionary() for name, kind in columns if kind == CATEGORY}
+        types = {INT: pa.int64(), TEXT: pa.string(), CATEGORY: pa.dictionary(pa.int32(), pa.string())}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.sink = io.BytesIO()
+        self.writer = None
+
+    def _drain(self) -> bytes:
+        data = self.sink.getvalue()
+        self.sink.seek(0)
+        self.sink.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        self.writer = pa.ipc.new_stream(self.sink, self.schema, options=options)
+        return self._drain()
+
+    def batch(self, rows) -> bytes:
+        arrays = []
+        for i, (name, kind) in enumerate(self.columns):
+            values = [row[i] for row in rows]
+            if kind == CATEGORY:
+                dictionary = self.dictionaries[name]
+                codes, _ = dictionary.encode(values)
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(codes, mask=codes < 0), pa.array(dictionary.values, pa.string())
+                ))
+            else:
+                arrays.append(pa.array(values, self.schema.field(name).type))
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        return self._drain()
+
+    def end(self) -> bytes:
+        self.writer.close()
+        return self._drain()
+
+
+# ------------------------------------------------------------
+# Compact array frames (no pyarrow needed)
+# ------------------------------------------------------------
+#
+#   stream := MAGIC frame*
+#   frame  := uint32 header length, JSON header, buffers
+#
+# The header lists, per column, the raw little-endian buffers that follow
+# in order:
+#   int       values <i8, validity |u1 (1 = not NULL)
+#   text      offsets <i8 (rows + 1), UTF-8 bytes |u1, validity |u1
+#             (streams from before validity carry no NULLs)
+#   category  codes <i4 (-1 = NULL); new dictionary values in "dictionary"
+#
+# read_arrays() is the reference reader.
+
+ARRAYS_MAGIC = b"REGISARR1\n"
+
+
+class ArraysEncoder:
+    media_type = "application/x-regis-arrays"
+    extension = "regisarr"
+
+    def __init__(self, columns: Columns):
+        self.columns = columns
+        self.dictionaries = {name: Dictionary() for name, kind in columns if kind == CATEGORY}
+
+    def begin(self) -> bytes:
+        return ARRAYS_MAGIC
+
+    def batch(self, rows) -> bytes:
+        header_columns, buffers = [], []
+
+        for i, (name, kind) in enumerate(self.columns):
+            values = [row[i] for row in rows]
+            column = {"name": name, "kind": kind}
+
+            if kind == INT:
+                validity = np.fromiter((v is not None for v in values), dtype="|u1", count=len(values))
+                data = np.fromiter((v or 0 for v in values), dtype="<i8", count=len(values))
+                parts = [data, validity]
+            elif kind == TEXT:
+                validity = np.fromiter((v is not None for v in values), dtype="|u1", count=len(values))
+                encoded = [(v or "").encode() for v in values]
+                offsets = np.zeros(len(values) + 1, dtype="<i8")
+                np.cumsum([len(v) for v in encoded], out=offsets[1:])
+                parts = [offsets, np.frombuffer(b"".join(encoded), dtype="|u1"), validity]
+            else:
+                codes, new_values = self.dictionaries[name].encode(values)
+                column["dictionary"] = new_values
+                parts = [codes]
+
+            column["buffers"] = [[part.dtype.str, part.nbytes] for part in parts]
+            header_columns.append(column)
+            buffers.extend(part.tobytes() for part in parts)
+
+        header = json.dumps({"rows": len(rows), "columns": header_columns}).encode()
+        return struct.pack("<I", len(header)) + header + b"".join(buffers)
+
+    def end(self) -> bytes:
+        return b""
+
+
+def read_arrays(stream: BinaryIO) -> Dict[str, np.ndarray]:
+    """Decode an arrays export into {column: numpy array} (NULL → None)."""
+    if stream.read(len(ARRAYS_MAGIC)) != ARRAYS_MAGIC:
+        raise ValueError("Not a REGIS arrays export.")
+
+    chunks: Dict[str, List[np.ndarray]] = {}
+    dictionaries: Dict[str, List[str]] = {}
+
+    while True:
+        prefix = stream.read(4)
+        if not prefix:
+            break
+        header = json.loads(stream.read(struct.unpack("<I", prefix)[0]))
+
+        for column in header["columns"]:
+            name, kind = column["name"], column["kind"]
+            parts = [np.frombuffer(stream.read(nbytes), dtype=dtype) for dtype, nbytes in column["buffers"]]
+
+            if kind == INT:
+                data, validity = parts
+                values = data.astype(object)
+                values[validity == 0] = None
+            elif kind == TEXT:
+                offsets, raw = parts[:2]
+                blob = raw.tobytes()
+                values = np.array(
+                    [blob[offsets[i]:offsets[i + 1]].decode() for i in range(len(offsets) - 1)], dtype=object
+                )
+                if len(parts) > 2:
+                    values[parts[2] == 0] = None
+            else:
+                dictionary = dictionaries.setdefault(name, [])
+                dictionary.extend(column["dictionary"])
+                lookup = np.array(dictionary + [None], dtype=object)
+                values = lookup[parts[0]]  # code -1 picks the trailing None
+
+            chunks.setdefault(name, []).append(values)
+
+    return {name: np.concatenate(parts) for name, parts in chunks.items()}
+
+
+ENCODERS = {
+    ExportFormat.CSV: CSVEncoder,
+    ExportFormat.ARROW: ArrowEncoder,
+    ExportFormat.ARRAYS: ArraysEncoder,
+}
+
+
+def encoder_for(export_format: ExportFormat, columns: Columns):
+    if export_format == ExportFormat.COLUMNAR:
+        export_format = ExportFormat.ARROW if arrow_available() else ExportFormat.ARRAYS
+    if export_format == ExportFormat.ARROW and not arrow_available():
+        raise LookupError("Arrow export needs pyarrow; use format=arrays.")
+    return ENCODERS[export_format](columns)
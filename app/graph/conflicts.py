@@ -0,0 +1,461 @@
+# Conflict graph: requirements are nodes, contradictions and overlaps are
+# undirected edges.
+#
+# Adjacency is stored as CSR (compressed sparse row) arrays indexed by
+# requirement id: the neighbours of requirement `r` are
+# `neighbours[indptr[r]:indptr[r + 1]]`. Connected components come from a
+# union-find whose root is always the smallest requirement id of the
+# component, so a cluster id is stable across rebuilds.
+#
+# Edges written after the build are picked up by sync_from_db() (watermark
+# on the conflict ids): they are unioned in place and kept in a small
+# pending adjacency next to the CSR arrays, like the IVF index pending
+# cells. Edge and node totals are checked against the summary tables
+# (conflict_counts, risk_counts): a delete, or an id committed below a
+# watermark by a slower ingest worker, forces a full rebuild.
+#
+#   python -m app.graph.conflicts [--top N] [--jurisdiction J]
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.aggregates import ConflictCount, RiskCount
+from app.db.models.requirements import Contradiction, Overlap, Requirement
+
+LOAD_BATCH_SIZE = 50000
+
+# Edge type code = position in this list
+EDGE_TYPES = ["contradiction", "overlap"]
+EDGE_MODELS = [Contradiction, Overlap]
+
+# node_jurisdiction value for ids that are not a requirement
+NO_NODE = -1
+
+Edges = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]   # sources, targets, types, conflict ids
+
+
+def _empty_edges() -> Edges:
+    empty = np.empty(0, dtype=np.int64)
+    return empty, empty, np.empty(0, dtype=np.int8), empty
+
+
+def _flatten(parent: np.ndarray) -> np.ndarray:
+    """Pointer jumping until every node points straight at its root."""
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return parent
+        parent = grand
+
+
+def connected_roots(size: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Vectorised union-find: root (smallest id of the component) of every node.
+
+    Each round hooks the larger root of every edge under the smaller one,
+    then compresses all paths at once.
+    """
+    parent = np.arange(size, dtype=np.int64)
+    while True:
+        ra, rb = parent[sources], parent[targets]
+        split = ra != rb
+        if not split.any():
+            return parent
+        low = np.minimum(ra[split], rb[split])
+        high = np.maximum(ra[split], rb[split])
+        np.minimum.at(parent, high, low)
+        parent = _flatten(parent)
+
+
+def build_csr(size: int, edges: Edges) -> Edges:
+    """indptr, neighbours, types, conflict ids; every edge stored both ways."""
+    sources, targets, types, conflict_ids = edges
+    src = np.concatenate([sources, targets])
+    order = np.argsort(src, kind="stable")
+
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=size), out=indptr[1:])
+
+    return (
+        indptr,
+        np.concatenate([targets, sources])[order],
+        np.concatenate([types, types])[order],
+        np.concatenate([conflict_ids, conflict_ids])[order],
+    )
+
+
+# ------------------------------------------------------------
+# Read-only component view, swapped in whole after each change
+# ------------------------------------------------------------
+class Components:
+
+    def __init__(self, roots: np.ndarray, node_jurisdiction: np.ndarray, edges: Edges):
+        sources, _, types, _ = edges
+        self.roots = roots
+        self.sizes = np.bincount(roots[node_jurisdiction != NO_NODE], minlength=roots.shape[0])
+
+        # Edge counts per component, by type
+        self.edge_counts = np.zeros((len(EDGE_TYPES), roots.shape[0]), dtype=np.int64)
+        for code in range(len(EDGE_TYPES)):
+            self.edge_counts[code] = np.bincount(roots[sources[types == code]], minlength=roots.shape[0])
+
+        # Members of every non-singleton component, grouped by root, ids ascending
+        clustered = np.flatnonzero((self.sizes[roots] > 1) & (node_jurisdiction != NO_NODE))
+        order = np.argsort(roots[clustered], kind="stable")
+        self.members = clustered[order]
+        self.cluster_ids, starts = np.unique(roots[self.members], return_index=True)
+        self.offsets = np.append(starts, self.members.shape[0]).astype(np.int64)
+
+        self.node_jurisdiction = node_jurisdiction
+        self._top: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def count(self) -> int:
+        return self.cluster_ids.shape[0]
+
+    def members_of(self, cluster_id: int) -> np.ndarray:
+        pos = np.searchsorted(self.cluster_ids, cluster_id)
+        if pos == self.count or self.cluster_ids[pos] != cluster_id:
+            return np.array([cluster_id], dtype=np.int64)
+        return self.members[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def largest(self, jurisdiction_code: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(cluster ids, members in the jurisdiction), largest clusters first."""
+        key = -1 if jurisdiction_code is None else jurisdiction_code
+        if key not in self._top:
+            members = self.members
+            if jurisdiction_code is not None:
+                members = members[self.node_jurisdiction[members] == jurisdiction_code]
+            cluster_ids, in_jurisdiction = np.unique(self.roots[members], return_counts=True)
+            # Size descending, then cluster id ascending
+            order = np.lexsort((cluster_ids, -self.sizes[cluster_ids]))
+            self._top[key] = (cluster_ids[order], in_jurisdiction[order])
+        return self._top[key]
+
+
+class ConflictGraph:
+
+    def __init__(self, jurisdictions: List[str], node_jurisdiction: np.ndarray, edges: Edges,
+                 watermarks: Optional[List[int]] = None):
+        self.jurisdictions = jurisdictions
+        self._jurisdiction_codes = {name: code for code, name in enumerate(jurisdictions)}
+        self.node_jurisdiction = node_jurisdiction
+        self.edges = edges
+        self.watermarks = watermarks or [0] * len(EDGE_TYPES)
+        self.last_requirement_id = int(np.flatnonzero(node_jurisdiction != NO_NODE).max(initial=0))
+        self.edge_counts = [int(np.count_nonzero(edges[2] == code)) for code in range(len(EDGE_TYPES))]
+
+        size = node_jurisdiction.shape[0]
+        self.indptr, self.neighbours, self.neighbour_types, self.neighbour_conflicts = build_csr(size, edges)
+        self._parent = connected_roots(size, edges[0], edges[1])
+        self.components = Components(self._parent.copy(), node_jurisdiction, edges)
+
+        # Edges added since the CSR was built: node -> [(neighbour, type, conflict id)]
+        self._pending: Dict[int, List[Tuple[int, int, int]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return int(np.count_nonzero(self.node_jurisdiction != NO_NODE))
+
+    @property
+    def edge_count(self) -> int:
+        return self.edges[0].shape[0]
+
+    # --------------------------------------------------------
+    # Build
+    # --------------------------------------------------------
+    @staticmethod
+    def _load_nodes(db: Session, after_id: int, jurisdictions: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        codes = {name: code for code, name in enumerate(jurisdictions)}
+        ids, values = [], []
+        stmt = (
+            select(Requirement.id, Requirement.jurisdiction)
+            .where(Requirement.id > after_id)
+            .order_by(Requirement.id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        for batch in db.execute(stmt).partitions():
+            batch_ids, batch_jurisdictions = zip(*batch)
+            for jurisdiction in set(batch_jurisdictions) - codes.keys():
+                codes[jurisdiction] = len(jurisdictions)
+                jurisdictions.append(jurisdiction)
+            ids.append(np.array(batch_ids, dtype=np.int64))
+            values.append(np.array([codes[j] for j in batch_jurisdictions], dtype=np.int16))
+
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int16)
+        return np.concatenate(ids), np.concatenate(values)
+
+    @staticmethod
+    def _load_edges(db: Session, watermarks: List[int]) -> Edges:
+        parts = []
+        for code, model in enumerate(EDGE_MODELS):
+            stmt = (
+                select(model.requirement1_id, model.requirement2_id, model.id)
+                .where(model.id > watermarks[code])
+                .order_by(model.id)
+                .execution_options(yield_per=LOAD_BATCH_SIZE)
+            )
+            # Column-wise: np.array() over Row objects is several times slower
+            for batch in db.execute(stmt).partitions():
+                sources, targets, conflict_ids = (np.array(column, dtype=np.int64) for column in zip(*batch))
+                parts.append((sources, targets, np.full(sources.shape[0], code, dtype=np.int8), conflict_ids))
+
+        if not parts:
+            return _empty_edges()
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    @classmethod
+    def load(cls, db: Session) -> "ConflictGraph":
+        jurisdictions: List[str] = []
+        ids, codes = cls._load_nodes(db, 0, jurisdictions)
+        edges = cls._load_edges(db, [0] * len(EDGE_TYPES))
+
+        size = int(max(ids.max(initial=0), edges[0].max(initial=0), edges[1].max(initial=0))) + 1
+        node_jurisdiction = np.full(size, NO_NODE, dtype=np.int16)
+        node_jurisdiction[ids] = codes
+
+        watermarks = [
+            int(edges[3][edges[2] == code].max(initial=0)) for code in range(len(EDGE_TYPES))
+        ]
+        return cls(jurisdictions, node_jurisdiction, edges, watermarks)
+
+    # --------------------------------------------------------
+    # Incremental edges
+    # --------------------------------------------------------
+    def _find(self, node: int) -> int:
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]   # path halving
+            node = parent[node]
+        return int(node)
+
+    def _grow(self, size: int):
+        extra = size - self.node_jurisdiction.shape[0]
+        if extra <= 0:
+            return
+        self.node_jurisdiction = np.concatenate([self.node_jurisdiction, np.full(extra, NO_NODE, dtype=np.int16)])
+        self._parent = np.concatenate([self._parent, np.arange(self._parent.shape[0], size, dtype=np.int64)])
+
+    def add(self, edges: Edges, node_ids: Optional[np.ndarray] = None, node_codes: Optional[np.ndarray] = None):
+        """Union new edges (and new requirement nodes) into the graph."""
+        sources, targets, types, conflict_ids = edges
+
+        with self._lock:
+            size = max(
+                self.node_jurisdiction.shape[0],
+                int(sources.max(initial=-1)) + 1,
+                int(targets.max(initial=-1)) + 1,
+                int(node_ids.max(initial=-1)) + 1 if node_ids is not None else 0,
+            )
+            self._grow(size)
+            if node_ids is not None and node_ids.shape[0]:
+                # Copy on write: the current Components view keeps the old array
+                self.node_jurisdiction = self.node_jurisdiction.copy()
+                self.node_jurisdiction[node_ids] = node_codes
+                self.last_requirement_id = max(self.last_requirement_id, int(node_ids.max()))
+
+            for a, b, code, conflict_id in zip(sources.tolist(), targets.tolist(), types.tolist(),
+                                               conflict_ids.tolist()):
+                ra, rb = self._find(a), self._find(b)
+                if ra != rb:
+                    # Smallest id stays the root
+                    self._parent[max(ra, rb)] = min(ra, rb)
+                self._pending.setdefault(a, []).append((b, code, conflict_id))
+                self._pending.setdefault(b, []).append((a, code, conflict_id))
+
+            self.edges = tuple(np.concatenate([old, new]) for old, new in zip(self.edges, edges))
+            for code in range(len(EDGE_TYPES)):
+                self.edge_counts[code] += int(np.count_nonzero(types == code))
+                if (types == code).any():
+                    self.watermarks[code] = max(self.watermarks[code], int(conflict_ids[types == code].max()))
+
+            self._parent = _flatten(self._parent)
+            self.components = Components(self._parent.copy(), self.node_jurisdiction, self.edges)
+
+    def sync_from_db(self, db: Session) -> Optional[int]:
+        """Add conflicts written since the last build/sync. Returns how many,
+        or None if the totals no longer add up (rows deleted, or committed
+        below a watermark) and the graph has to be rebuilt."""
+        edges = self._load_edges(db, self.watermarks)
+        added = edges[0].shape[0]
+
+        stored = dict(db.execute(
+            select(ConflictCount.conflict_type, func.sum(ConflictCount.count)).group_by(ConflictCount.conflict_type)
+        ).all())
+        for code, name in enumerate(EDGE_TYPES):
+            new = int(np.count_nonzero(edges[2] == code))
+            if self.edge_counts[code] + new != (stored.get(name) or 0):
+                return None
+
+        jurisdictions = list(self.jurisdictions)
+        node_ids, node_codes = self._load_nodes(db, self.last_requirement_id, jurisdictions)
+
+        # Parallel ingest workers commit sequence ids out of order: a lower
+        # id committed late never passes the watermark, so count the nodes
+        requirements = db.scalar(select(func.sum(RiskCount.count))) or 0
+        if self.size + node_ids.shape[0] != requirements:
+            return None
+
+        if added or node_ids.shape[0]:
+            self.jurisdictions = jurisdictions
+            self._jurisdiction_codes = {name: code for code, name in enumerate(jurisdictions)}
+            self.add(edges, node_ids, node_codes)
+        return added
+
+    # --------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------
+    def has_node(self, requirement_id: int) -> bool:
+        node_jurisdiction = self.components.node_jurisdiction
+        return 0 <= requirement_id < node_jurisdiction.shape[0] and node_jurisdiction[requirement_id] != NO_NODE
+
+    def jurisdiction_of(self, requirement_id: int) -> Optional[str]:
+        # An edge can reach a requirement written after the node load: no
+        # jurisdiction yet (indexing with NO_NODE would pick the last one)
+        node_jurisdiction = self.node_jurisdiction
+        if requirement_id >= node_jurisdiction.shape[0] or node_jurisdiction[requirement_id] == NO_NODE:
+            return None
+        return self.jurisdictions[node_jurisdiction[requirement_id]]
+
+    def jurisdiction_code(self, jurisdiction: str) -> Optional[int]:
+        return self._jurisdiction_codes.get(jurisdiction)
+
+    def cluster(self, requirement_id: int) -> dict:
+        components = self.components
+        cluster_id = int(components.roots[requirement_id])
+        members = components.members_of(cluster_id)
+        counts = np.bincount(components.node_jurisdiction[members], minlength=len(self.jurisdictions))
+
+        return {
+            "cluster_id": cluster_id,
+            "size": int(members.shape[0]),
+            "contradictions": int(components.edge_counts[0][cluster_id]),
+            "overlaps": int(components.edge_counts[1][cluster_id]),
+            "jurisdictions": {self.jurisdictions[code]: int(counts[code]) for code in np.flatnonzero(counts)},
+            "members": members,
+        }
+
+    def largest_clusters(self, jurisdiction: Optional[str], limit: int) -> List[dict]:
+        code = None
+        if jurisdiction is not None:
+            code = self.jurisdiction_code(jurisdiction)
+            if code is None:
+                return []
+
+        components = self.components
+        cluster_ids, in_jurisdiction = components.largest(code)
+        return [
+            {
+                "cluster_id": int(cluster_id),
+                "size": int(components.sizes[cluster_id]),
+                "in_jurisdiction": int(count),
+                "contradictions": int(components.edge_counts[0][cluster_id]),
+                "overlaps": int(components.edge_counts[1][cluster_id]),
+            }
+            for cluster_id, count in zip(cluster_ids[:limit], in_jurisdiction[:limit])
+        ]
+
+    def _adjacent(self, node: int):
+        if node + 1 < self.indptr.shape[0]:
+            start, end = self.indptr[node], self.indptr[node + 1]
+            yield from zip(self.neighbours[start:end].tolist(), self.neighbour_types[start:end].tolist(),
+                           self.neighbour_conflicts[start:end].tolist())
+        yield from self._pending.get(node, ())
+
+    def neighbourhood(self, requirement_id: int, hops: int, max_nodes: int):
+        """Breadth-first k-hop neighbourhood: (nodes with distance, edges, truncated)."""
+        distance = {requirement_id: 0}
+        edges: Dict[Tuple[int, int], Tuple[int, int, int]] = {}
+        frontier = [requirement_id]
+        truncated = False
+
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbour, code, conflict_id in self._adjacent(node):
+                    if neighbour not in distance:
+                        if len(distance) >= max_nodes:
+                            truncated = True
+                            continue
+                        distance[neighbour] = hop
+                        next_frontier.append(neighbour)
+                    edges[(code, conflict_id)] = (node, neighbour, code)
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        return distance, edges, truncated
+
+
+# ------------------------------------------------------------
+# Process-wide graph, loaded lazily and synced at most every
+# CONFLICT_GRAPH_SYNC_SECONDS
+# ------------------------------------------------------------
+_graph: Optional[ConflictGraph] = None
+_synced_at = 0.0
+_graph_lock = threading.Lock()
+
+
+def _refresh(graph: Optional[ConflictGraph]) -> ConflictGraph:
+    with SessionLocal() as db:
+        if graph is not None and graph.sync_from_db(db) is not None:
+            return graph
+        return ConflictGraph.load(db)
+
+
+def get_conflict_graph() -> ConflictGraph:
+    """Process-wide graph. Blocking (own sync session, thread lock): call it
+    through run_in_threadpool, never on the event loop thread."""
+    global _graph, _synced_at
+    graph = _graph
+    if graph is not None and time.monotonic() - _synced_at < settings.CONFLICT_GRAPH_SYNC_SECONDS:
+        return graph
+
+    # The first load waits for whoever is building; later syncs never make
+    # a reader wait: while one thread syncs, the others serve the current graph
+    if not _graph_lock.acquire(blocking=graph is None):
+        return graph
+    try:
+        if _graph is None or time.monotonic() - _synced_at >= settings.CONFLICT_GRAPH_SYNC_SECONDS:
+            _graph = _refresh(_graph)
+            _synced_at = time.monotonic()
+        return _graph
+    finally:
+        _graph_lock.release()
+
+
+def reset_conflict_graph():
+    global _graph, _synced_at
+    with _graph_lock:
+        _graph = None
+        _synced_at = 0.0
+
+
+def main(argv: List[str]):
+    limit = int(argv[argv.index("--top") + 1]) if "--top" in argv else 10
+    jurisdiction = argv[argv.index("--jurisdiction") + 1] if "--jurisdiction" in argv else None
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        graph = ConflictGraph.load(db)
+        print(f" Conflict graph: {graph.size} requirements, {graph.edge_count} edges, "
+              f"{graph.components.count} clusters ({time.perf_counter() - start:.2f} s)")
+        for item in graph.largest_clusters(jurisdiction, limit):
+            print(f"   cluster {item['cluster_id']}: {item['size']} requirements "
+                  f"({item['contradictions']} contradictions, {item['overlaps']} overlaps)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import sys
+    main(sys.argv[1:])
@@ -0,0 +1,176 @@
+# Parallel, resumable ingestion of a whole regulatory corpus.
+#
+# Expected layout (the jurisdiction directory is optional):
+#
+#   <root>/<doc_type>/[<jurisdiction>/]<file>.xml
+#
+# where <doc_type> is one of eu_leg, financial_regulation, national_law.
+# Each document is parsed and written by one worker process. A document's
+# content_hash is only stored once all of its requirements are committed,
+# so an interrupted run redoes unfinished documents from scratch (no
+# duplicate rows) and re-runs skip files whose hash has not changed.
+#
+#   python -m app.ingestion.corpus <root> [--workers N]
+
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+
+from app.db.aggregates import triggers_suspended
+from app.db.database import SessionLocal, engine
+from app.db.models.document import Document, DocumentType
+from app.db.models.requirements import (
+    Contradiction,
+    Overlap,
+    Requirement,
+    RequirementEmbedding,
+    RequirementLSHBucket,
+    RequirementMinHash,
+)
+from app.ingestion.ingest import create_document, ingest_document
+from app.similarity.minhash import release_copies
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+@dataclass
+class DocumentResult:
+    file_path: str
+    status: str  # "ingested" | "skipped" | "failed"
+    requirements: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def discover(root: str) -> Iterator[Tuple[str, DocumentType, Optional[str]]]:
+    """Yield (file_path, doc_type, jurisdiction) for every XML file under `root`."""
+    for doc_type in DocumentType:
+        type_dir = os.path.join(root, doc_type.value)
+        for dirpath, _, filenames in os.walk(type_dir):
+            rel = os.path.relpath(dirpath, type_dir)
+            jurisdiction = None if rel == "." else rel.split(os.sep)[0]
+            for name in sorted(filenames):
+                if name.lower().endswith(".xml"):
+                    yield os.path.join(dirpath, name), doc_type, jurisdiction
+
+
+def delete_document_requirements(db: Session, document_id):
+    """Remove a document's requirements and every row that references them."""
+    requirement_ids = select(Requirement.id).where(Requirement.document_id == document_id)
+
+    release_copies(db, requirement_ids)
+    for model in (Contradiction, Overlap):
+        db.execute(delete(model).where(or_(
+            model.requirement1_id.in_(requirement_ids),
+            model.requirement2_id.in_(requirement_ids),
+        )))
+    for model in (RequirementEmbedding, RequirementMinHash, RequirementLSHBucket):
+        db.execute(delete(model).where(model.requirement_id.in_(requirement_ids)))
+
+    db.execute(delete(Requirement).where(Requirement.document_id == document_id))
+    db.commit()
+
+
+# ------------------------------------------------------------
+# Worker side
+# ------------------------------------------------------------
+def _init_worker():
+    # Connections inherited through fork belong to the parent: drop them
+    # without closing so each worker opens its own
+    engine.dispose(close=False)
+
+
+def ingest_file(file_path: str, doc_type: DocumentType, jurisdiction: Optional[str]) -> DocumentResult:
+    start = time.perf_counter()
+    db = SessionLocal()
+
+    try:
+        content_hash = file_sha256(file_path)
+        document = db.query(Document).filter(Document.file_path == file_path).first()
+
+        if document is not None and document.content_hash == content_hash:
+            return DocumentResult(file_path, "skipped", seconds=time.perf_counter() - start)
+
+        if document is None:
+            document = create_document(db, file_path, doc_type, jurisdiction, os.path.basename(file_path))
+        else:
+            # Changed file or a run interrupted half-way: start the document over
+            document.content_hash = None
+            db.commit()
+            delete_document_requirements(db, document.id)
+
+        stats = ingest_document(db, document)
+
+        document.content_hash = content_hash
+        db.commit()
+
+        return DocumentResult(file_path, "ingested", stats.requirements, time.perf_counter() - start)
+
+    except Exception as exc:
+        db.rollback()
+        return DocumentResult(file_path, "failed", seconds=time.perf_counter() - start, error=repr(exc))
+
+    finally:
+        db.close()
+
+
+# ------------------------------------------------------------
+# Parent side
+# ------------------------------------------------------------
+def ingest_corpus(root: str, workers: Optional[int] = None) -> List[DocumentResult]:
+    files = list(discover(root))
+    workers = min(workers or os.cpu_count() or 1, max(len(files), 1))
+    results: List[DocumentResult] = []
+
+    # Per-row count triggers would run for every requirement the workers
+    # insert: load without them and recount once at the end
+    context = multiprocessing.get_context("fork")
+    with triggers_suspended(), \
+            ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = [pool.submit(ingest_file, *item) for item in files]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            print(f"   [{done}/{len(files)}] {result.status:<8} {result.requirements:>8} reqs  "
+                  f"{result.seconds:6.1f} s  {result.file_path}")
+            if result.error:
+                print(f"      {result.error}")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest a regulatory XML corpus in parallel.")
+    parser.add_argument("root")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"📚 Ingesting corpus under {args.root}...")
+    start = time.perf_counter()
+    results = ingest_corpus(args.root, args.workers)
+    elapsed = time.perf_counter() - start
+
+    ingested = [r for r in results if r.status == "ingested"]
+    total = sum(r.requirements for r in ingested)
+    print("🎉 DONE!")
+    print(f"   → {len(ingested)} ingested, "
+          f"{sum(r.status == 'skipped' for r in results)} skipped, "
+          f"{sum(r.status == 'failed' for r in results)} failed")
+    print(f"   → {total} requirements in {elapsed:.1f} s ({total / elapsed if elapsed else 0:,.0f} reqs/sec)")
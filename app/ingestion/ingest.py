@@ -0,0 +1,159 @@
+# Ingests a regulatory XML file into requirements linked to its Document.
+#
+#   python -m app.ingestion.ingest <file.xml> --doc-type eu_leg [--jurisdiction EU] [--title ...]
+
+import os
+import re
+import resource
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.models.document import CategoryLevel, Document, DocumentType
+from app.db.models.enums import JurisdictionEnum, RiskTypeEnum
+from app.db.models.requirements import Requirement
+from app.ingestion.xml_parser import iter_requirements
+
+INSERT_BATCH_SIZE = 5000
+
+# First matching risk wins; anything unmatched is OTHER
+RISK_KEYWORDS: Dict[RiskTypeEnum, re.Pattern] = {
+    RiskTypeEnum.AML: re.compile(r"money laundering|\bAML\b|terrorist financing|due diligence|suspicious transaction", re.I),
+    RiskTypeEnum.FRAUD: re.compile(r"fraud|misrepresentation|deceptive", re.I),
+    RiskTypeEnum.CYBERSECURITY: re.compile(r"cyber|ICT|encryption|authentication|information security", re.I),
+    RiskTypeEnum.PRIVACY: re.compile(r"personal data|privacy|data subject|consent", re.I),
+    RiskTypeEnum.GOVERNANCE: re.compile(r"management body|board|governance|oversight|remuneration", re.I),
+    RiskTypeEnum.OPERATIONAL: re.compile(r"operational|business continuity|outsourcing|incident", re.I),
+    RiskTypeEnum.COMPLIANCE: re.compile(r"compliance|report(ing)? to the competent authority|supervisory", re.I),
+}
+
+
+@dataclass
+class IngestionStats:
+    file_path: str
+    size_bytes: int = 0
+    requirements: int = 0
+    seconds: float = 0.0
+    peak_rss_bytes: int = 0
+
+    @property
+    def requirements_per_second(self) -> float:
+        return self.requirements / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.size_bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+
+def classify_risk(text: str) -> RiskTypeEnum:
+    for risk, pattern in RISK_KEYWORDS.items():
+        if pattern.search(text):
+            return risk
+    return RiskTypeEnum.OTHER
+
+
+# ------------------------------------------------------------
+# Peak RSS, resettable per file on Linux
+# ------------------------------------------------------------
+def _reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux (process lifetime peak)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def ingest_document(db: Session, document: Document, commit_every: int = INSERT_BATCH_SIZE) -> IngestionStats:
+    """Stream `document.file_path` and bulk-insert its requirements."""
+    stats = IngestionStats(file_path=document.file_path, size_bytes=os.path.getsize(document.file_path))
+    jurisdiction = document.jurisdiction or JurisdictionEnum.GLOBAL.value
+
+    _reset_peak_rss()
+    start = time.perf_counter()
+
+    batch: List[dict] = []
+    with open(document.file_path, "rb") as source:
+        for extracted in iter_requirements(source):
+            batch.append({
+                "text": extracted.text,
+                "page": extracted.page,
+                "line": extracted.line,
+                "risk_type": classify_risk(extracted.text),
+                "jurisdiction": jurisdiction,
+                "document_id": document.id,
+            })
+            if len(batch) >= commit_every:
+                db.execute(insert(Requirement), batch)
+                db.commit()
+                stats.requirements += len(batch)
+                batch = []
+
+    if batch:
+        db.execute(insert(Requirement), batch)
+        stats.requirements += len(batch)
+    db.commit()
+
+    stats.seconds = time.perf_counter() - start
+    stats.peak_rss_bytes = _peak_rss()
+    return stats
+
+
+def create_document(
+    db: Session,
+    file_path: str,
+    doc_type: DocumentType,
+    jurisdiction: Optional[str] = None,
+    title: Optional[str] = None,
+) -> Document:
+    document = Document(
+        file_path=file_path,
+        title=title,
+        jurisdiction=jurisdiction,
+        category_level=CategoryLevel.silver,
+        doc_type=doc_type,
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+
+def print_stats(stats: IngestionStats):
+    print(f"   → {stats.requirements} requirements from {stats.file_path}")
+    print(f"   → {stats.requirements_per_second:,.0f} requirements/sec, "
+          f"{stats.mb_per_second:.1f} MB/sec, peak RSS {stats.peak_rss_bytes / 1e6:.0f} MB")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.db.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Ingest a regulatory XML document.")
+    parser.add_argument("file_path")
+    parser.add_argument("--doc-type", choices=[d.value for d in DocumentType], required=True)
+    parser.add_argument("--jurisdiction", default=None)
+    parser.add_argument("--title", default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"📄 Ingesting {args.file_path}...")
+        doc = create_document(db, args.file_path, DocumentType(args.doc_type), args.jurisdiction, args.title)
+        print_stats(ingest_document(db, doc))
+    finally:
+        db.close()
@@ -0,0 +1,337 @@
+# Incremental medallion promotion of a regulatory corpus.
+#
+#   bronze  raw XML registered: one Document per file, sha256 of its bytes
+#   silver  parsed, normalised and risk-tagged requirements
+#   gold    conflict-analysed (MinHash near-duplicates) and, when an ANN
+#           index is configured, its embeddings synced into it: new ones
+#           merged in, those silver deleted dropped
+#
+# Every stage records, per document, the content hash it processed and a
+# watermark (DocumentStage). A stage only picks up documents whose
+# previous stage holds a different hash, so re-running over an unchanged
+# corpus stats the files and issues one query per stage. Files whose size
+# and mtime have not changed are not even re-hashed.
+#
+# Stages are independent batch steps and can be run on their own:
+#
+#   python -m app.ingestion.pipeline <root> [--stage bronze|silver|gold] [--workers N]
+
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.db.aggregates import triggers_suspended
+from app.db.database import SessionLocal
+from app.db.models.document import CategoryLevel, Document, DocumentStage
+from app.db.models.requirements import Requirement, RequirementEmbedding
+from app.ingestion.corpus import (
+    DocumentResult,
+    _init_worker,
+    delete_document_requirements,
+    discover,
+    file_sha256,
+)
+from app.ingestion.ingest import ingest_document
+from app.similarity.ann import IVFIndex
+from app.similarity.minhash import detect_duplicates
+
+STAGES = [CategoryLevel.bronze, CategoryLevel.silver, CategoryLevel.gold]
+
+# Rebuild the ANN index (retrain its cells) instead of syncing it once this
+# share of its vectors was removed: cells trained on the old corpus no
+# longer balance the new one
+ANN_REBUILD_FRACTION = 0.25
+
+
+@dataclass
+class StageStats:
+    stage: str
+    documents: int = 0      # documents the stage looked at
+    promoted: int = 0
+    skipped: int = 0        # already up to date
+    failed: int = 0
+    requirements: int = 0
+    seconds: float = 0.0
+
+
+def file_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def mark_stage(db: Session, document_id, stage: CategoryLevel, content_hash: str,
+               seconds: Optional[float] = None, fingerprint: Optional[str] = None):
+    db.merge(DocumentStage(
+        document_id=document_id,
+        stage=stage,
+        content_hash=content_hash,
+        fingerprint=fingerprint,
+        watermark=datetime.utcnow(),
+        seconds=seconds,
+    ))
+
+
+def pending(db: Session, stage: CategoryLevel) -> List[Tuple[uuid.UUID, str]]:
+    """(document_id, content_hash) where the previous stage is ahead of `stage`."""
+    previous = aliased(DocumentStage)
+    current = aliased(DocumentStage)
+    rows = db.execute(
+        select(previous.document_id, previous.content_hash)
+        .outerjoin(current, and_(current.document_id == previous.document_id, current.stage == stage))
+        .where(previous.stage == STAGES[STAGES.index(stage) - 1])
+        .where(current.content_hash.is_distinct_from(previous.content_hash))
+    )
+    return [tuple(row) for row in rows]
+
+
+# ------------------------------------------------------------
+# Bronze: register raw XML files
+# ------------------------------------------------------------
+def run_bronze(db: Session, root: str) -> StageStats:
+    stats = StageStats(CategoryLevel.bronze.value)
+    start = time.perf_counter()
+
+    known = {
+        document.file_path: (document, stage)
+        for document, stage in db.execute(
+            select(Document, DocumentStage).outerjoin(DocumentStage, and_(
+                DocumentStage.document_id == Document.id,
+                DocumentStage.stage == CategoryLevel.bronze,
+            ))
+        )
+    }
+
+    for file_path, doc_type, jurisdiction in discover(root):
+        stats.documents += 1
+        fingerprint = file_fingerprint(file_path)
+        document, stage = known.get(file_path, (None, None))
+
+        if stage is not None and stage.fingerprint == fingerprint:
+            stats.skipped += 1
+            continue
+
+        file_start = time.perf_counter()
+        content_hash = file_sha256(file_path)
+
+        if document is None:
+            document = Document(
+                id=uuid.uuid4(),
+                file_path=file_path,
+                title=os.path.basename(file_path),
+                jurisdiction=jurisdiction,
+                category_level=CategoryLevel.bronze,
+                doc_type=doc_type,
+            )
+            db.add(document)
+        elif stage is not None and stage.content_hash == content_hash:
+            # Touched but identical: remember the new mtime, keep the layers
+            stage.fingerprint = fingerprint
+            stats.skipped += 1
+            continue
+        else:
+            # Changed (or corpus-ingested before the pipeline): silver and
+            # gold are stale until they catch up with the new hash
+            document.category_level = CategoryLevel.bronze
+
+        mark_stage(db, document.id, CategoryLevel.bronze, content_hash,
+                   time.perf_counter() - file_start, fingerprint)
+        stats.promoted += 1
+
+    db.commit()
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+# ------------------------------------------------------------
+# Silver: parse and normalise requirements (one worker per document)
+# ------------------------------------------------------------
+def promote_silver(document_id: uuid.UUID, content_hash: str) -> DocumentResult:
+    start = time.perf_counter()
+    db = SessionLocal()
+    document = None
+
+    try:
+        document = db.get(Document, document_id)
+        requirements = 0
+        status = "skipped"
+
+        # Document.content_hash is the corpus ingestion checkpoint: it only
+        # holds the hash once every requirement is committed
+        if document.content_hash != content_hash:
+            document.content_hash = None
+            db.commit()
+            delete_document_requirements(db, document.id)
+
+            requirements = ingest_document(db, document).requirements
+            document.content_hash = content_hash
+            status = "ingested"
+
+        document.category_level = CategoryLevel.silver
+        mark_stage(db, document.id, CategoryLevel.silver, content_hash, time.perf_counter() - start)
+        db.commit()
+
+        return DocumentResult(document.file_path, status, requirements, time.perf_counter() - start)
+
+    except Exception as exc:
+        db.rollback()
+        file_path = document.file_path if document is not None else str(document_id)
+        return DocumentResult(file_path, "failed", seconds=time.perf_counter() - start, error=repr(exc))
+
+    finally:
+        db.close()
+
+
+def run_silver(db: Session, workers: Optional[int] = None) -> StageStats:
+    stats = StageStats(CategoryLevel.silver.value)
+    start = time.perf_counter()
+
+    todo = pending(db, CategoryLevel.silver)
+    stats.documents = len(todo)
+
+    if todo:
+        workers = min(workers or os.cpu_count() or 1, len(todo))
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+            futures = [pool.submit(promote_silver, document_id, content_hash) for document_id, content_hash in todo]
+            for future in as_completed(futures):
+                result = future.result()
+                if result.status == "failed":
+                    stats.failed += 1
+                    print(f"      silver failed: {result.file_path}: {result.error}")
+                    continue
+                stats.promoted += 1
+                stats.requirements += result.requirements
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+# ------------------------------------------------------------
+# Gold: conflict analysis and embedding index
+# ------------------------------------------------------------
+def sync_ann_index(db: Session) -> Tuple[int, int]:
+    """Bring the persisted ANN index in line with the embeddings table.
+
+    Returns (added, removed). Re-parsed documents lost their old rows in
+    silver: those ids are dropped from the index, never left to come back
+    from a search as requirements that no longer exist.
+    """
+    path = settings.ANN_INDEX_DIR
+    if not path or not os.path.exists(os.path.join(path, "meta.json")):
+        return 0, 0
+
+    index = IVFIndex.load(path)
+    before = index.size
+    added, removed = index.sync_from_db(db)
+
+    if removed and removed >= ANN_REBUILD_FRACTION * before:
+        try:
+            index = IVFIndex.build_from_db(db, index.nlist)
+        except ValueError:
+            # Every embedding is gone: keep the (now empty) synced index
+            pass
+    if added or removed:
+        index.save(path)
+    return added, removed
+
+
+def run_gold(db: Session) -> StageStats:
+    stats = StageStats(CategoryLevel.gold.value)
+    start = time.perf_counter()
+
+    todo = pending(db, CategoryLevel.gold)
+    stats.documents = len(todo)
+    if not todo:
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    # Both steps are incremental on their own: MinHash only hashes
+    # requirements without a signature, the ANN sync only reads new
+    # embeddings and drops the ones silver deleted with re-parsed documents.
+    duplicates = detect_duplicates(db)
+    embeddings, removed = sync_ann_index(db)
+    print(f"      gold: {duplicates.indexed} requirements hashed, {duplicates.duplicates} near-duplicates, "
+          f"{embeddings} embeddings indexed, {removed} removed")
+
+    document_ids = [document_id for document_id, _ in todo]
+    counts = dict(db.execute(
+        select(Requirement.document_id, func.count())
+        .where(Requirement.document_id.in_(document_ids))
+        .group_by(Requirement.document_id)
+    ).all())
+    embedded = db.scalar(
+        select(func.count())
+        .select_from(RequirementEmbedding)
+        .join(Requirement, Requirement.id == RequirementEmbedding.requirement_id)
+        .where(Requirement.document_id.in_(document_ids))
+        .where(RequirementEmbedding.vector.isnot(None))
+    )
+
+    db.execute(update(Document).where(Document.id.in_(document_ids)).values(category_level=CategoryLevel.gold))
+    seconds = (time.perf_counter() - start) / len(todo)
+    for document_id, content_hash in todo:
+        mark_stage(db, document_id, CategoryLevel.gold, content_hash, seconds)
+        stats.requirements += counts.get(document_id, 0)
+    db.commit()
+
+    stats.promoted = len(todo)
+    if stats.requirements and embedded < stats.requirements:
+        print(f"      gold: {stats.requirements - embedded} promoted requirements have no embedding yet")
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+# ------------------------------------------------------------
+# Driver
+# ------------------------------------------------------------
+def run_pipeline(root: str, stages: Optional[List[CategoryLevel]] = None,
+                 workers: Optional[int] = None) -> List[StageStats]:
+    results = []
+    # Silver inserts and gold writes overlaps row by row: without the count
+    # triggers, recounted once when the run ends
+    with triggers_suspended():
+        for stage in stages or STAGES:
+            db = SessionLocal()
+            try:
+                if stage == CategoryLevel.bronze:
+                    stats = run_bronze(db, root)
+                elif stage == CategoryLevel.silver:
+                    stats = run_silver(db, workers)
+                else:
+                    stats = run_gold(db)
+            finally:
+                db.close()
+
+            results.append(stats)
+            print(f"   {stats.stage:<7} {stats.promoted:>6} promoted  {stats.skipped:>6} skipped  "
+                  f"{stats.failed:>4} failed  {stats.requirements:>9} reqs  {stats.seconds:7.2f} s")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Promote a regulatory corpus through bronze, silver and gold.")
+    parser.add_argument("root")
+    parser.add_argument("--stage", choices=[s.value for s in STAGES], action="append",
+                        help="run only this stage (repeatable); default: all, in order")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    stages = [CategoryLevel(s) for s in args.stage] if args.stage else None
+
+    print(f"🏅 Promoting corpus under {args.root}...")
+    start = time.perf_counter()
+    run_pipeline(args.root, stages, args.workers)
+    print(f"🎉 DONE in {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,90 @@
+# Streaming extraction of requirement sentences from regulatory XML.
+#
+# The file is read with iterparse and every text block is cleared and
+# detached from its parent as soon as it has been processed, so memory
+# stays flat however large the document is.
+
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Union
+
+# Elements that start a new page (<page n="3"/>, <pb n="3"/>, ...)
+PAGE_TAGS = {"page", "pb", "pagebreak"}
+
+# Elements whose text is one block (one "line" within the page)
+BLOCK_TAGS = {"p", "para", "paragraph", "alinea", "np", "txt", "li", "item", "sentence"}
+
+# Obligation markers that make a sentence a requirement
+OBLIGATION_RE = re.compile(
+    r"\b(shall|must|is required to|are required to|should|may not|"
+    r"is prohibited|are prohibited|ensure that)\b",
+    re.IGNORECASE,
+)
+
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.;])\s+(?=[A-Z(])")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class ExtractedRequirement:
+    text: str
+    page: int
+    line: int
+
+
+def _local_name(tag) -> str:
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _page_number(elem: ET.Element, current: int) -> int:
+    for attr in ("n", "number", "num", "page"):
+        value = elem.get(attr)
+        if value and value.isdigit():
+            return int(value)
+    return current + 1
+
+
+def split_requirements(block_text: str) -> Iterator[str]:
+    text = WHITESPACE_RE.sub(" ", block_text).strip()
+    for sentence in SENTENCE_SPLIT_RE.split(text):
+        if OBLIGATION_RE.search(sentence):
+            yield sentence.strip()
+
+
+def iter_requirements(source: Union[str, BinaryIO]) -> Iterator[ExtractedRequirement]:
+    """Yield requirement sentences with their page/line, streaming `source`."""
+    page = 1
+    line = 0
+    stack = []
+    open_blocks = 0
+
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        name = _local_name(elem.tag)
+
+        if event == "start":
+            stack.append(elem)
+            if name in BLOCK_TAGS:
+                open_blocks += 1
+            elif name in PAGE_TAGS:
+                page = _page_number(elem, page)
+                line = 0
+            continue
+
+        stack.pop()
+
+        if name in BLOCK_TAGS:
+            open_blocks -= 1
+            line += 1
+            for sentence in split_requirements("".join(elem.itertext())):
+                yield ExtractedRequirement(text=sentence, page=page, line=line)
+        elif open_blocks:
+            # Inline markup (<b>, <ref>, ...): its text is still needed by the block
+            continue
+
+        # Drop everything already processed so the tree never grows
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
@@ -1,15 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from app.api.v1 import risks, conflicts, requirements
-from app.db.database import Base, engine
+from app.api.v1 import risks, conflicts, requirements, export
+from app.core.cache import summary_cache
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.profiling import DEFAULT_PROFILE_DIR, ProfileStore, ProfilingMiddleware, profiles_router
+from app.core.warmup import database_ready, startup, startup_state
+from app.db.database import async_engine, read_async_engines
 
 
 # ---------------------------------------------------------
-# Initialize DB
+# Lifespan
 # ---------------------------------------------------------
-# Important: creates tables if they don’t exist
-Base.metadata.create_all(bind=engine)
+# Tables are created by the one-shot init job (python -m app.db.init_db),
+# never by the server: importing or starting the app runs no DDL.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup(warmup=settings.STARTUP_WARMUP)
+    yield
+    for bind in (async_engine, *read_async_engines):
+        await bind.dispose()
 
 
 # ---------------------------------------------------------
@@ -18,7 +32,8 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="REGIS MVP Backend",
     version="1.0.0",
-    description="Regulatory Intelligence System (Hackathon MVP)"
+    description="Regulatory Intelligence System (Hackathon MVP)",
+    lifespan=lifespan
 )
 
 
@@ -33,6 +48,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in profiling: when disabled nothing is installed (zero overhead)
+if settings.PROFILING_ENABLED:
+    profile_store = ProfileStore(settings.PROFILING_DIR or DEFAULT_PROFILE_DIR, settings.PROFILING_MAX_PROFILES)
+    app.add_middleware(
+        ProfilingMiddleware,
+        router=app.router,
+        store=profile_store,
+        token=settings.PROFILING_TOKEN,
+        sample_every=settings.PROFILING_SAMPLE_EVERY,
+    )
+    app.include_router(profiles_router(profile_store, settings.PROFILING_TOKEN))
+
+# Per-route latency, SQL statements, DB time, rows and pool waits (/metrics)
+app.add_middleware(MetricsMiddleware)
+
 
 # ---------------------------------------------------------
 # Routers
@@ -40,6 +70,7 @@ app.add_middleware(
 app.include_router(risks.router, prefix="/api/v1/risks", tags=["Risks"])
 app.include_router(conflicts.router, prefix="/api/v1/conflicts", tags=["Conflicts"])
 app.include_router(requirements.router, prefix="/api/v1/requirements", tags=["Requirements"])
+app.include_router(export.router, prefix="/api/v1/export", tags=["Export"])
 
 
 # ---------------------------------------------------------
@@ -48,3 +79,34 @@ app.include_router(requirements.router, prefix="/api/v1/requirements", tags=["Re
 @app.get("/")
 def root():
     return {"message": "REGIS Backend running successfully"}
+
+
+# ---------------------------------------------------------
+# Summary cache counters
+# ---------------------------------------------------------
+@app.get("/cache/stats")
+def cache_stats():
+    return summary_cache.stats()
+
+
+# ---------------------------------------------------------
+# Readiness: startup finished and the database answers
+# ---------------------------------------------------------
+@app.get("/ready")
+async def ready():
+    database_error = await database_ready() if startup_state.started else "starting"
+    body = {
+        "ready": startup_state.started and database_error is None,
+        "database": database_error or "ok",
+        "warmup_ms": startup_state.warmup,
+        "warmup_errors": startup_state.errors,
+    }
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+
+# ---------------------------------------------------------
+# Prometheus metrics
+# ---------------------------------------------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,465 @@
+# Approximate nearest-neighbour search over requirement embeddings.
+#
+# IVF (inverted file) index: a spherical k-means coarse quantizer splits the
+# vectors into `nlist` cells and a query only scores the vectors in its
+# `nprobe` closest cells. Vectors are stored sorted by cell, so each cell is
+# a contiguous slice of one array and the whole index can be memory-mapped
+# back from disk without a rebuild.
+#
+# sync_from_db() brings a loaded index in line with the table: new vectors
+# go to per-cell pending lists, and the stored copies of deleted or
+# re-embedded requirements are tombstoned until save() compacts them out.
+# Every save() writes a new generation of array files and then swaps
+# meta.json, so a serving process reloads when meta.json changes and never
+# reads a half-written index. The previous generation is kept for readers
+# that read meta.json just before the swap; savers in different processes
+# take turns on a lock file.
+#
+#   python -m app.similarity.ann build [--nlist N]
+#   python -m app.similarity.ann sync
+
+import fcntl
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.requirements import RequirementEmbedding
+from app.similarity.codec import EMBEDDING_DTYPE, decode_embedding
+from app.similarity.index import EmbeddingIndex
+
+KMEANS_ITERATIONS = 20
+KMEANS_SAMPLES_PER_CELL = 64
+ASSIGN_BATCH_SIZE = 65536
+SYNC_BATCH_SIZE = 5000
+DEFAULT_NPROBE = 8
+
+_ARRAYS = ("centroids", "ids", "vectors", "offsets")
+# Array generations kept on disk: the current one and the one before
+KEEP_GENERATIONS = 2
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=EMBEDDING_DTYPE)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    cells = np.empty(vectors.shape[0], dtype=np.int64)
+    for start in range(0, vectors.shape[0], ASSIGN_BATCH_SIZE):
+        chunk = vectors[start:start + ASSIGN_BATCH_SIZE]
+        cells[start:start + ASSIGN_BATCH_SIZE] = np.argmax(chunk @ centroids.T, axis=1)
+    return cells
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of (already normalised) vectors."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(vectors.shape[0], nlist * KMEANS_SAMPLES_PER_CELL)
+    sample = vectors[rng.choice(vectors.shape[0], sample_size, replace=False)]
+
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        cells = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, cells, sample)
+        counts = np.bincount(cells, minlength=nlist)
+
+        # Re-seed empty cells with random sample points
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+
+        centroids = _normalize(sums)
+
+    return centroids
+
+
+class IVFIndex:
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        offsets: np.ndarray,
+        last_embedding_id: int = 0,
+        generation: int = 0,
+    ):
+        self.centroids = centroids
+        self.ids = ids
+        self.vectors = vectors
+        self.offsets = offsets
+        self.last_embedding_id = last_embedding_id
+        self.generation = generation
+
+        # Incremental inserts land here until the next save() merges them
+        self._pending_ids: List[List[int]] = [[] for _ in range(self.nlist)]
+        self._pending_vectors: List[List[np.ndarray]] = [[] for _ in range(self.nlist)]
+        self._pending_cells: Dict[int, int] = {}
+        self._pending_count = 0
+
+        # Stored (saved) ids whose vector was deleted or replaced; search()
+        # skips them and save() drops them
+        self._removed: Set[int] = set()
+        self._removed_array = np.empty(0, dtype=np.int64)
+        self._stored_ids: Optional[Set[int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def size(self) -> int:
+        return self.ids.shape[0] - len(self._removed) + self._pending_count
+
+    # --------------------------------------------------------
+    # Build
+    # --------------------------------------------------------
+    @classmethod
+    def build(cls, ids: np.ndarray, vectors: np.ndarray, nlist: Optional[int] = None,
+              last_embedding_id: int = 0, seed: int = 0) -> "IVFIndex":
+        vectors = _normalize(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+
+        # No cells to train: search() would have nothing to probe
+        if vectors.shape[0] == 0:
+            raise ValueError("Cannot build an ANN index without embeddings.")
+
+        if nlist is None:
+            # sqrt(n) cells is the usual starting point for IVF
+            nlist = max(1, int(np.sqrt(vectors.shape[0])))
+        nlist = min(nlist, vectors.shape[0])
+
+        centroids = train_centroids(vectors, nlist, seed)
+        cells = _assign(vectors, centroids)
+
+        order = np.argsort(cells, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=nlist), out=offsets[1:])
+
+        return cls(centroids, ids[order], vectors[order], offsets, last_embedding_id)
+
+    @classmethod
+    def build_from_db(cls, db: Session, nlist: Optional[int] = None) -> "IVFIndex":
+        exact = EmbeddingIndex.load(db)
+        last_id = db.scalar(select(RequirementEmbedding.id).order_by(RequirementEmbedding.id.desc()).limit(1)) or 0
+        return cls.build(exact.ids, exact.matrix, nlist, last_embedding_id=last_id)
+
+    # --------------------------------------------------------
+    # Incremental inserts and deletes
+    # --------------------------------------------------------
+    def _stored(self) -> Set[int]:
+        # Only built by writers (sync, remove): a serving process never pays for it
+        if self._stored_ids is None:
+            self._stored_ids = set(self.ids.tolist())
+        return self._stored_ids
+
+    def _drop(self, rid: int):
+        # Caller holds the lock
+        cell = self._pending_cells.pop(rid, None)
+        if cell is not None:
+            pos = self._pending_ids[cell].index(rid)
+            del self._pending_ids[cell][pos]
+            del self._pending_vectors[cell][pos]
+            self._pending_count -= 1
+        if rid in self._stored():
+            self._removed.add(rid)
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Insert vectors; an id already in the index has its vector replaced."""
+        vectors = _normalize(np.atleast_2d(vectors))
+        cells = _assign(vectors, self.centroids)
+
+        with self._lock:
+            for rid, cell, vector in zip(ids.tolist(), cells.tolist(), vectors):
+                self._drop(rid)
+                self._pending_ids[cell].append(rid)
+                self._pending_vectors[cell].append(vector)
+                self._pending_cells[rid] = cell
+                self._pending_count += 1
+            self._removed_array = np.array(sorted(self._removed), dtype=np.int64)
+
+    def remove(self, ids):
+        with self._lock:
+            for rid in ids:
+                self._drop(int(rid))
+            self._removed_array = np.array(sorted(self._removed), dtype=np.int64)
+
+    def sync_from_db(self, db: Session) -> Tuple[int, int]:
+        """Bring the index in line with the stored vectors. Returns (added, removed).
+
+        New and re-embedded rows are found by the embedding id watermark,
+        vectors filled in place below it by the requirement ids missing from
+        the index, deletes by the ids the table no longer holds. A vector
+        overwritten under the same row id is not detected: rebuild for that.
+        """
+        stored = dict(db.execute(
+            select(RequirementEmbedding.requirement_id, RequirementEmbedding.id)
+            .where(RequirementEmbedding.vector.isnot(None))
+        ).all())
+
+        with self._lock:
+            indexed = (self._stored() - self._removed) | self._pending_cells.keys()
+
+        removed = indexed - stored.keys()
+        fetch = [rid for rid, eid in stored.items() if eid > self.last_embedding_id or rid not in indexed]
+
+        for start in range(0, len(fetch), SYNC_BATCH_SIZE):
+            rows = db.execute(
+                select(RequirementEmbedding.requirement_id, RequirementEmbedding.vector, RequirementEmbedding.dimension)
+                .where(RequirementEmbedding.requirement_id.in_(fetch[start:start + SYNC_BATCH_SIZE]))
+                .where(RequirementEmbedding.vector.isnot(None))
+            ).all()
+            if rows:
+                self.add(
+                    np.array([r.requirement_id for r in rows], dtype=np.int64),
+                    np.stack([decode_embedding(r.vector, r.dimension) for r in rows]),
+                )
+
+        if removed:
+            self.remove(removed)
+        if stored:
+            self.last_embedding_id = max(self.last_embedding_id, max(stored.values()))
+        return len(fetch), len(removed)
+
+    # --------------------------------------------------------
+    # Search
+    # --------------------------------------------------------
+    def _cell(self, cell: int, pending_ids: List[int], pending_vectors: List[np.ndarray],
+              removed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.offsets[cell], self.offsets[cell + 1]
+        ids, vectors = self.ids[start:end], self.vectors[start:end]
+
+        if removed.shape[0]:
+            live = ~np.isin(ids, removed)
+            ids, vectors = ids[live], vectors[live]
+
+        if pending_ids:
+            ids = np.concatenate([ids, np.asarray(pending_ids, dtype=np.int64)])
+            vectors = np.concatenate([vectors, np.stack(pending_vectors)])
+
+        return ids, vectors
+
+    def _pending(self, cells) -> List[Tuple[List[int], List[np.ndarray], np.ndarray]]:
+        # Copied under the lock: add() appends to both lists, and a search
+        # reading them mid-append would pair ids with the wrong vectors
+        with self._lock:
+            return [
+                (list(self._pending_ids[cell]), list(self._pending_vectors[cell]), self._removed_array)
+                for cell in cells
+            ]
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = DEFAULT_NPROBE) -> List[Tuple[int, float]]:
+        """Approximate top-k (requirement_id, cosine) for one query, best first."""
+        query = _normalize(query)
+        nprobe = min(nprobe, self.nlist)
+        cells = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        parts = [self._cell(int(cell), *pending) for cell, pending in zip(cells, self._pending(cells))]
+        ids = np.concatenate([p[0] for p in parts])
+        vectors = np.concatenate([p[1] for p in parts])
+
+        k = min(k, ids.shape[0])
+        if k == 0:
+            return []
+
+        scores = vectors @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(ids[pos]), float(scores[pos])) for pos in top]
+
+    # --------------------------------------------------------
+    # Persistence
+    # --------------------------------------------------------
+    def _merged(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Caller holds the lock
+        ids, vectors = [], []
+        for cell in range(self.nlist):
+            cell_ids, cell_vectors = self._cell(
+                cell, self._pending_ids[cell], self._pending_vectors[cell], self._removed_array
+            )
+            ids.append(cell_ids)
+            vectors.append(cell_vectors)
+
+        offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in ids], out=offsets[1:])
+        return np.concatenate(ids), np.concatenate(vectors), offsets
+
+    def save(self, path: str):
+        """Write the index (pending inserts merged in, tombstones dropped)
+        under directory `path`, as the next generation of array files."""
+        os.makedirs(path, exist_ok=True)
+
+        with self._lock, open(os.path.join(path, ".lock"), "w") as lock_file:
+            # Other processes saving to `path` (pipeline, CLI) wait their turn
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            ids, vectors, offsets = self._merged()
+            arrays = {"centroids": self.centroids, "ids": ids, "vectors": vectors, "offsets": offsets}
+            generation = max(self.generation, _stored_generation(path)) + 1
+
+            # New file names per generation: a reader holding the previous
+            # meta.json (or a mmap of its arrays) never sees a mix of both.
+            # tmp + replace so a file is never truncated under a live mmap.
+            for name in _ARRAYS:
+                final = os.path.join(path, _array_file(name, generation))
+                tmp = _tmp_file(final)
+                np.save(tmp, arrays[name])
+                os.replace(tmp, final)
+
+            meta = {
+                "nlist": self.nlist,
+                "size": int(ids.shape[0]),
+                "dimension": int(self.centroids.shape[1]),
+                "last_embedding_id": self.last_embedding_id,
+                "generation": generation,
+            }
+            final = os.path.join(path, "meta.json")
+            tmp = _tmp_file(final)
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, final)
+            self.generation = generation
+
+            # Generations before the previous one: already-open mmaps keep
+            # their (unlinked) file. Another saver's temp files are left alone.
+            for entry in os.listdir(path):
+                stored = _file_generation(entry)
+                if stored is not None and stored <= generation - KEEP_GENERATIONS:
+                    os.remove(os.path.join(path, entry))
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        try:
+            return cls._load(path)
+        except FileNotFoundError:
+            # Our meta.json was replaced and its arrays cleaned up by two
+            # saves while we read it: the current meta.json is complete
+            return cls._load(path)
+
+    @classmethod
+    def _load(cls, path: str) -> "IVFIndex":
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        generation = meta.get("generation", 0)
+
+        arrays = {
+            name: np.load(os.path.join(path, _array_file(name, generation)), mmap_mode="r") for name in _ARRAYS
+        }
+        # Centroids and offsets are tiny and hit on every query: keep them in RAM
+        arrays["centroids"] = np.array(arrays["centroids"])
+        arrays["offsets"] = np.array(arrays["offsets"])
+
+        return cls(last_embedding_id=meta["last_embedding_id"], generation=generation, **arrays)
+
+
+def _array_file(name: str, generation: int) -> str:
+    # Generation 0: indexes saved before generations existed
+    return f"{name}.npy" if generation == 0 else f"{name}.{generation}.npy"
+
+
+def _file_generation(entry: str) -> Optional[int]:
+    """Generation of an array file name, None for anything else (temp files included)."""
+    parts = entry.split(".")
+    if parts[0] not in _ARRAYS or parts[-1] != "npy":
+        return None
+    if len(parts) == 2:
+        return 0
+    if len(parts) == 3 and parts[1].isdigit():
+        return int(parts[1])
+    return None
+
+
+def _tmp_file(final: str) -> str:
+    # Unique per writer: concurrent savers never share (or remove) a temp file
+    root, extension = os.path.splitext(final)
+    return f"{root}.{os.getpid()}-{secrets.token_hex(4)}.tmp{extension}"
+
+
+def _stored_generation(path: str) -> int:
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            return json.load(f).get("generation", 0)
+    except FileNotFoundError:
+        return 0
+
+
+# ------------------------------------------------------------
+# Process-wide index, loaded from ANN_INDEX_DIR at startup and
+# reloaded whenever a build/sync swaps in a new meta.json
+# ------------------------------------------------------------
+_ann_index: Optional[IVFIndex] = None
+_ann_meta: Optional[Tuple[int, int]] = None
+_ann_lock = threading.Lock()
+
+
+def _meta_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(os.path.join(path, "meta.json"))
+    except FileNotFoundError:
+        return None
+    # os.replace() gives every saved meta.json a new inode
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def load_ann_index() -> Optional[IVFIndex]:
+    global _ann_index, _ann_meta
+    path = settings.ANN_INDEX_DIR
+    signature = _meta_signature(path) if path else None
+
+    # One stat() per call; the files are only mapped again after a save
+    if signature is not None and signature != _ann_meta:
+        with _ann_lock:
+            if signature != _ann_meta:
+                _ann_index = IVFIndex.load(path)
+                _ann_meta = signature
+    return _ann_index
+
+
+def get_ann_index() -> Optional[IVFIndex]:
+    return load_ann_index()
+
+
+def main(argv: List[str]):
+    from app.db.database import SessionLocal
+
+    if not settings.ANN_INDEX_DIR:
+        raise SystemExit("ANN_INDEX_DIR is not set.")
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        if argv and argv[0] == "sync":
+            index = IVFIndex.load(settings.ANN_INDEX_DIR)
+            added, removed = index.sync_from_db(db)
+            print(f" Added {added} embeddings, removed {removed}.")
+        else:
+            nlist = int(argv[argv.index("--nlist") + 1]) if "--nlist" in argv else None
+            print(" Building ANN index...")
+            try:
+                index = IVFIndex.build_from_db(db, nlist)
+            except ValueError as error:
+                raise SystemExit(str(error))
+        index.save(settings.ANN_INDEX_DIR)
+        print(f" ANN index ready: {index.size} vectors, {index.nlist} cells "
+              f"({time.perf_counter() - start:.1f} s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import sys
+    main(sys.argv[1:])
@@ -0,0 +1,27 @@
+import json
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Embeddings are stored as raw little-endian float32 bytes: 4 bytes per
+# component instead of ~10-20 characters of JSON text.
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+
+def encode_embedding(values: Sequence[float]) -> Tuple[bytes, int, float]:
+    """Return (blob, dimension, L2 norm) for a RequirementEmbedding row."""
+    vector = np.asarray(values, dtype=EMBEDDING_DTYPE)
+    if vector.ndim != 1:
+        raise ValueError("Embedding must be a one-dimensional vector.")
+    return vector.tobytes(), int(vector.shape[0]), float(np.linalg.norm(vector))
+
+
+def decode_embedding(blob: bytes, dimension: int) -> np.ndarray:
+    vector = np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+    if vector.shape[0] != dimension:
+        raise ValueError(f"Embedding has {vector.shape[0]} components, expected {dimension}.")
+    return vector
+
+
+def decode_json_embedding(raw: str) -> np.ndarray:
+    return np.asarray(json.loads(raw), dtype=EMBEDDING_DTYPE)
@@ -0,0 +1,163 @@
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.requirements import RequirementEmbedding
+from app.similarity.codec import EMBEDDING_DTYPE, decode_embedding
+
+LOAD_BATCH_SIZE = 5000
+
+
+class EmbeddingIndex:
+    """Exact cosine search over every stored embedding.
+
+    Rows are L2-normalised once at load time, so a cosine query is a single
+    matrix product against ``matrix``.
+    """
+
+    def __init__(self, ids: np.ndarray, matrix: np.ndarray, version: Optional[Tuple[int, int]] = None):
+        self.ids = ids
+        self.matrix = matrix
+        self.version = version
+        self._positions = {int(rid): pos for pos, rid in enumerate(ids)}
+
+    @property
+    def size(self) -> int:
+        return self.ids.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    @staticmethod
+    def stored_version(db: Session) -> Tuple[int, int]:
+        """(count, max id) of the stored vectors: any insert, delete or newly
+        filled vector changes it."""
+        count, last_id = db.execute(
+            select(func.count(), func.max(RequirementEmbedding.id)).where(RequirementEmbedding.vector.isnot(None))
+        ).one()
+        return int(count), int(last_id or 0)
+
+    @classmethod
+    def load(cls, db: Session) -> "EmbeddingIndex":
+        # Taken first: rows written during the load only cause one more reload
+        version = cls.stored_version(db)
+        count = version[0]
+        dimension = db.scalar(
+            select(RequirementEmbedding.dimension).where(RequirementEmbedding.vector.isnot(None)).limit(1)
+        )
+
+        if not count:
+            return cls(np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=EMBEDDING_DTYPE), version)
+
+        ids = np.empty(count, dtype=np.int64)
+        matrix = np.empty((count, dimension), dtype=EMBEDDING_DTYPE)
+
+        stmt = (
+            select(RequirementEmbedding.requirement_id, RequirementEmbedding.vector, RequirementEmbedding.dimension)
+            .where(RequirementEmbedding.vector.isnot(None))
+            .order_by(RequirementEmbedding.requirement_id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+
+        filled = 0
+        for batch in db.execute(stmt).partitions():
+            # Rows inserted after the count are picked up on the next reload
+            for requirement_id, blob, dim in batch[: count - filled]:
+                ids[filled] = requirement_id
+                matrix[filled] = decode_embedding(blob, dim)
+                filled += 1
+
+        return cls.from_arrays(ids[:filled], matrix[:filled], version)
+
+    @classmethod
+    def from_arrays(cls, ids: np.ndarray, matrix: np.ndarray,
+                    version: Optional[Tuple[int, int]] = None) -> "EmbeddingIndex":
+        matrix = np.asarray(matrix, dtype=EMBEDDING_DTYPE)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return cls(np.asarray(ids, dtype=np.int64), matrix / norms, version)
+
+    def vector_for(self, requirement_id: int) -> Optional[np.ndarray]:
+        pos = self._positions.get(requirement_id)
+        return None if pos is None else self.matrix[pos]
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """Top-k (requirement_id, cosine) per query row, best first."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=EMBEDDING_DTYPE))
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        scores = (queries / norms) @ self.matrix.T
+        k = min(k, self.size)
+        if k == 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [(int(self.ids[pos]), float(score)) for pos, score in zip(row_pos, row_scores)]
+            for row_pos, row_scores in zip(top, top_scores)
+        ]
+
+    def similar_to(self, requirement_id: int, k: int) -> Optional[List[Tuple[int, float]]]:
+        vector = self.vector_for(requirement_id)
+        if vector is None:
+            return None
+        # Ask for one extra hit: the requirement itself always ranks first
+        hits = self.search(vector, k + 1)[0]
+        return [(rid, score) for rid, score in hits if rid != requirement_id][:k]
+
+
+# ------------------------------------------------------------
+# Process-wide index, loaded lazily and checked against the stored
+# vectors at most every EMBEDDING_INDEX_SYNC_SECONDS
+# ------------------------------------------------------------
+_index: Optional[EmbeddingIndex] = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def _refresh(index: Optional[EmbeddingIndex]) -> EmbeddingIndex:
+    with SessionLocal() as db:
+        if index is not None and index.version == EmbeddingIndex.stored_version(db):
+            return index
+        return EmbeddingIndex.load(db)
+
+
+def get_embedding_index() -> EmbeddingIndex:
+    """Process-wide index. Blocking (own sync session, thread lock): call it
+    through run_in_threadpool, never on the event loop thread."""
+    global _index, _checked_at
+    index = _index
+    if index is not None and time.monotonic() - _checked_at < settings.EMBEDDING_INDEX_SYNC_SECONDS:
+        return index
+
+    # Same policy as the conflict graph: only the first load makes readers
+    # wait; while one thread reloads, the others serve the current matrix
+    if not _index_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _index is None or time.monotonic() - _checked_at >= settings.EMBEDDING_INDEX_SYNC_SECONDS:
+            _index = _refresh(_index)
+            _checked_at = time.monotonic()
+        return _index
+    finally:
+        _index_lock.release()
+
+
+def reset_embedding_index():
+    global _index, _checked_at
+    with _index_lock:
+        _index = None
+        _checked_at = 0.0
@@ -0,0 +1,280 @@
+# Near-duplicate detection over Requirement.text with MinHash + LSH.
+#
+# Each text is reduced to word 3-shingles, hashed with NUM_PERM universal
+# hash functions and summarised by the minimum per function (the MinHash
+# signature). The signature is cut into LSH bands; two requirements become
+# candidates when any band hashes to the same bucket, and are kept when
+# their estimated Jaccard similarity reaches the threshold.
+#
+# Signatures and band buckets are stored, so a run only hashes requirements
+# that have no signature yet and compares them against everything indexed.
+#
+# Exact-duplicate signatures are collapsed: only the first requirement with
+# a given signature (its representative) gets bucket rows, and every later
+# copy is linked to it by one Overlap. A text repeated thousands of times
+# therefore adds one bucket entry, not thousands, and the bucket self-join
+# grows with the number of distinct texts instead of quadratically.
+#
+#   python -m app.similarity.minhash [--threshold 0.8] [--rebuild]
+
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from app.db.models.requirements import (
+    Overlap,
+    Requirement,
+    RequirementLSHBucket,
+    RequirementMinHash,
+)
+from app.similarity.overlaps import load_positions, write_overlaps
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+BATCH_SIZE = 2000
+DEFAULT_THRESHOLD = 0.8
+
+SIGNATURE_DTYPE = np.dtype("<u4")
+REASON_PREFIX = "Near-duplicate text"
+# Copy -> representative links: requirement1 is always the representative
+COPY_REASON = f"{REASON_PREFIX} (identical signature)."
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(1)
+# Fixed seed: signatures must stay comparable across runs and processes
+_PERM_A = _rng.integers(1, (1 << 31) - 1, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, (1 << 31) - 1, NUM_PERM, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 1 << 63, ROWS_PER_BAND, dtype=np.uint64) | np.uint64(1)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass
+class MinHashRunStats:
+    indexed: int = 0
+    copies: int = 0
+    candidates: int = 0
+    duplicates: int = 0
+    seconds: float = 0.0
+
+
+# ------------------------------------------------------------
+# Signatures
+# ------------------------------------------------------------
+def shingle_hashes(text: str) -> np.ndarray:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    # crc32 is stable across processes, unlike hash()
+    return np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def signatures(texts: List[str]) -> np.ndarray:
+    """MinHash signatures, shape (len(texts), NUM_PERM), for a batch of texts."""
+    per_text = [shingle_hashes(t) for t in texts]
+    starts = np.zeros(len(per_text), dtype=np.int64)
+    np.cumsum([len(h) for h in per_text[:-1]], out=starts[1:])
+
+    # All permutations of all shingles of the batch in one array operation;
+    # a < 2^31 and x < 2^32 so a * x never overflows uint64
+    hashed = (_PERM_A[:, None] * np.concatenate(per_text)[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return np.minimum.reduceat(hashed, starts, axis=1).T.astype(SIGNATURE_DTYPE)
+
+
+def band_buckets(sigs: np.ndarray) -> np.ndarray:
+    """One signed 64-bit bucket hash per (signature, band)."""
+    bands = sigs.astype(np.uint64).reshape(sigs.shape[0], BANDS, ROWS_PER_BAND)
+    return (bands * _BAND_MIX).sum(axis=2, dtype=np.uint64).view(np.int64)
+
+
+def estimated_jaccard(sig_1: np.ndarray, sig_2: np.ndarray) -> float:
+    return float(np.mean(sig_1 == sig_2))
+
+
+# ------------------------------------------------------------
+# Indexing
+# ------------------------------------------------------------
+def _known_representatives(db: Session, buckets: np.ndarray) -> Dict[bytes, int]:
+    """signature bytes -> representative, for the stored representatives that
+    share a band-0 bucket with any of `buckets` (identical signatures always do)."""
+    rows = db.execute(
+        select(RequirementLSHBucket.requirement_id)
+        .where(RequirementLSHBucket.band == 0)
+        .where(RequirementLSHBucket.bucket.in_(list({int(bucket) for bucket in buckets[:, 0]})))
+    ).scalars().all()
+    return {sig.tobytes(): rid for rid, sig in _load_signatures(db, rows).items()}
+
+
+def index_pending(db: Session) -> Tuple[List[int], List[Tuple[int, int]]]:
+    """Hash every requirement without a signature.
+
+    Returns the new representatives and the (representative, copy) pairs of
+    requirements whose signature was already indexed.
+    """
+    representatives: List[int] = []
+    copies: List[Tuple[int, int]] = []
+    last_id = 0
+
+    while True:
+        # Keyset batches: only BATCH_SIZE texts are in memory at a time
+        batch = db.execute(
+            select(Requirement.id, Requirement.text)
+            .outerjoin(RequirementMinHash, RequirementMinHash.requirement_id == Requirement.id)
+            .where(RequirementMinHash.requirement_id.is_(None))
+            .where(Requirement.id > last_id)
+            .order_by(Requirement.id)
+            .limit(BATCH_SIZE)
+        ).all()
+
+        if not batch:
+            break
+
+        ids = [rid for rid, _ in batch]
+        sigs = signatures([text for _, text in batch])
+        buckets = band_buckets(sigs)
+        known = _known_representatives(db, buckets)
+
+        bucket_rows = []
+        for rid, sig, row in zip(ids, sigs, buckets):
+            representative = known.setdefault(sig.tobytes(), rid)
+            if representative != rid:
+                copies.append((representative, rid))
+                continue
+            representatives.append(rid)
+            bucket_rows.extend({"requirement_id": rid, "band": band, "bucket": int(bucket)}
+                               for band, bucket in enumerate(row))
+
+        db.execute(insert(RequirementMinHash), [
+            {"requirement_id": rid, "signature": sig.tobytes()}
+            for rid, sig in zip(ids, sigs)
+        ])
+        if bucket_rows:
+            db.execute(insert(RequirementLSHBucket), bucket_rows)
+        db.commit()
+
+        last_id = ids[-1]
+
+    return representatives, copies
+
+
+def release_copies(db: Session, requirement_ids):
+    """Before `requirement_ids` are deleted: forget the signatures of their
+    identical copies, so the next run re-indexes them under a surviving
+    representative instead of leaving them without bucket rows."""
+    copies = select(Overlap.requirement2_id).where(
+        Overlap.reason == COPY_REASON,
+        Overlap.requirement1_id.in_(requirement_ids),
+    )
+    db.execute(delete(RequirementMinHash).where(
+        RequirementMinHash.requirement_id.in_(copies),
+        RequirementMinHash.requirement_id.not_in(requirement_ids),
+    ))
+
+
+def _load_signatures(db: Session, requirement_ids) -> Dict[int, np.ndarray]:
+    ids = list(requirement_ids)
+    found: Dict[int, np.ndarray] = {}
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = db.execute(
+            select(RequirementMinHash.requirement_id, RequirementMinHash.signature)
+            .where(RequirementMinHash.requirement_id.in_(ids[start:start + BATCH_SIZE]))
+        )
+        for rid, blob in rows:
+            found[rid] = np.frombuffer(blob, dtype=SIGNATURE_DTYPE)
+    return found
+
+
+def candidate_pairs(db: Session, requirement_ids: List[int]) -> Set[Tuple[int, int]]:
+    """Pairs sharing at least one LSH bucket with any of `requirement_ids`.
+
+    Buckets only hold representatives, so a bucket is as large as the number
+    of distinct signatures that collide in it, however often a text repeats.
+    """
+    mine = aliased(RequirementLSHBucket)
+    other = aliased(RequirementLSHBucket)
+    pairs: Set[Tuple[int, int]] = set()
+
+    for start in range(0, len(requirement_ids), BATCH_SIZE):
+        rows = db.execute(
+            select(mine.requirement_id, other.requirement_id)
+            .join(other, and_(
+                other.band == mine.band,
+                other.bucket == mine.bucket,
+                other.requirement_id != mine.requirement_id,
+            ))
+            .where(mine.requirement_id.in_(requirement_ids[start:start + BATCH_SIZE]))
+            .distinct()
+        )
+        for a, b in rows:
+            pairs.add((a, b) if a < b else (b, a))
+
+    return pairs
+
+
+# ------------------------------------------------------------
+# Detection
+# ------------------------------------------------------------
+def detect_duplicates(db: Session, threshold: float = DEFAULT_THRESHOLD, rebuild: bool = False) -> MinHashRunStats:
+    """Index new requirements and write their near-duplicates as Overlap rows."""
+    stats = MinHashRunStats()
+    start = time.perf_counter()
+
+    if rebuild:
+        db.execute(delete(RequirementLSHBucket))
+        db.execute(delete(RequirementMinHash))
+        db.execute(delete(Overlap).where(Overlap.reason.like(f"{REASON_PREFIX}%")))
+        db.commit()
+
+    new_ids, copies = index_pending(db)
+    stats.indexed = len(new_ids) + len(copies)
+    stats.copies = len(copies)
+
+    candidates = candidate_pairs(db, new_ids)
+    stats.candidates = len(candidates)
+
+    sigs = _load_signatures(db, {rid for pair in candidates for rid in pair})
+    duplicates = [(representative, copy, COPY_REASON) for representative, copy in copies]
+    for r1, r2 in sorted(candidates):
+        jaccard = estimated_jaccard(sigs[r1], sigs[r2])
+        if jaccard >= threshold:
+            duplicates.append((r1, r2, f"{REASON_PREFIX} (estimated Jaccard {jaccard:.2f})."))
+
+    positions = load_positions(db, {rid for r1, r2, _ in duplicates for rid in (r1, r2)})
+    write_overlaps(db, duplicates, positions)
+    db.commit()
+
+    stats.duplicates = len(duplicates)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.db.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Detect near-duplicate requirements with MinHash/LSH.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--rebuild", action="store_true", help="drop stored signatures and start over")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("🔎 Detecting near-duplicate requirements...")
+        result = detect_duplicates(db, args.threshold, args.rebuild)
+    finally:
+        db.close()
+
+    print(f"   → {result.indexed} requirements hashed ({result.copies} identical to an indexed one)")
+    print(f"   → {result.candidates} LSH candidate pairs")
+    print(f"   → {result.duplicates} near-duplicates written in {result.seconds:.1f} s")
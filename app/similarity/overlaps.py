@@ -0,0 +1,227 @@
+# Batch overlap detection over requirement embeddings.
+#
+# Requirements are blocked by risk_type (and optionally jurisdiction), and
+# each block is compared against itself in tiles with one matrix product
+# per tile. Pairs whose cosine similarity reaches the threshold are written
+# to requirement_overlaps in bulk. Tiles are spread over a process pool.
+#
+#   python -m app.similarity.overlaps [--threshold 0.9] [--by-jurisdiction] [--workers N]
+
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models.requirements import Overlap, Requirement, RequirementEmbedding
+from app.similarity.codec import EMBEDDING_DTYPE, decode_embedding
+
+TILE_ROWS = 1024
+TILE_COLS = 8192
+LOAD_BATCH_SIZE = 5000
+INSERT_BATCH_SIZE = 10000
+DEFAULT_THRESHOLD = 0.9
+
+# Every overlap written by this engine starts with this prefix, so a
+# recompute only replaces its own rows
+REASON_PREFIX = "Embedding similarity"
+
+
+@dataclass
+class OverlapRunStats:
+    requirements: int = 0
+    blocks: int = 0
+    pairs_compared: int = 0
+    overlaps_found: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pairs_per_second(self) -> float:
+        return self.pairs_compared / self.seconds if self.seconds else 0.0
+
+
+class _Block:
+    def __init__(self, key: Tuple[str, ...]):
+        self.key = key
+        self.ids: List[int] = []
+        self.vectors: List[np.ndarray] = []
+
+
+# Normalised block matrices; forked workers inherit them instead of
+# receiving a pickled copy per task
+_matrices: List[np.ndarray] = []
+
+
+def _scan_tile(task: Tuple[int, int, float]):
+    block_no, row_start, threshold = task
+    matrix = _matrices[block_no]
+    rows = matrix[row_start:row_start + TILE_ROWS]
+
+    found_i, found_j, found_s = [], [], []
+    # Only the upper triangle: column tiles start at the row tile
+    for col_start in range(row_start, matrix.shape[0], TILE_COLS):
+        scores = rows @ matrix[col_start:col_start + TILE_COLS].T
+        i, j = np.nonzero(scores >= threshold)
+        gi, gj = i + row_start, j + col_start
+        keep = gj > gi
+        found_i.append(gi[keep])
+        found_j.append(gj[keep])
+        found_s.append(scores[i[keep], j[keep]])
+
+    return block_no, np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_s)
+
+
+def _load_blocks(db: Session, by_jurisdiction: bool) -> Tuple[List[_Block], Dict[int, tuple]]:
+    stmt = (
+        select(
+            Requirement.id,
+            Requirement.risk_type,
+            Requirement.jurisdiction,
+            Requirement.page,
+            Requirement.line,
+            RequirementEmbedding.vector,
+            RequirementEmbedding.dimension,
+        )
+        .join(RequirementEmbedding, RequirementEmbedding.requirement_id == Requirement.id)
+        .where(RequirementEmbedding.vector.isnot(None))
+        .execution_options(yield_per=LOAD_BATCH_SIZE)
+    )
+
+    blocks: Dict[Tuple[str, ...], _Block] = {}
+    positions: Dict[int, tuple] = {}
+
+    for batch in db.execute(stmt).partitions():
+        for rid, risk_type, jurisdiction, page, line, blob, dim in batch:
+            key = (risk_type.value, jurisdiction) if by_jurisdiction else (risk_type.value,)
+            block = blocks.setdefault(key, _Block(key))
+            block.ids.append(rid)
+            block.vectors.append(decode_embedding(blob, dim))
+            positions[rid] = (page, line, jurisdiction)
+
+    return list(blocks.values()), positions
+
+
+def _normalised(vectors: List[np.ndarray]) -> np.ndarray:
+    matrix = np.stack(vectors).astype(EMBEDDING_DTYPE, copy=False)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def load_positions(db: Session, requirement_ids) -> Dict[int, tuple]:
+    """(page, line, jurisdiction) per requirement id, fetched in chunks."""
+    ids = list(requirement_ids)
+    positions: Dict[int, tuple] = {}
+    for start in range(0, len(ids), INSERT_BATCH_SIZE):
+        rows = db.execute(
+            select(Requirement.id, Requirement.page, Requirement.line, Requirement.jurisdiction)
+            .where(Requirement.id.in_(ids[start:start + INSERT_BATCH_SIZE]))
+        )
+        for rid, page, line, jurisdiction in rows:
+            positions[rid] = (page, line, jurisdiction)
+    return positions
+
+
+def write_overlaps(db: Session, pairs: List[Tuple[int, int, str]], positions: Dict[int, tuple]):
+    """Bulk-insert (requirement1_id, requirement2_id, reason) as Overlap rows."""
+    for start in range(0, len(pairs), INSERT_BATCH_SIZE):
+        rows = []
+        for r1, r2, reason in pairs[start:start + INSERT_BATCH_SIZE]:
+            page_1, line_1, jurisdiction = positions[r1]
+            page_2, line_2, _ = positions[r2]
+            rows.append({
+                "requirement1_id": r1,
+                "requirement2_id": r2,
+                "reason": reason,
+                "page_1": page_1,
+                "line_1": line_1,
+                "page_2": page_2,
+                "line_2": line_2,
+                "jurisdiction": jurisdiction,
+            })
+        db.execute(insert(Overlap), rows)
+
+
+def detect_overlaps(
+    db: Session,
+    threshold: float = DEFAULT_THRESHOLD,
+    by_jurisdiction: bool = False,
+    workers: Optional[int] = None,
+) -> OverlapRunStats:
+    """Recompute embedding overlaps and replace the previous engine output."""
+    global _matrices
+
+    stats = OverlapRunStats()
+    start = time.perf_counter()
+
+    blocks, positions = _load_blocks(db, by_jurisdiction)
+    _matrices = [_normalised(block.vectors) for block in blocks]
+    for block in blocks:
+        block.vectors = []
+
+    stats.requirements = len(positions)
+    stats.blocks = len(blocks)
+    stats.pairs_compared = sum(m.shape[0] * (m.shape[0] - 1) // 2 for m in _matrices)
+
+    tasks = [
+        (block_no, row_start, threshold)
+        for block_no, matrix in enumerate(_matrices)
+        for row_start in range(0, matrix.shape[0], TILE_ROWS)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    pairs: List[Tuple[int, int, str]] = []
+
+    if workers > 1 and len(tasks) > 1:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(min(workers, len(tasks))) as pool:
+            results = pool.imap_unordered(_scan_tile, tasks)
+            _collect(results, blocks, pairs)
+    else:
+        _collect(map(_scan_tile, tasks), blocks, pairs)
+
+    _matrices = []
+
+    db.execute(delete(Overlap).where(Overlap.reason.like(f"{REASON_PREFIX}%")))
+    write_overlaps(db, pairs, positions)
+    db.commit()
+
+    stats.overlaps_found = len(pairs)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def _collect(results, blocks: List[_Block], pairs: List[Tuple[int, int, str]]):
+    for block_no, gi, gj, scores in results:
+        ids = blocks[block_no].ids
+        pairs.extend(
+            (ids[i], ids[j], f"{REASON_PREFIX} {s:.3f}: near-identical obligations.")
+            for i, j, s in zip(gi, gj, scores)
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.db.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Recompute embedding-based requirement overlaps.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--by-jurisdiction", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("🌀 Detecting overlaps...")
+        result = detect_overlaps(db, args.threshold, args.by_jurisdiction, args.workers)
+    finally:
+        db.close()
+
+    print(f"   → {result.requirements} requirements in {result.blocks} blocks")
+    print(f"   → {result.pairs_compared} pairs compared ({result.pairs_per_second:,.0f} pairs/sec)")
+    print(f"   → {result.overlaps_found} overlaps written in {result.seconds:.1f} s")
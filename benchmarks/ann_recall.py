@@ -0,0 +1,66 @@
+# Recall@k and query latency of the IVF index against exact search.
+#
+# Uses clustered synthetic embeddings (real sentence embeddings are far
+# from uniform), sweeps nprobe, and also checks that a saved index reloads
+# through mmap and still accepts incremental inserts.
+#
+#   python -m benchmarks.ann_recall [N] [DIM]
+
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import benchmarks.common  # noqa: F401  (sets DATABASE_URL)
+from app.similarity.ann import IVFIndex
+from app.similarity.index import EmbeddingIndex
+
+K = 10
+NUM_QUERIES = 200
+NPROBES = [1, 4, 8, 16, 32]
+
+
+def synthetic_embeddings(n, dim, clusters=500, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, n)
+    return centers[labels] + 1.5 * rng.standard_normal((n, dim), dtype=np.float32)
+
+
+def run(n=200_000, dim=128):
+    vectors = synthetic_embeddings(n, dim)
+    ids = np.arange(1, n + 1)
+    queries = vectors[np.random.default_rng(1).choice(n, NUM_QUERIES, replace=False)]
+
+    exact = EmbeddingIndex.from_arrays(ids, vectors)
+    start = time.perf_counter()
+    truth = [{rid for rid, _ in hits} for hits in (exact.search(q, K)[0] for q in queries)]
+    exact_ms = (time.perf_counter() - start) * 1000 / NUM_QUERIES
+
+    start = time.perf_counter()
+    ivf = IVFIndex.build(ids, vectors)
+    print(f"vectors={n} dim={dim} nlist={ivf.nlist} build={time.perf_counter() - start:.1f} s")
+    print(f"{'exact':<12} recall@{K}=1.000  {exact_ms:7.3f} ms/query")
+
+    with tempfile.TemporaryDirectory() as path:
+        ivf.save(path)
+        ivf = IVFIndex.load(path)
+
+        for nprobe in NPROBES:
+            start = time.perf_counter()
+            found = [{rid for rid, _ in ivf.search(q, K, nprobe)} for q in queries]
+            ms = (time.perf_counter() - start) * 1000 / NUM_QUERIES
+            recall = np.mean([len(f & t) / K for f, t in zip(found, truth)])
+            print(f"nprobe={nprobe:<5} recall@{K}={recall:.3f}  {ms:7.3f} ms/query")
+
+        new_vectors = synthetic_embeddings(1000, dim, seed=2)
+        new_ids = np.arange(n + 1, n + 1001)
+        ivf.add(new_ids, new_vectors)
+        hit = ivf.search(new_vectors[0], 1, nprobe=8)[0][0]
+        print(f"incremental insert found by search: {hit == new_ids[0]}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*args)
@@ -0,0 +1,108 @@
+# Throughput of the sync (threadpool) vs async (AsyncSession) data paths
+# as the connection pool grows.
+#
+# Each "request" is a keyset page of /conflicts/detail-style work: one
+# point lookup plus one GROUP BY aggregate. The sync path runs requests on
+# a 40-thread pool (Starlette's default for sync endpoints); the async path
+# runs them as coroutines on one event loop. Meaningful numbers need a real
+# Postgres (set DATABASE_URL); SQLite serialises everything on one file.
+#
+#   python -m benchmarks.async_concurrency [--requests 2000] [--concurrency 64]
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from benchmarks.common import engine, reset_schema
+from app.core.config import settings
+from app.db.database import async_database_url
+from app.db.models.requirements import Requirement
+from app.db.seed_data import seed
+
+POOL_SIZES = [1, 2, 4, 8, 16]
+THREADPOOL_SIZE = 40
+NUM_REQUIREMENTS = 100_000
+
+
+def _statements(requirement_id: int):
+    return (
+        select(Requirement).where(Requirement.id == requirement_id),
+        select(Requirement.risk_type, func.count(Requirement.id))
+        .where(Requirement.jurisdiction == "EBA")
+        .group_by(Requirement.risk_type),
+    )
+
+
+def sync_path(pool_size: int, ids, concurrency: int) -> float:
+    bench_engine = create_engine(
+        settings.DATABASE_URL, poolclass=QueuePool, pool_size=pool_size, max_overflow=0
+    )
+
+    def one(requirement_id):
+        with bench_engine.connect() as conn:
+            for stmt in _statements(requirement_id):
+                conn.execute(stmt).all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(min(concurrency, THREADPOOL_SIZE)) as pool:
+        list(pool.map(one, ids))
+    elapsed = time.perf_counter() - start
+
+    bench_engine.dispose()
+    return len(ids) / elapsed
+
+
+async def async_path(pool_size: int, ids, concurrency: int) -> float:
+    bench_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(requirement_id):
+        async with semaphore:
+            async with bench_engine.connect() as conn:
+                for stmt in _statements(requirement_id):
+                    (await conn.execute(stmt)).all()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in ids))
+    elapsed = time.perf_counter() - start
+
+    await bench_engine.dispose()
+    return len(ids) / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare sync and async DB throughput by pool size.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    reset_schema()
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed(num_requirements=NUM_REQUIREMENTS, num_contradictions=0, num_overlaps=0)
+
+    rng = random.Random(0)
+    ids = [rng.randint(1, NUM_REQUIREMENTS) for _ in range(args.requests)]
+
+    print(f"backend={engine.dialect.name} requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'pool':>5} {'sync req/s':>12} {'async req/s':>12}")
+    for pool_size in POOL_SIZES:
+        sync_rps = sync_path(pool_size, ids, args.concurrency)
+        async_rps = asyncio.run(async_path(pool_size, ids, args.concurrency))
+        print(f"{pool_size:>5} {sync_rps:>12.1f} {async_rps:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
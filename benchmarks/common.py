@@ -0,0 +1,66 @@
+# Shared helpers for the benchmark scripts.
+#
+# Scripts are run from the repository root as modules, e.g.
+#   python -m benchmarks.conflicts_detail_queries
+#
+# If DATABASE_URL is not set, a throwaway SQLite file is used so the
+# scripts work without a running Postgres.
+
+import asyncio
+import os
+import tempfile
+from contextlib import contextmanager
+
+if not os.environ.get("DATABASE_URL"):
+    _tmp_dir = tempfile.mkdtemp(prefix="regis-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+from sqlalchemy import event
+
+from app.db.database import Base, engine, SessionLocal, async_engine, AsyncSessionLocal, read_async_engines
+from app.db.init_db import init_db  # noqa: F401  (registers every model)
+
+
+def reset_schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+@contextmanager
+def count_statements(binds=(engine, async_engine.sync_engine, *(e.sync_engine for e in read_async_engines))):
+    """Count statements issued through the sync, async and read-replica engines."""
+    counter = StatementCounter()
+    for bind in binds:
+        event.listen(bind, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for bind in binds:
+            event.remove(bind, "before_cursor_execute", counter)
+
+
+def run_async(coro):
+    """asyncio.run() that also closes the async pool inside the same loop.
+
+    Pooled asyncpg connections are bound to the loop that opened them, so
+    they must not outlive it.
+    """
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            for bind in (async_engine, *read_async_engines):
+                await bind.dispose()
+
+    return asyncio.run(wrapper())
+
+
+__all__ = ["Base", "SessionLocal", "AsyncSessionLocal", "engine", "async_engine", "reset_schema", "count_statements", "run_async"]
@@ -0,0 +1,91 @@
+# Guards /conflicts/detail against N+1 hydration.
+#
+# Seeds increasing numbers of contradictions/overlaps and checks that the
+# number of SQL statements per request stays the same whatever the page
+# size. Exits non-zero if it grows with the result size.
+#
+#   python -m benchmarks.conflicts_detail_queries
+
+import sys
+import time
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, reset_schema, count_statements, run_async
+from app.api.v1.conflicts import conflicts_detail
+from app.api.v1.schemas.conflicts import ConflictsDetailResponse
+from app.db.models.requirements import Requirement, Contradiction, Overlap
+from app.db.models.enums import RiskTypeEnum
+
+SIZES = [10, 100, 1000]
+
+
+def seed(db, n):
+    db.query(Contradiction).delete()
+    db.query(Overlap).delete()
+    db.query(Requirement).delete()
+
+    reqs = [
+        Requirement(
+            text=f"Requirement {i}",
+            page=1,
+            line=i,
+            risk_type=RiskTypeEnum.AML,
+            jurisdiction="EU"
+        )
+        for i in range(2 * n)
+    ]
+    db.add_all(reqs)
+    db.flush()
+
+    for i in range(n):
+        r1, r2 = reqs[2 * i], reqs[2 * i + 1]
+        db.add(Contradiction(requirement1_id=r1.id, requirement2_id=r2.id, jurisdiction="EU"))
+        db.add(Overlap(requirement1_id=r1.id, requirement2_id=r2.id, jurisdiction="EU"))
+    db.commit()
+
+
+async def fetch(conflict_type, n):
+    async with AsyncSessionLocal() as db:
+        return await conflicts_detail(
+            conflict_type=conflict_type,
+            jurisdiction=None,
+            limit=n,
+            after=None,
+            db=db
+        )
+
+
+def run():
+    reset_schema()
+    db = SessionLocal()
+    failures = []
+
+    try:
+        for conflict_type in ["contradiction", "overlap"]:
+            baseline = None
+            for n in SIZES:
+                seed(db, n)
+
+                with count_statements() as counter:
+                    start = time.perf_counter()
+                    response = run_async(fetch(conflict_type, n))
+                    elapsed = (time.perf_counter() - start) * 1000
+
+                # The fast path returns raw JSON; it must still match the schema
+                assert ConflictsDetailResponse.model_validate_json(response.body).count == n
+                print(f"{conflict_type:<14} rows={n:<6} statements={counter.count:<3} {elapsed:8.2f} ms")
+
+                if baseline is None:
+                    baseline = counter.count
+                elif counter.count > baseline:
+                    failures.append((conflict_type, n, counter.count, baseline))
+    finally:
+        db.close()
+
+    for conflict_type, n, count, baseline in failures:
+        print(f"FAIL: {conflict_type} issued {count} statements for {n} rows (baseline {baseline})")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,68 @@
+# JSON text vs float32 binary embedding storage.
+#
+# Stores N embeddings in both formats, loads them back from the database
+# into a search matrix, then times one batched top-k query against the
+# exact index.
+#
+#   python -m benchmarks.embedding_storage [N] [DIM]
+
+import json
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import insert, select
+
+from benchmarks.common import SessionLocal, reset_schema
+from benchmarks.requirements_stream_memory import grow_table
+from app.db.models.requirements import RequirementEmbedding
+from app.similarity.codec import decode_json_embedding, encode_embedding
+from app.similarity.index import EmbeddingIndex
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def run(n=100_000, dim=384):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+
+    json_rows = [json.dumps(v.tolist()) for v in vectors]
+    binary_rows = [encode_embedding(v)[0] for v in vectors]
+
+    json_mb = sum(len(r) for r in json_rows) / 1e6
+    binary_mb = sum(len(r) for r in binary_rows) / 1e6
+    print(f"embeddings={n} dim={dim}")
+    print(f"{'JSON storage':<28} {json_mb:8.1f} MB")
+    print(f"{'binary storage':<28} {binary_mb:8.1f} MB  ({json_mb / binary_mb:.1f}x smaller)")
+
+    reset_schema()
+    db = SessionLocal()
+    grow_table(db, n)
+    db.execute(insert(RequirementEmbedding), [
+        {"requirement_id": i + 1, "embedding": raw, "vector": blob, "dimension": dim, "norm": 0.0}
+        for i, (raw, blob) in enumerate(zip(json_rows, binary_rows))
+    ])
+    db.commit()
+    del json_rows, binary_rows
+
+    def load_json():
+        rows = db.execute(select(RequirementEmbedding.embedding).order_by(RequirementEmbedding.requirement_id))
+        return np.stack([decode_json_embedding(raw) for (raw,) in rows])
+
+    from_json = timed("load + decode JSON", load_json)
+    index = timed("load binary (EmbeddingIndex)", lambda: EmbeddingIndex.load(db))
+    assert np.allclose(from_json, vectors)
+    assert index.size == n
+
+    timed("top-10 for 64 queries", lambda: index.search(vectors[:64], 10))
+    db.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*args)
@@ -0,0 +1,286 @@
+# Endpoint benchmark suite with dataset-size sweeps.
+#
+# For every dataset size the database is re-seeded with the bulk seeder,
+# then every endpoint of the risks, conflicts and requirements routers is
+# driven in-process through the ASGI app:
+#
+#   1. one warm-up request; then, with the summary cache, conflict graph and
+#      embedding index dropped, one cold request under tracemalloc and a
+#      SQL statement counter (statements/request, peak Python memory);
+#   2. --repeats rounds, each of --requests requests per endpoint with
+#      --concurrency in flight (p50/p95/p99 latency and throughput: the
+#      median over the rounds).
+#
+# Results are written as JSON; --compare flags regressions against a
+# stored baseline and exits non-zero. A metric only regresses when it grows
+# by more than --tolerance *and* by more than an absolute floor
+# (--min-delta-ms, --min-delta-mb): millisecond latencies of cached
+# endpoints move by more than 25% between identical runs.
+#
+#   python -m benchmarks.endpoints --sizes 1000,100000 --output bench.json
+#   python -m benchmarks.endpoints --sizes 1000 --compare bench.json
+#
+# Set DATABASE_URL to benchmark against Postgres instead of SQLite.
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+import numpy as np
+
+from benchmarks.common import count_statements, engine, reset_schema, run_async
+from app.core.cache import summary_cache
+from app.db.seed_data import seed
+from app.graph.conflicts import reset_conflict_graph
+from app.similarity.index import reset_embedding_index
+
+# (name, path, query params, headers, heavy)
+# Heavy endpoints return the whole table and only get --heavy-requests runs
+ENDPOINTS = [
+    ("risks.summary", "/api/v1/risks/risks/summary", {}, {}, False),
+    ("risks.summary[jurisdiction]", "/api/v1/risks/risks/summary", {"jurisdiction": "EBA"}, {}, False),
+    ("risks.detail", "/api/v1/risks/risks/detail/AML", {"jurisdiction": "EBA"}, {}, True),
+    ("conflicts.summary", "/api/v1/conflicts/conflicts/summary", {}, {}, False),
+    ("conflicts.detail.contradiction", "/api/v1/conflicts/conflicts/detail/contradiction", {"limit": 100}, {}, False),
+    ("conflicts.detail.overlap", "/api/v1/conflicts/conflicts/detail/overlap", {"limit": 100}, {}, False),
+    ("conflicts.graph.cluster", "/api/v1/conflicts/conflicts/graph/cluster/1", {"limit": 100}, {}, False),
+    ("conflicts.graph.clusters", "/api/v1/conflicts/conflicts/graph/clusters", {"jurisdiction": "EBA"}, {}, False),
+    ("conflicts.graph.neighbourhood", "/api/v1/conflicts/conflicts/graph/neighbourhood/1", {"hops": 2}, {}, False),
+    ("requirements.list[page]", "/api/v1/requirements/requirements/list", {"limit": 100}, {}, False),
+    ("requirements.list[full]", "/api/v1/requirements/requirements/list", {}, {}, True),
+    ("requirements.list[ndjson]", "/api/v1/requirements/requirements/list", {},
+     {"accept": "application/x-ndjson"}, True),
+    ("requirements.search", "/api/v1/requirements/requirements/search",
+     {"q": "encryption", "limit": 20}, {}, False),
+    ("requirements.search[filtered]", "/api/v1/requirements/requirements/search",
+     {"q": "internal processes", "jurisdiction": "EBA", "risk_type": "GOVERNANCE", "limit": 20}, {}, False),
+    ("requirements.suggested", "/api/v1/requirements/requirements/suggested", {"limit": 5}, {}, False),
+    ("requirements.get", "/api/v1/requirements/requirements/1", {}, {}, False),
+    ("requirements.similar", "/api/v1/requirements/requirements/1/similar", {"k": 10}, {}, False),
+]
+
+# Metrics where larger is worse, and the relative growth that counts as a regression
+COMPARED_METRICS = ["p50_ms", "p95_ms", "p99_ms", "statements", "peak_memory_mb"]
+LATENCY_METRICS = ["p50_ms", "p95_ms", "p99_ms"]
+
+
+# ------------------------------------------------------------
+# Minimal in-process ASGI client
+# ------------------------------------------------------------
+async def asgi_get(app, path: str, params: Dict, headers: Dict, send_hook=None) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(params).encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("bench", 0),
+        "server": ("bench", 80),
+    }
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        if send_hook is not None:
+            await send_hook(message)
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _timed(app, path, params, headers) -> float:
+    start = time.perf_counter()
+    await asgi_get(app, path, params, headers)
+    return (time.perf_counter() - start) * 1000
+
+
+async def load_phase(app, path, params, headers, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await _timed(app, path, params, headers)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+# ------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------
+def reset_caches():
+    """Drop every process-wide cache: the next request takes the cold path."""
+    summary_cache.clear()
+    summary_cache.version.reset()
+    reset_embedding_index()
+    reset_conflict_graph()
+
+
+def cold_request(app, endpoint) -> Dict:
+    """Statements and peak memory of the request that fills the caches."""
+    name, path, params, headers, heavy = endpoint
+
+    status = run_async(asgi_get(app, path, params, headers))
+
+    # Count the request that fills the caches, not a cache hit
+    reset_caches()
+    tracemalloc.start()
+    with count_statements() as counter:
+        run_async(asgi_get(app, path, params, headers))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"status": status, "statements": counter.count, "peak_memory_mb": round(peak / 1e6, 3)}
+
+
+def load_round(app, endpoint, requests: int, heavy_requests: int, concurrency: int) -> List[float]:
+    """[p50, p95, p99, throughput] of one round of requests."""
+    name, path, params, headers, heavy = endpoint
+    n = heavy_requests if heavy else requests
+    latencies, wall = run_async(load_phase(app, path, params, headers, n, 1 if heavy else concurrency))
+    return [*np.percentile(latencies, [50, 95, 99]), n / wall]
+
+
+def run(sizes: List[int], requests: int, heavy_requests: int, concurrency: int, only: Optional[str],
+        repeats: int = 5) -> Dict:
+    from app.main import app
+
+    results: Dict = {
+        "meta": {
+            "backend": engine.dialect.name,
+            "python": platform.python_version(),
+            "requests": requests,
+            "heavy_requests": heavy_requests,
+            "concurrency": concurrency,
+            "repeats": repeats,
+        },
+        "sizes": {},
+    }
+    endpoints = [endpoint for endpoint in ENDPOINTS if not only or only in endpoint[0]]
+
+    for size in sizes:
+        reset_schema()
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed(num_requirements=size, num_contradictions=size // 10, num_overlaps=size // 10)
+        reset_caches()
+
+        print(f"\n== {size} requirements ({engine.dialect.name}) ==")
+        print(f"{'endpoint':<34} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'stmts':>6} {'peakMB':>8}")
+
+        cold = {endpoint[0]: cold_request(app, endpoint) for endpoint in endpoints}
+        for _, path, params, headers, _ in endpoints:
+            run_async(asgi_get(app, path, params, headers))
+
+        # Rounds go over every endpoint in turn: a slow stretch of the
+        # machine is spread over all endpoints instead of hitting one
+        rounds: Dict[str, List[List[float]]] = {endpoint[0]: [] for endpoint in endpoints}
+        for _ in range(repeats):
+            for endpoint in endpoints:
+                rounds[endpoint[0]].append(load_round(app, endpoint, requests, heavy_requests, concurrency))
+
+        size_results = {}
+        for name, _, _, _, heavy in endpoints:
+            # Median round per metric: a pause that lands in one round does not count
+            p50, p95, p99, throughput = np.median(rounds[name], axis=0)
+            r = size_results[name] = {
+                "status": cold[name]["status"],
+                "requests": heavy_requests if heavy else requests,
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3),
+                "throughput_rps": round(float(throughput), 2),
+                "statements": cold[name]["statements"],
+                "peak_memory_mb": cold[name]["peak_memory_mb"],
+            }
+            print(f"{name:<34} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+                  f"{r['throughput_rps']:>9.1f} {r['statements']:>6} {r['peak_memory_mb']:>8.2f}"
+                  + ("" if r["status"] == 200 else f"  (HTTP {r['status']})"))
+
+        results["sizes"][str(size)] = size_results
+
+    return results
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float,
+            min_delta_ms: float = 2.0, min_delta_mb: float = 1.0) -> List[str]:
+    regressions = []
+    for size, endpoints in current["sizes"].items():
+        for name, metrics in endpoints.items():
+            base = baseline.get("sizes", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            for metric in COMPARED_METRICS:
+                old, new = base[metric], metrics[metric]
+                # Statement counts are exact: any growth is a regression
+                if metric == "statements":
+                    limit = old
+                else:
+                    floor = min_delta_ms if metric in LATENCY_METRICS else min_delta_mb
+                    limit = max(old * (1 + tolerance), old + floor)
+                if new > limit:
+                    regressions.append(f"{size:>8} {name:<34} {metric:<15} {old} → {new}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the API endpoints across dataset sizes.")
+    parser.add_argument("--sizes", default="1000,100000", help="comma-separated requirement counts")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--heavy-requests", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=5, help="load rounds per endpoint")
+    parser.add_argument("--only", default=None, help="only endpoints whose name contains this")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="latency growth below this many ms is never a regression")
+    parser.add_argument("--min-delta-mb", type=float, default=1.0,
+                        help="peak memory growth below this many MB is never a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = run(sizes, args.requests, args.heavy_requests, args.concurrency, args.only, args.repeats)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta_ms, args.min_delta_mb)
+        if regressions:
+            print("\nREGRESSIONS:")
+            print("\n".join(regressions))
+            return 1
+        print("\nNo regressions against baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
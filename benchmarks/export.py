@@ -0,0 +1,105 @@
+# Bulk export: size on the wire, time and peak memory per format.
+#
+# Exports the seeded requirements table through every format (and the
+# JSON /requirements/list for reference), decodes each body back and checks
+# it against the database.
+#
+#   python -m benchmarks.export [--rows 200000]
+
+import argparse
+import contextlib
+import csv
+import io
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.common import SessionLocal, reset_schema, run_async
+from benchmarks.endpoints import asgi_get
+from app.db.models.requirements import Requirement
+from app.db.seed_data import seed
+from app.export.formats import arrow_available, read_arrays
+
+EXPORT_PATH = "/api/v1/export/export/requirements"
+LIST_PATH = "/api/v1/requirements/requirements/list"
+
+
+async def fetch(app, path, params, keep: bool = True):
+    """Response body (or b"" and only its size when keep=False)."""
+    chunks, size = [], 0
+
+    async def collect(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if keep:
+                chunks.append(message.get("body", b""))
+
+    status = await asgi_get(app, path, params, {}, send_hook=collect)
+    assert status == 200, (path, params, status)
+    return b"".join(chunks), size
+
+
+def decode(export_format, body):
+    """(row count, ids, jurisdictions) from an export body."""
+    if export_format == "csv":
+        rows = list(csv.reader(io.StringIO(body.decode())))[1:]
+        return len(rows), [int(r[0]) for r in rows], [r[3] for r in rows]
+    if export_format == "arrays":
+        columns = read_arrays(io.BytesIO(body))
+        return len(columns["id"]), list(columns["id"]), list(columns["jurisdiction"])
+    import pyarrow as pa
+    table = pa.ipc.open_stream(body).read_all()
+    return table.num_rows, table.column("id").to_pylist(), table.column("jurisdiction").to_pylist()
+
+
+def run(num_rows: int):
+    from app.main import app
+
+    reset_schema()
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed(num_requirements=num_rows, num_contradictions=0, num_overlaps=0)
+
+    db = SessionLocal()
+    expected = db.query(Requirement.id, Requirement.jurisdiction).order_by(Requirement.id).all()
+    db.close()
+
+    cases = [("json list", LIST_PATH, {}), ("csv", EXPORT_PATH, {"format": "csv"}),
+             ("arrays", EXPORT_PATH, {"format": "arrays"})]
+    if arrow_available():
+        cases.append(("arrow", EXPORT_PATH, {"format": "arrow"}))
+
+    print(f"rows={num_rows} arrow={'yes' if arrow_available() else 'no (pyarrow not installed)'}")
+    print(f"{'format':<10} {'MB':>8} {'seconds':>8} {'peak MB':>8}")
+    for name, path, params in cases:
+        # 1) wall time, 2) peak Python memory (bytes discarded as they are
+        # sent, so only the server side counts), 3) full body for checking
+        start = time.perf_counter()
+        _, size = run_async(fetch(app, path, params, keep=False))
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        run_async(fetch(app, path, params, keep=False))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if name != "json list":
+            body, _ = run_async(fetch(app, path, params))
+            count, ids, jurisdictions = decode(name, body)
+            assert count == len(expected), (name, count)
+            assert np.array_equal(ids, [row.id for row in expected]), name
+            assert jurisdictions == [row.jurisdiction for row in expected], name
+
+        print(f"{name:<10} {size / 1e6:>8.1f} {elapsed:>8.2f} {peak / 1e6:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare bulk export formats.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args(argv)
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
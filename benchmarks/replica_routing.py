@@ -0,0 +1,80 @@
+# Checks read-replica routing with two local SQLite files.
+#
+# The primary and the replica hold different text for requirement 1: GET
+# endpoints must answer from the replica, writes through get_async_db must
+# land on the primary. Exits non-zero on failure.
+#
+#   python -m benchmarks.replica_routing
+
+import os
+import sys
+import tempfile
+
+_tmp_dir = tempfile.mkdtemp(prefix="regis-replica-")
+PRIMARY_URL = f"sqlite:///{os.path.join(_tmp_dir, 'primary.db')}"
+REPLICA_URL = f"sqlite:///{os.path.join(_tmp_dir, 'replica.db')}"
+os.environ["DATABASE_URL"] = PRIMARY_URL
+os.environ["READ_DATABASE_URL"] = REPLICA_URL
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from benchmarks.common import AsyncSessionLocal, Base, run_async  # noqa: E402
+from benchmarks.endpoints import asgi_get  # noqa: E402
+from app.db.models.enums import RiskTypeEnum  # noqa: E402
+from app.db.models.requirements import Requirement  # noqa: E402
+
+
+def prepare(url: str, label: str):
+    file_engine = create_engine(url)
+    Base.metadata.create_all(bind=file_engine)
+    with file_engine.begin() as conn:
+        conn.execute(Requirement.__table__.insert(), {
+            "id": 1, "text": label, "page": 1, "line": 1,
+            "risk_type": RiskTypeEnum.AML, "jurisdiction": "EU",
+        })
+    return file_engine
+
+
+async def check(app):
+    body = {}
+
+    async def capture(message):
+        if message["type"] == "http.response.body":
+            body.setdefault("chunks", []).append(message.get("body", b""))
+
+    status = await asgi_get(app, "/api/v1/requirements/requirements/1", {}, {}, send_hook=capture)
+    read_text = b"".join(body["chunks"]).decode()
+
+    async with AsyncSessionLocal() as db:
+        db.add(Requirement(text="written", risk_type=RiskTypeEnum.AML, jurisdiction="EU"))
+        await db.commit()
+
+    return status, read_text
+
+
+def main():
+    primary = prepare(PRIMARY_URL, "from-primary")
+    replica = prepare(REPLICA_URL, "from-replica")
+
+    from app.main import app
+    status, read_text = run_async(check(app))
+
+    with primary.connect() as conn:
+        primary_rows = conn.execute(text("SELECT count(*) FROM requirements")).scalar()
+    with replica.connect() as conn:
+        replica_rows = conn.execute(text("SELECT count(*) FROM requirements")).scalar()
+
+    checks = {
+        "GET answered from replica": status == 200 and "from-replica" in read_text,
+        "write landed on primary": primary_rows == 2,
+        "replica untouched by write": replica_rows == 1,
+    }
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# Guards POST /requirements/batch against N+1 hydration.
+#
+# Every requirement gets contradictions, overlaps and a parent document;
+# batches of increasing size are fetched with every include= expansion and
+# the number of SQL statements must not grow with the batch size. Exits
+# non-zero if it does.
+#
+#   python -m benchmarks.requirements_batch_queries
+
+import sys
+import time
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, reset_schema, count_statements, run_async
+from app.api.v1.requirements import batch_requirements
+from app.api.v1.schemas.requirements import BATCH_MAX_IDS, RequirementsBatchRequest, RequirementsBatchResponse
+from app.db.models.document import CategoryLevel, Document, DocumentType
+from app.db.models.requirements import Requirement, Contradiction, Overlap
+from app.db.models.enums import RiskTypeEnum
+
+SIZES = [1, 10, 100, BATCH_MAX_IDS]
+INCLUDE = "contradictions,overlaps,document"
+
+
+def seed(db, n):
+    document = Document(
+        file_path="data/bench.xml",
+        title="Benchmark document",
+        jurisdiction="EU",
+        category_level=CategoryLevel.gold,
+        doc_type=DocumentType.eu_leg,
+    )
+    db.add(document)
+    db.flush()
+
+    reqs = [
+        Requirement(
+            text=f"Requirement {i}",
+            page=1,
+            line=i,
+            risk_type=RiskTypeEnum.AML,
+            jurisdiction="EU",
+            document_id=document.id
+        )
+        for i in range(n)
+    ]
+    db.add_all(reqs)
+    db.flush()
+
+    # Each requirement is first in one pair and second in another
+    for i in range(n):
+        r1, r2 = reqs[i], reqs[(i + 1) % n]
+        db.add(Contradiction(requirement1_id=r1.id, requirement2_id=r2.id, jurisdiction="EU"))
+        db.add(Overlap(requirement1_id=r1.id, requirement2_id=r2.id, jurisdiction="EU"))
+    db.commit()
+
+    return [req.id for req in reqs]
+
+
+async def fetch(ids):
+    async with AsyncSessionLocal() as db:
+        return await batch_requirements(request=RequirementsBatchRequest(ids=ids), include=INCLUDE, db=db)
+
+
+def run():
+    reset_schema()
+    db = SessionLocal()
+    failures = []
+
+    try:
+        ids = seed(db, BATCH_MAX_IDS)
+        baseline = None
+
+        for n in SIZES:
+            with count_statements() as counter:
+                start = time.perf_counter()
+                response = run_async(fetch(ids[:n]))
+                elapsed = (time.perf_counter() - start) * 1000
+
+            body = RequirementsBatchResponse.model_validate_json(response.body)
+            assert body.count == n and not body.missing
+            assert all(
+                len(item.contradictions) == len(item.overlaps) == 2 and item.document is not None
+                for item in body.items
+            )
+            print(f"ids={n:<6} statements={counter.count:<3} {elapsed:8.2f} ms")
+
+            if baseline is None:
+                baseline = counter.count
+            elif counter.count > baseline:
+                failures.append((n, counter.count, baseline))
+    finally:
+        db.close()
+
+    for n, count, baseline in failures:
+        print(f"FAIL: {n} ids issued {count} statements (baseline {baseline})")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,65 @@
+# Peak Python memory of the /requirements/list NDJSON stream vs table size.
+#
+# The stream reads in fixed-size server-side batches, so peak memory
+# should stay roughly flat as the table grows.
+#
+#   python -m benchmarks.requirements_stream_memory
+
+import time
+import tracemalloc
+
+from sqlalchemy import insert
+
+from benchmarks.common import SessionLocal, reset_schema, run_async
+from app.api.v1.requirements import _list_statement, _stream_requirements
+from app.db.models.requirements import Requirement
+from app.db.models.enums import RiskTypeEnum
+
+SIZES = [10_000, 50_000, 200_000]
+
+
+def grow_table(db, target):
+    current = db.query(Requirement).count()
+    rows = [
+        {
+            "text": f"Firms must implement risk-based AML controls ({i}).",
+            "page": 1,
+            "line": i,
+            "risk_type": RiskTypeEnum.AML,
+            "jurisdiction": "EU",
+        }
+        for i in range(current, target)
+    ]
+    if rows:
+        db.execute(insert(Requirement), rows)
+        db.commit()
+
+
+async def count_lines(stmt):
+    lines = 0
+    async for chunk in _stream_requirements(stmt):
+        lines += chunk.count(b"\n")
+    return lines
+
+
+def run():
+    reset_schema()
+    db = SessionLocal()
+
+    for n in SIZES:
+        grow_table(db, n)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        lines = run_async(count_lines(_list_statement(None, None)))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"rows={lines:<8} peak={peak / 1e6:7.2f} MB  {elapsed:6.2f} s")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,158 @@
+# Response serialization: pydantic + response_model vs. rows → orjson.
+#
+# For /requirements/list and /conflicts/detail, the same rows are turned
+# into a response body two ways, and the CPU time per response is compared:
+#
+#   legacy  build pydantic items, then what FastAPI does for a returned
+#           model: validate against response_model, jsonable-encode and
+#           json.dumps (fastapi.routing.serialize_response + JSONResponse)
+#   fast    SQL tuples → dicts → ORJSONResponse (what the endpoints do now)
+#
+# Both bodies are checked to decode to the same JSON. Finally, the fast
+# endpoints are driven end to end through the ASGI app.
+#
+#   python -m benchmarks.serialization [--rows 100000] [--repeat 5]
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import time
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from benchmarks.common import SessionLocal, reset_schema, run_async
+from benchmarks.endpoints import asgi_get
+from app.api.v1.conflicts import _conflict_row, _detail_statement
+from app.api.v1.requirements import SUGGESTED_SENTENCES, _list_statement, _requirement_row
+from app.api.v1.schemas.conflicts import (
+    ConflictItem,
+    ConflictsDetailResponse,
+    RequirementRef,
+)
+from app.api.v1.schemas.requirements import RequirementItem, RequirementsListResponse
+from app.db.models.requirements import Contradiction
+from app.db.seed_data import seed
+
+
+# ------------------------------------------------------------
+# Legacy path: pydantic items, re-validated by FastAPI
+# ------------------------------------------------------------
+def legacy_body(model, response_model) -> bytes:
+    field = create_response_field(name="response", type_=response_model, mode="serialization")
+    content = asyncio.run(serialize_response(field=field, response_content=model))
+    return JSONResponse(content).body
+
+
+def legacy_requirements(rows) -> bytes:
+    items = [
+        RequirementItem(
+            id=row.id,
+            text=row.text,
+            risk_type=row.risk_type.value if row.risk_type else None,
+            jurisdiction=row.jurisdiction,
+            page=row.page,
+            line=row.line,
+            short_description=random.choice(SUGGESTED_SENTENCES)
+        )
+        for row in rows
+    ]
+    model = RequirementsListResponse(count=len(items), items=items, next_cursor=None)
+    return legacy_body(model, RequirementsListResponse)
+
+
+def legacy_conflicts(rows) -> bytes:
+    items = [
+        ConflictItem(
+            id=row[0],
+            type="contradiction",
+            jurisdiction=row[1],
+            description=row[2],
+            requirement_1=RequirementRef(id=row[3], text=row[4], page=row[5], line=row[6], jurisdiction=row[7]),
+            requirement_2=RequirementRef(id=row[8], text=row[9], page=row[10], line=row[11], jurisdiction=row[12]),
+        )
+        for row in rows
+    ]
+    model = ConflictsDetailResponse(count=len(items), type="contradiction", items=items, next_cursor=None)
+    return legacy_body(model, ConflictsDetailResponse)
+
+
+# ------------------------------------------------------------
+# Fast path: the endpoints' own row builders
+# ------------------------------------------------------------
+def fast_requirements(rows) -> bytes:
+    items = [_requirement_row(row) for row in rows]
+    return ORJSONResponse({"count": len(items), "items": items, "next_cursor": None}).body
+
+
+def fast_conflicts(rows) -> bytes:
+    items = [_conflict_row(row, "contradiction") for row in rows]
+    return ORJSONResponse({
+        "count": len(items), "type": "contradiction", "items": items, "next_cursor": None
+    }).body
+
+
+def cpu_ms(fn, rows, repeat: int):
+    best, body = float("inf"), b""
+    for _ in range(repeat):
+        random.seed(0)
+        start = time.process_time()
+        body = fn(rows)
+        best = min(best, time.process_time() - start)
+    return best * 1000, body
+
+
+async def asgi_cpu_ms(app, path, params) -> float:
+    start = time.process_time()
+    status = await asgi_get(app, path, params, {})
+    assert status == 200, status
+    return (time.process_time() - start) * 1000
+
+
+def run(num_rows: int, repeat: int):
+    reset_schema()
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed(num_requirements=num_rows, num_contradictions=num_rows, num_overlaps=0)
+
+    db = SessionLocal()
+    cases = [
+        ("requirements.list", db.execute(_list_statement(None, None)).all(), legacy_requirements, fast_requirements),
+        ("conflicts.detail", db.execute(_detail_statement(Contradiction, "contradiction", None, None)).all(),
+         legacy_conflicts, fast_conflicts),
+    ]
+    db.close()
+
+    print(f"rows={num_rows} repeat={repeat} (best CPU time per response)")
+    print(f"{'endpoint':<20} {'legacy ms':>10} {'fast ms':>10} {'saved ms':>10} {'speedup':>8} {'MB':>7}")
+    for name, rows, legacy, fast in cases:
+        legacy_ms, legacy_out = cpu_ms(legacy, rows, repeat)
+        fast_ms, fast_out = cpu_ms(fast, rows, repeat)
+        assert json.loads(legacy_out) == json.loads(fast_out), f"{name}: bodies differ"
+        print(f"{name:<20} {legacy_ms:>10.1f} {fast_ms:>10.1f} {legacy_ms - fast_ms:>10.1f} "
+              f"{legacy_ms / fast_ms:>7.1f}x {len(fast_out) / 1e6:>7.1f}")
+
+    # End to end: query + build + encode, through the ASGI app
+    from app.main import app
+
+    list_ms = run_async(asgi_cpu_ms(app, "/api/v1/requirements/requirements/list", {}))
+    detail_ms = run_async(asgi_cpu_ms(
+        app, "/api/v1/conflicts/conflicts/detail/contradiction", {"limit": 1000}
+    ))
+    print(f"\nend to end CPU: /requirements/list ({num_rows} rows) {list_ms:.1f} ms, "
+          f"/conflicts/detail (1000 rows) {detail_ms:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare response serialization paths.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
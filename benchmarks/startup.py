@@ -0,0 +1,130 @@
+# Worker startup time: import, lifespan startup and first requests.
+#
+# Each mode runs in a fresh interpreter so module import is measured cold:
+#
+#   lazy     STARTUP_WARMUP=0: nothing touches the database before the
+#            first request
+#   warmup   STARTUP_WARMUP=1: embedding matrix and summary caches are
+#            loaded before the worker reports ready
+#   dead-db  DATABASE_URL points at an unreachable database: the import
+#            and startup must still succeed, and /ready must answer 503
+#
+#   python -m benchmarks.startup [--requirements N] [--dim D]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+FIRST_REQUESTS = [
+    ("risks.summary", "/api/v1/risks/risks/summary"),
+    ("requirements.similar", "/api/v1/requirements/requirements/1/similar"),
+]
+
+MODES = [
+    ("lazy", {"STARTUP_WARMUP": "0"}),
+    ("warmup", {"STARTUP_WARMUP": "1"}),
+    ("dead-db", {"STARTUP_WARMUP": "1", "DATABASE_URL": "sqlite:////nonexistent/regis/dead.db"}),
+]
+
+
+# ------------------------------------------------------------
+# Child: one worker start, timed step by step
+# ------------------------------------------------------------
+def child():
+    import asyncio
+
+    timings = {}
+
+    start = time.perf_counter()
+    from app.main import app
+    timings["import_ms"] = (time.perf_counter() - start) * 1000
+
+    from benchmarks.endpoints import asgi_get
+
+    async def measure():
+        start = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings["startup_ms"] = (time.perf_counter() - start) * 1000
+            timings["ready_status"] = await asgi_get(app, "/ready", {}, {})
+
+            for name, path in FIRST_REQUESTS:
+                start = time.perf_counter()
+                try:
+                    status = await asgi_get(app, path, {}, {})
+                except Exception:  # the app already answered 500; the server re-raises
+                    status = 500
+                timings[f"{name}_ms"] = (time.perf_counter() - start) * 1000
+                timings[f"{name}_status"] = status
+
+    asyncio.run(measure())
+    print(json.dumps(timings))
+
+
+# ------------------------------------------------------------
+# Parent: seed once, then start one worker per mode
+# ------------------------------------------------------------
+def prepare(num_requirements: int, dim: int):
+    import contextlib
+    import io
+
+    import numpy as np
+    from sqlalchemy import insert
+
+    from benchmarks.common import SessionLocal, reset_schema
+    from app.db.models.requirements import RequirementEmbedding
+    from app.db.seed_data import seed
+    from app.similarity.codec import encode_embedding
+
+    reset_schema()
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed(num_requirements=num_requirements, num_contradictions=num_requirements // 10,
+             num_overlaps=num_requirements // 10)
+
+    rng = np.random.default_rng(0)
+    db = SessionLocal()
+    for lo in range(0, num_requirements, 10_000):
+        vectors = rng.standard_normal((min(10_000, num_requirements - lo), dim), dtype=np.float32)
+        rows = []
+        for offset, vector in enumerate(vectors):
+            blob, dimension, norm = encode_embedding(vector)
+            rows.append({"requirement_id": lo + offset + 1, "vector": blob, "dimension": dimension, "norm": norm})
+        db.execute(insert(RequirementEmbedding), rows)
+    db.commit()
+    db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure worker import, startup and first-request time.")
+    parser.add_argument("--requirements", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return child()
+
+    import benchmarks.common  # noqa: F401  (sets a throwaway DATABASE_URL if unset)
+
+    prepare(args.requirements, args.dim)
+    print(f"requirements={args.requirements} dim={args.dim}")
+
+    print("first-request columns: " + ", ".join(name for name, _ in FIRST_REQUESTS))
+    print(f"{'mode':<9}{'import ms':>11}{'startup ms':>12}{'/ready':>8}" + "".join(
+        f"{'#' + str(i + 1) + ' ms':>10}{'status':>8}" for i in range(len(FIRST_REQUESTS))
+    ))
+
+    for mode, env in MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            env={**os.environ, **env}, capture_output=True, text=True
+        ).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<9}{timings['import_ms']:>11.1f}{timings['startup_ms']:>12.1f}{timings['ready_status']:>8}" + "".join(
+            f"{timings[name + '_ms']:>10.1f}{timings[name + '_status']:>8}" for name, _ in FIRST_REQUESTS
+        ))
+
+if __name__ == "__main__":
+    main()
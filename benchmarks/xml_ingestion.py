@@ -0,0 +1,55 @@
+# Streaming XML ingestion throughput and peak RSS.
+#
+# Writes a synthetic regulatory XML file of the requested size, then
+# ingests it through app.ingestion.ingest.
+#
+#   python -m benchmarks.xml_ingestion [SIZE_MB]
+
+import os
+import random
+import sys
+import tempfile
+
+from benchmarks.common import SessionLocal, reset_schema
+from app.db.models.document import DocumentType
+from app.ingestion.ingest import create_document, ingest_document, print_stats
+
+SENTENCES = [
+    "Institutions shall apply customer due diligence measures when establishing a business relationship.",
+    "Member States shall ensure that obliged entities report suspicious transactions without delay.",
+    "The management body must approve and periodically review the ICT risk management framework.",
+    "This Regulation lays down uniform rules concerning the subject matter.",
+    "Personal data shall be processed lawfully, fairly and in a transparent manner.",
+    "Firms should maintain business continuity plans for critical operations.",
+]
+
+
+def write_corpus(path: str, size_mb: int, seed: int = 0):
+    rng = random.Random(seed)
+    target = size_mb * 1_000_000
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<act>\n')
+        page = 0
+        while f.tell() < target:
+            page += 1
+            f.write(f'<page n="{page}"/>\n')
+            for _ in range(40):
+                body = " ".join(rng.choice(SENTENCES) for _ in range(3))
+                f.write(f"<article><p>{body}</p></article>\n")
+        f.write("</act>\n")
+
+
+def run(size_mb: int = 100):
+    reset_schema()
+    path = os.path.join(tempfile.mkdtemp(prefix="regis-xml-"), "corpus.xml")
+    write_corpus(path, size_mb)
+
+    db = SessionLocal()
+    doc = create_document(db, path, DocumentType.eu_leg, jurisdiction="EU", title="Synthetic act")
+    print_stats(ingest_document(db, doc))
+    db.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    run(*[int(a) for a in sys.argv[1:]])